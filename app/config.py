@@ -1,56 +1,96 @@
 """Конфигурация приложения."""
 
 import os
-from typing import List
+from typing import Dict, FrozenSet, List
+
+# Локальная ссылка на окружение: все значения читаются и парсятся один раз
+# при импорте модуля (атрибуты класса), без повторного обращения к os.getenv.
+_ENV = os.environ
 
 
 class Settings:
     """Настройки приложения."""
 
     # Основные настройки
-    VERSION: str = "1.11.0"
-    DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
+    VERSION: str = "1.12.0"
+    DEBUG: bool = _ENV.get("DEBUG", "false").lower() == "true"
 
     # Настройки API
-    API_PORT: int = int(os.getenv("API_PORT", "7555"))
+    API_PORT: int = int(_ENV.get("API_PORT", "7555"))
 
     # CORS: список разрешённых Origin'ов через запятую (по умолчанию "*" для совместимости).
     # Для prod рекомендуется указывать конкретные домены, например:
     # ALLOWED_ORIGINS=https://app.example.com,https://admin.example.com
     ALLOWED_ORIGINS: List[str] = [
         origin.strip()
-        for origin in os.getenv("ALLOWED_ORIGINS", "*").split(",")
+        for origin in _ENV.get("ALLOWED_ORIGINS", "*").split(",")
         if origin.strip()
     ] or ["*"]
 
     # Аутентификация: none (открытый API) | apikey (требуется заголовок X-API-Key).
-    AUTH_MODE: str = os.getenv("AUTH_MODE", "none").strip().lower()
+    AUTH_MODE: str = _ENV.get("AUTH_MODE", "none").strip().lower()
     # Список API-ключей через запятую. Используется только при AUTH_MODE=apikey.
     # Несколько ключей позволяют ротацию без даунтайма.
     API_KEYS: List[str] = [
-        key.strip() for key in os.getenv("API_KEYS", "").split(",") if key.strip()
+        key.strip() for key in _ENV.get("API_KEYS", "").split(",") if key.strip()
     ]
 
     # Настройки обработки файлов
-    MAX_FILE_SIZE: int = int(os.getenv("MAX_FILE_SIZE", str(20 * 1024 * 1024)))  # 20 MB
-    PROCESSING_TIMEOUT_SECONDS: int = int(
-        os.getenv("PROCESSING_TIMEOUT_SECONDS", "300")
+    MAX_FILE_SIZE: int = int(_ENV.get("MAX_FILE_SIZE", str(20 * 1024 * 1024)))  # 20 MB
+    PROCESSING_TIMEOUT_SECONDS: int = int(_ENV.get("PROCESSING_TIMEOUT_SECONDS", "300"))
+    # Кэш результатов извлечения в памяти процесса: число записей LRU по хэшу
+    # содержимого и имени файла. 0 — отключить кэш.
+    EXTRACTION_CACHE_SIZE: int = int(_ENV.get("EXTRACTION_CACHE_SIZE", "128"))
+    # Память под текст кэша результатов, байт: при превышении вытесняются
+    # самые давние записи. Ограничение действует в каждом воркере и в каждом
+    # процессе пула извлечения (EXTRACTION_PROCESSES).
+    EXTRACTION_CACHE_MAX_MEMORY: int = int(
+        _ENV.get("EXTRACTION_CACHE_MAX_MEMORY", str(64 * 1024 * 1024))
+    )  # 64 MB
+    # Прогрев при старте: импорт библиотек форматов и пробный запуск Tesseract,
+    # чтобы первый запрос не платил за холодный старт. При OCR_IN_PROCESS
+    # экземпляр tesserocr создаётся заранее в каждом потоке извлечения и OCR
+    ENABLE_WARMUP: bool = _ENV.get("ENABLE_WARMUP", "true").lower() == "true"
+    # Максимум одновременных извлечений текста из файлов в пуле потоков.
+    # Разбор CPU-bound: запросы сверх лимита ждут очереди (в пределах
+    # PROCESSING_TIMEOUT_SECONDS), а не делят ядра между десятками потоков.
+    EXTRACTION_THREADS: int = int(
+        _ENV.get("EXTRACTION_THREADS", str(os.cpu_count() or 4))
+    )
+    # Потоки экстрактора для OCR изображений PDF: пакеты изображений
+    # распознаются параллельно, в том числе пока разбираются следующие
+    # страницы. Этот же пул разбирает главы EPUB, а число профилей LibreOffice
+    # (параллельных локальных конвертаций) равно его размеру.
+    OCR_WORKERS: int = int(_ENV.get("OCR_WORKERS", "4"))
+    # Извлечение в пуле из EXTRACTION_PROCESSES процессов вместо пула потоков:
+    # разбор на чистом Python (JSON, YAML, DOCX, XML) не упирается в GIL
+    # одного воркера. 0 — извлечение в потоках воркера.
+    EXTRACTION_PROCESSES: int = int(_ENV.get("EXTRACTION_PROCESSES", "0"))
+    # Текст PDF читается через PDFium (pypdfium2) вместо pdfplumber: в разы
+    # быстрее, порядок блоков — как в потоке содержимого. pdfplumber разбирает
+    # только страницы с изображениями для OCR (от MIN_OCR_IMAGE_AREA).
+    PDF_FAST_TEXT_EXTRACTION: bool = (
+        _ENV.get("PDF_FAST_TEXT_EXTRACTION", "true").lower() == "true"
     )
 
     # Настройки управления ресурсами дочерних процессов
     # Максимальное потребление памяти дочерними процессами (в байтах)
     MAX_SUBPROCESS_MEMORY: int = int(
-        os.getenv("MAX_SUBPROCESS_MEMORY", str(1024 * 1024 * 1024))
+        _ENV.get("MAX_SUBPROCESS_MEMORY", str(1024 * 1024 * 1024))
     )  # 1 GB
 
     # Максимальное потребление памяти для LibreOffice (в байтах)
     MAX_LIBREOFFICE_MEMORY: int = int(
-        os.getenv("MAX_LIBREOFFICE_MEMORY", str(1536 * 1024 * 1024))
+        _ENV.get("MAX_LIBREOFFICE_MEMORY", str(1536 * 1024 * 1024))
     )  # 1.5 GB
 
+    # Адрес запущенного unoserver (host:port, без порта — 2003) для конвертации DOC/PPT.
+    # Пусто — LibreOffice запускается заново на каждую конвертацию
+    LIBREOFFICE_SERVER: str = _ENV.get("LIBREOFFICE_SERVER", "")
+
     # Максимальное потребление памяти для Tesseract (в байтах)
     MAX_TESSERACT_MEMORY: int = int(
-        os.getenv("MAX_TESSERACT_MEMORY", str(512 * 1024 * 1024))
+        _ENV.get("MAX_TESSERACT_MEMORY", str(512 * 1024 * 1024))
     )  # 512 MB
 
     # Максимальное разрешение для OCR изображений в ШТУКАХ ПИКСЕЛЕЙ (width * height),
@@ -58,75 +98,93 @@ class Settings:
     # decompression bomb (PNG с заявленным разрешением 100k×100k и т.п.).
     # Default 52_428_800 ≈ 50 мегапикселей (например, 7071×7071 или 10000×5243).
     MAX_OCR_IMAGE_PIXELS: int = int(
-        os.getenv("MAX_OCR_IMAGE_PIXELS", str(50 * 1024 * 1024))
+        _ENV.get("MAX_OCR_IMAGE_PIXELS", str(50 * 1024 * 1024))
     )  # 50 МП (МЕГАПИКСЕЛЕЙ, не мегабайт)
 
     # Включить/выключить ограничения ресурсов
     ENABLE_RESOURCE_LIMITS: bool = (
-        os.getenv("ENABLE_RESOURCE_LIMITS", "true").lower() == "true"
+        _ENV.get("ENABLE_RESOURCE_LIMITS", "true").lower() == "true"
     )
 
     # Настройки OCR
-    OCR_LANGUAGES: str = os.getenv("OCR_LANGUAGES", "rus+eng")
+    OCR_LANGUAGES: str = _ENV.get("OCR_LANGUAGES", "rus+eng")
+    # Максимальная длина большей стороны изображения перед OCR (в пикселях).
+    # Точность Tesseract перестаёт расти примерно после 300 DPI, а время растёт
+    # линейно с числом пикселей. 0 — отключить уменьшение.
+    OCR_MAX_IMAGE_EDGE: int = int(_ENV.get("OCR_MAX_IMAGE_EDGE", "3500"))
+    # Разрешение рендеринга изображений PDF для OCR (DPI). Для печатного текста
+    # Tesseract точен уже на 200 DPI, а объём пикселей растёт квадратично.
+    OCR_PDF_RESOLUTION: int = int(_ENV.get("OCR_PDF_RESOLUTION", "200"))
+    # Минимальная площадь изображения на странице PDF для OCR (в пунктах²).
+    # Логотипы, маркеры списков и иконки текста не содержат, а каждое из них
+    # стоит отдельного рендера и прохода Tesseract. 0 — распознавать все.
+    MIN_OCR_IMAGE_AREA: int = int(_ENV.get("MIN_OCR_IMAGE_AREA", "10000"))
+    # Адаптивная бинаризация изображений перед OCR. Помогает на фотографиях
+    # документов с тенями и неравномерным освещением; для чистых сканов
+    # встроенной бинаризации Tesseract достаточно.
+    OCR_BINARIZE: bool = _ENV.get("OCR_BINARIZE", "false").lower() == "true"
+    # OCR в процессе сервиса через tesserocr (если установлен): модели языков
+    # загружаются один раз на поток, а не при каждом запуске tesseract.
+    # Ограничения памяти MAX_TESSERACT_MEMORY и таймаут подпроцесса при этом
+    # не действуют.
+    OCR_IN_PROCESS: bool = _ENV.get("OCR_IN_PROCESS", "false").lower() == "true"
 
     # Настройки производительности
-    WORKERS: int = int(os.getenv("WORKERS", "1"))
+    WORKERS: int = int(_ENV.get("WORKERS", "1"))
 
     # Настройки архивов
-    MAX_ARCHIVE_SIZE: int = int(os.getenv("MAX_ARCHIVE_SIZE", "20971520"))  # 20 MB
-    MAX_EXTRACTED_SIZE: int = int(
-        os.getenv("MAX_EXTRACTED_SIZE", "104857600")
-    )  # 100 MB
-    MAX_ARCHIVE_NESTING: int = int(os.getenv("MAX_ARCHIVE_NESTING", "3"))
+    MAX_ARCHIVE_SIZE: int = int(_ENV.get("MAX_ARCHIVE_SIZE", "20971520"))  # 20 MB
+    MAX_EXTRACTED_SIZE: int = int(_ENV.get("MAX_EXTRACTED_SIZE", "104857600"))  # 100 MB
+    MAX_ARCHIVE_NESTING: int = int(_ENV.get("MAX_ARCHIVE_NESTING", "3"))
 
     # Настройки веб-экстрактора (v1.10.0)
     MIN_IMAGE_SIZE_FOR_OCR: int = int(
-        os.getenv("MIN_IMAGE_SIZE_FOR_OCR", "22500")
+        _ENV.get("MIN_IMAGE_SIZE_FOR_OCR", "22500")
     )  # 150x150 пикселей
-    MAX_IMAGES_PER_PAGE: int = int(os.getenv("MAX_IMAGES_PER_PAGE", "20"))
-    WEB_PAGE_TIMEOUT: int = int(os.getenv("WEB_PAGE_TIMEOUT", "30"))  # секунды
+    MAX_IMAGES_PER_PAGE: int = int(_ENV.get("MAX_IMAGES_PER_PAGE", "20"))
+    WEB_PAGE_TIMEOUT: int = int(_ENV.get("WEB_PAGE_TIMEOUT", "30"))  # секунды
     IMAGE_DOWNLOAD_TIMEOUT: int = int(
-        os.getenv("IMAGE_DOWNLOAD_TIMEOUT", "15")
+        _ENV.get("IMAGE_DOWNLOAD_TIMEOUT", "15")
     )  # секунды
-    DEFAULT_USER_AGENT: str = os.getenv("DEFAULT_USER_AGENT", "Text Extraction Bot 1.0")
-    ENABLE_JAVASCRIPT: bool = os.getenv("ENABLE_JAVASCRIPT", "false").lower() == "true"
+    DEFAULT_USER_AGENT: str = _ENV.get("DEFAULT_USER_AGENT", "Text Extraction Bot 1.0")
+    ENABLE_JAVASCRIPT: bool = _ENV.get("ENABLE_JAVASCRIPT", "false").lower() == "true"
 
     # Новые настройки для определения типа контента и скачивания файлов (v1.10.3)
     HEAD_REQUEST_TIMEOUT: int = int(
-        os.getenv("HEAD_REQUEST_TIMEOUT", "10")
+        _ENV.get("HEAD_REQUEST_TIMEOUT", "10")
     )  # таймаут HEAD запроса
     FILE_DOWNLOAD_TIMEOUT: int = int(
-        os.getenv("FILE_DOWNLOAD_TIMEOUT", "60")
+        _ENV.get("FILE_DOWNLOAD_TIMEOUT", "60")
     )  # таймаут скачивания файла
 
     # Новые настройки веб-экстрактора (v1.10.1)
     ENABLE_BASE64_IMAGES: bool = (
-        os.getenv("ENABLE_BASE64_IMAGES", "true").lower() == "true"
+        _ENV.get("ENABLE_BASE64_IMAGES", "true").lower() == "true"
     )
     WEB_PAGE_DELAY: int = int(
-        os.getenv("WEB_PAGE_DELAY", "3")
+        _ENV.get("WEB_PAGE_DELAY", "3")
     )  # секунды задержки после загрузки JS
     ENABLE_LAZY_LOADING_WAIT: bool = (
-        os.getenv("ENABLE_LAZY_LOADING_WAIT", "true").lower() == "true"
+        _ENV.get("ENABLE_LAZY_LOADING_WAIT", "true").lower() == "true"
     )
     JS_RENDER_TIMEOUT: int = int(
-        os.getenv("JS_RENDER_TIMEOUT", "10")
+        _ENV.get("JS_RENDER_TIMEOUT", "10")
     )  # отдельный таймаут для JS-рендеринга
     MAX_SCROLL_ATTEMPTS: int = int(
-        os.getenv("MAX_SCROLL_ATTEMPTS", "3")
+        _ENV.get("MAX_SCROLL_ATTEMPTS", "3")
     )  # защита от бесконечного скролла
     MAX_SCROLL_ATTEMPTS_CAP: int = int(
-        os.getenv("MAX_SCROLL_ATTEMPTS_CAP", "10")
+        _ENV.get("MAX_SCROLL_ATTEMPTS_CAP", "10")
     )  # жёсткий верхний предел, выше которого пользовательское значение игнорируется
 
     # Заблокированные IP-диапазоны для защиты от SSRF
-    BLOCKED_IP_RANGES: str = os.getenv(
+    BLOCKED_IP_RANGES: str = _ENV.get(
         "BLOCKED_IP_RANGES",
         "127.0.0.0/8,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16,169.254.0.0/16,::1/128,fe80::/10",
     )
 
     # Заблокированные хосты (включая Docker и loopback)
-    BLOCKED_HOSTNAMES: str = os.getenv(
+    BLOCKED_HOSTNAMES: str = _ENV.get(
         "BLOCKED_HOSTNAMES", "localhost,host.docker.internal,ip6-localhost,ip6-loopback"
     )
 
@@ -274,6 +332,23 @@ class Settings:
         ],
     }
 
+    # Предвычисленные индексы форматов: строятся один раз при импорте модуля,
+    # чтобы проверка расширения была O(1) вместо линейного прохода по спискам.
+    # SUPPORTED_FORMATS остаётся словарём списков — он отдаётся в API как есть.
+    SUPPORTED_FORMAT_SETS: Dict[str, FrozenSet[str]] = {
+        group: frozenset(extensions) for group, extensions in SUPPORTED_FORMATS.items()
+    }
+    ALL_SUPPORTED_EXTENSIONS: FrozenSet[str] = frozenset(
+        extension
+        for extensions in SUPPORTED_FORMATS.values()
+        for extension in extensions
+    )
+    FORMAT_GROUP_BY_EXTENSION: Dict[str, str] = {
+        extension: group
+        for group, extensions in SUPPORTED_FORMATS.items()
+        for extension in extensions
+    }
+
     MIME_TO_EXTENSION = {
         "application/pdf": "pdf",
         "application/msword": "doc",
@@ -302,11 +377,13 @@ class Settings:
 
     @property
     def all_supported_extensions(self) -> List[str]:
-        """Все поддерживаемые расширения файлов."""
-        extensions = []
-        for format_group in self.SUPPORTED_FORMATS.values():
-            extensions.extend(format_group)
-        return extensions
+        """Все поддерживаемые расширения файлов (в порядке объявления групп)."""
+        return list(self.FORMAT_GROUP_BY_EXTENSION)
+
+    @property
+    def all_supported_extensions_set(self) -> FrozenSet[str]:
+        """Все поддерживаемые расширения файлов для O(1) проверки вхождения."""
+        return self.ALL_SUPPORTED_EXTENSIONS
 
 
 settings = Settings()
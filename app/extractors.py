@@ -1,19 +1,38 @@
 """Модуль для извлечения текста из файлов различных форматов."""
 
 import asyncio
+import atexit
+import codecs
 import concurrent.futures
+import contextlib
+import csv
+import datetime
+import email
+import functools
+import hashlib
 import io
+import ipaddress
+import json
 import logging
+import mimetypes
 import os
+import posixpath
+import queue
+import re
 import shutil
+import socket
 import subprocess
+import sys
 import tarfile
 import tempfile
 import threading
 import time
 import zipfile
+from collections import OrderedDict
+from email.header import decode_header
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+from urllib.parse import unquote, urljoin, urlparse
 
 from defusedxml import ElementTree as ET
 
@@ -31,24 +50,22 @@ except ImportError:
 # Импорты для различных форматов.
 # PyPDF2 убран в v1.11.0 — пакет deprecated, имеет неисправляемую CVE-59234,
 # и в коде не использовался (только pdfplumber).
+# lxml используется для прямого разбора XML-частей офисных документов.
+# Для недоверенного XML парсер создаётся без разрешения сущностей и сети.
 try:
-    import pdfplumber
+    from lxml import etree as lxml_etree
 except ImportError:
-    pdfplumber = None
+    lxml_etree = None
 
+# Rust-парсер Excel (опционально, fallback на pandas с openpyxl/xlrd)
 try:
-    from docx import Document
+    from python_calamine import CalamineWorkbook
 except ImportError:
-    Document = None
-
-try:
-    import pandas as pd
-except ImportError:
-    pd = None
+    CalamineWorkbook = None
 
 try:
     import pytesseract
-    from PIL import Image
+    from PIL import Image, ImageChops, ImageFilter
     from PIL.Image import DecompressionBombError
 except ImportError:
     Image = None
@@ -60,21 +77,36 @@ except ImportError:
         """Fallback при отсутствии Pillow."""
 
 
+# OCR в процессе сервиса через libtesseract (опционально, по умолчанию
+# используется CLI tesseract)
 try:
-    from pptx import Presentation
+    import tesserocr
 except ImportError:
-    Presentation = None
+    tesserocr = None
+
 
 try:
     from bs4 import BeautifulSoup
 except ImportError:
     BeautifulSoup = None
 
+# Быстрый C-парсер HTML5 (Lexbor) для файлов HTML (опционально, fallback на bs4)
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
 try:
     import markdown
 except ImportError:
     markdown = None
 
+# Разбор Markdown в поток токенов без рендеринга в HTML (опционально)
+try:
+    from markdown_it import MarkdownIt
+except ImportError:
+    MarkdownIt = None
+
 try:
     from odf.opendocument import load
     from odf.teletype import extractText
@@ -91,20 +123,34 @@ except ImportError:
 
 try:
     import yaml
+
+    # Загрузчик на LibYAML (C) быстрее чистого Python примерно на порядок;
+    # если PyYAML собран без LibYAML, используется обычный SafeLoader
+    try:
+        from yaml import CSafeLoader as _YamlLoader
+    except ImportError:
+        from yaml import SafeLoader as _YamlLoader
 except ImportError:
     yaml = None
+    _YamlLoader = None
 
-# Веб-экстракция (новое в v1.10.0)
+# Быстрый C-парсер JSON (опционально, fallback на stdlib json)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Статистическое определение кодировки (опционально, fallback на перебор кодировок)
 try:
-    import ipaddress
-    from urllib.parse import urljoin, urlparse
+    import charset_normalizer
+except ImportError:
+    charset_normalizer = None
 
+# Веб-экстракция (новое в v1.10.0)
+try:
     import requests
 except ImportError:
     requests = None
-    urljoin = None
-    urlparse = None
-    ipaddress = None
 
 # Playwright для JS-рендеринга (новое в v1.10.1)
 try:
@@ -115,7 +161,22 @@ except ImportError:
 from fastapi import BackgroundTasks
 
 from app.config import settings
-from app.utils import get_file_extension, is_archive_format, is_supported_format
+from app.utils import (
+    LazyImport,
+    get_file_extension,
+    is_archive_format,
+    is_supported_format,
+)
+
+# Тяжёлые библиотеки форматов импортируются при первом использовании:
+# сервис стартует быстрее, а процесс, не получавший таких файлов, не держит
+# их в памяти. pandas нужен только как fallback для Excel без calamine.
+pdfplumber = LazyImport("pdfplumber")
+Document = LazyImport("docx", "Document")
+Presentation = LazyImport("pptx", "Presentation")
+# PDFium (зависимость pdfplumber) для быстрого извлечения текста PDF
+pdfium = LazyImport("pypdfium2")
+pd = LazyImport("pandas")
 
 logger = logging.getLogger(__name__)
 
@@ -126,6 +187,500 @@ logger = logging.getLogger(__name__)
 if Image is not None:
     Image.MAX_IMAGE_PIXELS = settings.MAX_OCR_IMAGE_PIXELS
 
+# Размер начального фрагмента файла для подбора кодировки
+_ENCODING_PROBE_SIZE = 64 * 1024
+
+# BOM однозначно задаёт кодировку Unicode. UTF-32 LE проверяется раньше
+# UTF-16 LE: его BOM начинается с тех же двух байтов
+_BOM_ENCODINGS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# Серии кириллических и латинских букв для проверки декодирования как
+# mac-cyrillic. Латиница — буквы, чей lower() попадает в a..z: кроме ASCII
+# это İ (U+0130) и знак Кельвина (U+212A)
+_CYRILLIC_RUN_RE = re.compile("[\u0400-\u04ff]+")
+_LATIN_RUN_RE = re.compile("[A-Za-z\u0130\u212a]+")
+
+# Однобайтовые кодировки, среди которых charset_normalizer выбирает
+# кодировку файла не в UTF-8. UTF-16 без BOM исключён: короткие тексты
+# чётной длины ошибочно распознаются как UTF-16 LE
+_CHARSET_DETECTION_ENCODINGS = [
+    "cp1251",
+    "koi8_r",
+    "cp866",
+    "iso8859_5",
+    "mac_cyrillic",
+    "latin_1",
+]
+
+# Пространства имён и теги WordprocessingML для прямого разбора DOCX
+_W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_W = "{" + _W_NS + "}"
+_W_P = _W + "p"
+_W_R = _W + "r"
+_W_T = _W + "t"
+_W_BR = _W + "br"
+_W_TBL = _W + "tbl"
+_W_TR = _W + "tr"
+_W_TC = _W + "tc"
+_W_TC_PR = _W + "tcPr"
+_W_GRID_SPAN = _W + "gridSpan"
+_W_V_MERGE = _W + "vMerge"
+_W_VAL = _W + "val"
+_W_HYPERLINK = _W + "hyperlink"
+_W_BODY = _W + "body"
+_W_SECT_PR = _W + "sectPr"
+
+# Максимум столбцов таблицы Word: больший gridSpan в файле повреждён
+_DOCX_MAX_GRID_SPAN = 63
+# Ссылки секции на колонтитулы и их подписи в выводе (порядок важен)
+_DOCX_HEADER_FOOTER_REFERENCES = {
+    _W + "headerReference": "Заголовок",
+    _W + "footerReference": "Подвал",
+}
+# Элементы run, которые python-docx превращает в символы текста
+_DOCX_RUN_CHARS = {
+    _W + "tab": "\t",
+    _W + "ptab": "\t",
+    _W + "cr": "\n",
+    _W + "noBreakHyphen": "-",
+}
+
+# Пространства имён и теги PresentationML/DrawingML для прямого разбора PPTX
+_P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_P_SP = _P + "sp"
+_P_TX_BODY = _P + "txBody"
+_A_P = _A + "p"
+_A_T = _A + "t"
+# Элементы параграфа DrawingML с текстом (как _Paragraph.text в python-pptx)
+_PPTX_TEXT_RUNS = frozenset({_A + "r", _A + "fld"})
+_PPTX_LINE_BREAK = _A + "br"
+# Стандартные заголовки заметок PowerPoint, которые не считаются текстом
+_PPTX_NOTES_PLACEHOLDERS = frozenset({"Заметки", "Notes"})
+
+# Цветовые режимы PIL, которые перед OCR безопасно переводить в оттенки серого
+_OCR_GRAYSCALE_MODES = frozenset(
+    {"RGB", "RGBA", "RGBX", "P", "PA", "CMYK", "LA", "YCbCr"}
+)
+# Адаптивная бинаризация перед OCR (OCR_BINARIZE): радиус окна локального
+# среднего в пикселях и насколько пиксель должен быть темнее среднего, чтобы
+# считаться текстом
+_OCR_BINARIZE_RADIUS = 15
+_OCR_BINARIZE_OFFSET = 10
+_OCR_BINARIZE_TABLE = [
+    0 if value > _OCR_BINARIZE_OFFSET else 255 for value in range(256)
+]
+
+# События и теги YAML для разбора без построения дерева объектов
+if yaml is not None:
+    _YAML_NODE_EVENTS = (
+        yaml.ScalarEvent,
+        yaml.MappingStartEvent,
+        yaml.SequenceStartEvent,
+        yaml.AliasEvent,
+    )
+    _YAML_END_EVENTS = (yaml.MappingEndEvent, yaml.SequenceEndEvent)
+_YAML_STR_TAG = "tag:yaml.org,2002:str"
+_YAML_MAP_TAG = "tag:yaml.org,2002:map"
+_YAML_SEQ_TAG = "tag:yaml.org,2002:seq"
+_YAML_MERGE_TAG = "tag:yaml.org,2002:merge"
+
+# HTML-теги внутри HTML-блоков Markdown
+_HTML_TAG_RE = re.compile(r"<[^>]*>")
+
+# Управляющие символы, кроме табуляции и переводов строк, в тексте из MSG
+_MSG_CONTROL_CHARS_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]+")
+# Байты вне ASCII: удаляются bytes.translate перед строгим декодированием
+_NON_ASCII_BYTES = bytes(range(0x80, 0x100))
+# Байты, которые str.strip() считает пробельными в диапазоне ASCII
+_ASCII_STR_WHITESPACE = bytes(code for code in range(0x80) if chr(code).isspace())
+_ASCII_LETTER_RE = re.compile(rb"[A-Za-z]")
+# Encoded-word (RFC 2047) в заголовках письма: =?charset?B|Q?текст?=
+_ENCODED_WORD_RE = re.compile(r"=\?[^?]+\?[bBqQ]\?[^?]*\?=")
+# Заголовки письма, попадающие в текст, в порядке вывода
+_EML_TEXT_HEADERS = ("From", "To", "Subject", "Date")
+_EML_TEXT_HEADERS_BY_KEY = {header.lower(): header for header in _EML_TEXT_HEADERS}
+# Блок заголовков RFC 822 (с продолжениями строк) и пустая строка после него:
+# файл .msg, сохранённый в формате EML
+_EML_HEADER_BLOCK_RE = re.compile(
+    rb"(?:[!-9;-~]+:[^\r\n]*\r?\n(?:[ \t][^\r\n]*\r?\n)*)+\r?\n"
+)
+# Границы проверки начала файла на заголовки EML
+_EML_PROBE_SIZE = 4096
+
+# Расширения глав EPUB, из которых извлекается текст
+_EPUB_HTML_SUFFIXES = (".html", ".xhtml", ".htm")
+
+# Сигнатуры начала файла и соответствующие им MIME-типы для _check_mime_type
+_MIME_SIGNATURES: Dict[bytes, List[str]] = {
+    b"\x50\x4b\x03\x04": [
+        "application/zip",
+        "application/epub+zip",
+        "application/vnd.openxmlformats",
+        "application/vnd.oasis.opendocument",
+    ],
+    b"\x50\x4b\x07\x08": ["application/zip", "application/epub+zip"],
+    b"\x50\x4b\x05\x06": ["application/zip", "application/epub+zip"],
+    b"%PDF": ["application/pdf"],
+    b"\xd0\xcf\x11\xe0": [
+        "application/msword",
+        "application/vnd.ms-excel",
+        "application/vnd.ms-powerpoint",
+    ],
+    b"\x89PNG": ["image/png"],
+    b"\xff\xd8\xff": ["image/jpeg"],
+    b"GIF8": ["image/gif"],
+    b"BM": ["image/bmp"],
+    b"II*\x00": ["image/tiff"],
+    b"MM\x00*": ["image/tiff"],
+    b"<!DOCTYPE": ["text/html"],
+    b"<html": ["text/html"],
+    b"<?xml": ["text/xml", "application/xml"],
+}
+
+# Сигнатуры, сгруппированные по первому байту: длинные раньше коротких
+_MIME_SIGNATURES_BY_FIRST_BYTE: Dict[int, List[Tuple[bytes, List[str]]]] = {}
+for _signature, _mime_types in sorted(
+    _MIME_SIGNATURES.items(), key=lambda item: -len(item[0])
+):
+    _MIME_SIGNATURES_BY_FIRST_BYTE.setdefault(_signature[0], []).append(
+        (_signature, _mime_types)
+    )
+del _signature, _mime_types
+
+# Таблица диспетчеризации: расширение -> имя метода извлечения.
+# Строится один раз при импорте модуля; метод получается через getattr,
+# поэтому patch.object на экземпляре продолжает работать в тестах.
+_EXTRACTION_METHODS: Dict[str, str] = {
+    "pdf": "_extract_from_pdf_sync",
+    "docx": "_extract_from_docx_sync",
+    "doc": "_extract_from_doc_sync",
+    "csv": "_extract_from_csv_sync",
+    "xls": "_extract_from_excel_sync",
+    "xlsx": "_extract_from_excel_sync",
+    "ods": "_extract_from_excel_sync",
+    "pptx": "_extract_from_pptx_sync",
+    "ppt": "_extract_from_ppt_sync",
+    "txt": "_extract_from_txt_sync",
+    "json": "_extract_from_json_sync",
+    "rtf": "_extract_from_rtf_sync",
+    "odt": "_extract_from_odt_sync",
+    "xml": "_extract_from_xml_sync",
+    "epub": "_extract_from_epub_sync",
+    "eml": "_extract_from_eml_sync",
+    "msg": "_extract_from_msg_sync",
+    "html": "_extract_from_html_sync",
+    "htm": "_extract_from_html_sync",
+    "md": "_extract_from_markdown_sync",
+    "markdown": "_extract_from_markdown_sync",
+    "yaml": "_extract_from_yaml_sync",
+    "yml": "_extract_from_yaml_sync",
+    "jpg": "_extract_from_image_sync",
+    "jpeg": "_extract_from_image_sync",
+    "png": "_extract_from_image_sync",
+    "tiff": "_extract_from_image_sync",
+    "tif": "_extract_from_image_sync",
+    "bmp": "_extract_from_image_sync",
+    "gif": "_extract_from_image_sync",
+    "webp": "_extract_from_image_sync",
+}
+
+
+# PDFium не потокобезопасен: документы открываются, читаются и рендерятся
+# (page.to_image в pdfplumber) по одному во всём процессе
+_PDFIUM_LOCK = threading.Lock()
+
+# Максимум изображений на один запуск Tesseract: загрузка traineddata
+# выполняется один раз на пакет, а таймаут пакета остаётся ограниченным
+_OCR_BATCH_MAX_IMAGES = 8
+# Сколько поток прогрева ждёт остальные потоки пула, секунд
+_OCR_WARMUP_TIMEOUT = 10
+# Результаты с более длинным суммарным текстом (символов) не кэшируются:
+# память кэша ограничена не только числом записей, но и их размером
+_EXTRACTION_CACHE_MAX_TEXT_LENGTH = 1024 * 1024
+# Максимальная вложенность контейнеров при обходе JSON и YAML (как у orjson)
+_STRUCTURED_MAX_DEPTH = 1024
+# Максимум строк и контейнеров при обходе YAML с алиасами: алиасы позволяют
+# небольшому файлу описать экспоненциально большое дерево
+_YAML_ALIAS_MAX_ITEMS = 1_000_000
+# Адрес unoserver по умолчанию для LIBREOFFICE_SERVER без хоста или порта
+_UNOSERVER_DEFAULT_HOST = "127.0.0.1"
+_UNOSERVER_DEFAULT_PORT = "2003"
+
+
+# Соответствие расширений языкам программирования для заголовка исходного кода.
+# Собирается один раз при импорте, а не на каждый файл.
+_PROGRAMMING_LANGUAGES: Dict[str, str] = {
+    # Python
+    "py": "Python",
+    "pyx": "Python",
+    "pyi": "Python",
+    "pyw": "Python",
+    # JavaScript/TypeScript
+    "js": "JavaScript",
+    "jsx": "JavaScript",
+    "ts": "TypeScript",
+    "tsx": "TypeScript",
+    "mjs": "JavaScript",
+    "cjs": "JavaScript",
+    # Java
+    "java": "Java",
+    "jav": "Java",
+    # C/C++
+    "c": "C",
+    "cpp": "C++",
+    "cxx": "C++",
+    "cc": "C++",
+    "c++": "C++",
+    "h": "C Header",
+    "hpp": "C++ Header",
+    "hxx": "C++ Header",
+    "h++": "C++ Header",
+    # C#
+    "cs": "C#",
+    "csx": "C#",
+    # PHP
+    "php": "PHP",
+    "php3": "PHP",
+    "php4": "PHP",
+    "php5": "PHP",
+    "phtml": "PHP",
+    # Ruby
+    "rb": "Ruby",
+    "rbw": "Ruby",
+    "rake": "Ruby",
+    "gemspec": "Ruby",
+    # Go
+    "go": "Go",
+    "mod": "Go Module",
+    "sum": "Go Sum",
+    # Rust
+    "rs": "Rust",
+    "rlib": "Rust Library",
+    # Swift
+    "swift": "Swift",
+    # Kotlin
+    "kt": "Kotlin",
+    "kts": "Kotlin Script",
+    # Scala
+    "scala": "Scala",
+    "sc": "Scala",
+    # R
+    "r": "R",
+    "R": "R",
+    "rmd": "R Markdown",
+    "Rmd": "R Markdown",
+    # SQL
+    "sql": "SQL",
+    "ddl": "SQL DDL",
+    "dml": "SQL DML",
+    # Shell
+    "sh": "Shell",
+    "bash": "Bash",
+    "zsh": "Zsh",
+    "fish": "Fish",
+    "ksh": "Ksh",
+    "csh": "Csh",
+    "tcsh": "Tcsh",
+    # PowerShell
+    "ps1": "PowerShell",
+    "psm1": "PowerShell Module",
+    "psd1": "PowerShell Data",
+    # Perl
+    "pl": "Perl",
+    "pm": "Perl Module",
+    "pod": "Perl Documentation",
+    "t": "Perl Test",
+    # Lua
+    "lua": "Lua",
+    # 1C and OneScript
+    "bsl": "1C:Enterprise",
+    "os": "OneScript",
+    # Configuration files
+    "ini": "INI Config",
+    "cfg": "Config",
+    "conf": "Config",
+    "config": "Config",
+    "toml": "TOML",
+    "properties": "Properties",
+    # Web
+    "css": "CSS",
+    "scss": "SCSS",
+    "sass": "Sass",
+    "less": "Less",
+    "styl": "Stylus",
+    # Markup
+    "tex": "LaTeX",
+    "latex": "LaTeX",
+    "rst": "reStructuredText",
+    "adoc": "AsciiDoc",
+    "asciidoc": "AsciiDoc",
+    # Data
+    "jsonl": "JSON Lines",
+    "ndjson": "NDJSON",
+    "jsonc": "JSON with Comments",
+    # Docker
+    "dockerfile": "Dockerfile",
+    "containerfile": "Containerfile",
+    # Makefile
+    "makefile": "Makefile",
+    "mk": "Makefile",
+    "mak": "Makefile",
+    # Git
+    "gitignore": "Git Ignore",
+    "gitattributes": "Git Attributes",
+    "gitmodules": "Git Modules",
+}
+
+
+def _docx_grid_span(value: Optional[str]) -> int:
+    """Число столбцов ячейки DOCX по w:gridSpan: некорректное значение — 1,
+    больше _DOCX_MAX_GRID_SPAN не бывает."""
+    try:
+        span = int(value or 1)
+    except ValueError:
+        return 1
+    return min(max(1, span), _DOCX_MAX_GRID_SPAN)
+
+
+def _parse_unoserver_address(address: str) -> Tuple[str, str]:
+    """Хост и порт unoserver из LIBREOFFICE_SERVER ("host:port", "host",
+    ":port", "[::1]:port"); недостающие части берутся по умолчанию."""
+    address = address.strip()
+    host, sep, port = address.rpartition(":")
+    if not sep or (port and not port.isdigit()) or host.endswith(":"):
+        # Нет порта: "office", "::1" или "[::1]"
+        host, port = address, ""
+    host = host.strip("[]")
+    return host or _UNOSERVER_DEFAULT_HOST, port or _UNOSERVER_DEFAULT_PORT
+
+
+def _structured_strings(data: Any, max_items: Optional[int] = None) -> List[str]:
+    """Непустые строки разобранного JSON или YAML с путями к ним.
+
+    Общий обход для обоих форматов: "a.b[0]: значение". Ключи верхнего
+    уровня выводятся как есть, пустой (ложный) путь не даёт префикса.
+    Обход итеративный, со стеком итераторов: уровень снимается со стека,
+    когда его элементы закончились, порядок документа сохраняется без
+    разворота. На стек кладутся только контейнеры — строки выводятся сразу,
+    путь строится лишь для контейнеров и непустых строк.
+
+    Args:
+        data: Разобранный документ
+        max_items: Максимум выведенных строк и пройденных контейнеров
+            (None — без ограничения)
+
+    Raises:
+        ValueError: Если контейнер ссылается сам на себя (рекурсивный алиас
+            YAML), вложенность больше _STRUCTURED_MAX_DEPTH или превышен
+            max_items
+    """
+    strings = []
+    items_count = 0
+    # (префикс пути, уровень — список, итератор по (ключ, значение),
+    # id контейнера)
+    stack = [("", False, iter((("", data),)), None)]
+    # id контейнеров на текущем пути от корня: повторное появление означает
+    # цикл, который без проверки обходился бы бесконечно
+    path_ids = set()
+    while stack:
+        prefix, is_list, items, _ = stack[-1]
+        for key, value in items:
+            if isinstance(value, str):
+                if value.strip():
+                    if is_list:
+                        path = f"{prefix}[{key}]"
+                    else:
+                        path = f"{prefix}{key}" if prefix else key
+                    strings.append(f"{path}: {value}")
+                    items_count += 1
+                    if max_items is not None and items_count > max_items:
+                        raise ValueError("Too many elements in document")
+                continue
+            if not isinstance(value, (dict, list)):
+                continue
+            value_id = id(value)
+            if value_id in path_ids:
+                raise ValueError("Recursive reference in document")
+            if len(stack) > _STRUCTURED_MAX_DEPTH:
+                raise ValueError("Document nesting is too deep")
+            items_count += 1
+            if max_items is not None and items_count > max_items:
+                raise ValueError("Too many elements in document")
+            if is_list:
+                path = f"{prefix}[{key}]"
+            else:
+                path = f"{prefix}{key}" if prefix else key
+            path_ids.add(value_id)
+            if isinstance(value, dict):
+                stack.append(
+                    (f"{path}." if path else "", False, iter(value.items()), value_id)
+                )
+            else:
+                stack.append((path if path else "", True, enumerate(value), value_id))
+            break
+        else:
+            path_ids.discard(stack.pop()[3])
+
+    return strings
+
+
+def _format_excel_cell(value: Any) -> str:
+    """Строковое представление ячейки calamine в формате DataFrame.to_csv."""
+    # Строки — самый частый тип ячеек: возвращаются без проверок остальных типов
+    if value.__class__ is str:
+        return value
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, float) and value.is_integer():
+        # pandas с движком calamine приводит целые float к int
+        return str(int(value))
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=" ")
+    return str(value)
+
+
+def _lexbor_html_text(text: Union[str, bytes], remove: str = "script, style") -> str:
+    """Текст HTML-документа без нетекстовых элементов через парсер Lexbor.
+
+    Конкатенация текстовых узлов без разделителей, как BeautifulSoup.get_text().
+    Байты декодируются самим Lexbor: по BOM или <meta charset>, иначе как UTF-8.
+    remove — CSS-селектор удаляемых вместе с содержимым элементов.
+    """
+    if isinstance(text, bytes):
+        tree = LexborHTMLParser(text, encoding=True)
+    else:
+        tree = LexborHTMLParser(text)
+    for node in tree.css(remove):
+        node.decompose()
+    root = tree.root
+    if root is None:
+        return ""
+    return root.text(deep=True, separator="", strip=False)
+
+
+# Элементы веб-страницы, текст которых не извлекается: скрипты, стили и
+# навигация
+_WEB_NON_TEXT_TAGS = ["script", "style", "nav", "header", "footer", "aside"]
+_WEB_NON_TEXT_SELECTOR = ", ".join(_WEB_NON_TEXT_TAGS)
+
+
+def _clean_html_text(text: str) -> str:
+    """Разбивка текста HTML на непустые фрагменты по строкам и двойным пробелам."""
+    return "\n".join(
+        filter(None, map(str.strip, text.replace("  ", "\n").splitlines()))
+    )
+
 
 class TextExtractor:
     """Класс для извлечения текста из файлов различных форматов."""
@@ -134,11 +689,178 @@ class TextExtractor:
         """Инициализация экстрактора текста."""
         self.ocr_languages = settings.OCR_LANGUAGES
         self.timeout = settings.PROCESSING_TIMEOUT_SECONDS
-        # Создаем пул потоков для CPU-bound операций
-        self._thread_pool = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        # Создаем пул потоков для CPU-bound операций: OCR изображений PDF
+        # (Tesseract отпускает GIL), главы EPUB, конвертации LibreOffice
+        self._pool_workers = max(1, settings.OCR_WORKERS)
+        self._thread_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._pool_workers
+        )
+        # Парсер Markdown создаётся один раз: правила и регулярные выражения
+        # не собираются заново на каждый файл. parse() не меняет состояние
+        # парсера, поэтому экземпляр общий для всех потоков
+        self._markdown_parser = (
+            MarkdownIt("commonmark") if MarkdownIt is not None else None
+        )
+        # python-markdown хранит состояние разбора в экземпляре Markdown,
+        # поэтому в fallback у каждого потока свой экземпляр
+        self._markdown_local = threading.local()
+        # Экземпляры PyTessBaseAPI по потокам (OCR_IN_PROCESS)
+        self._tesserocr_local = threading.local()
+        # Каталоги LibreOffice: у каждого слота профиль (заполняется при первой
+        # конвертации и затем переиспользуется) и рабочая директория для
+        # файлов конвертации; параллельные конвертации не делят один слот.
+        # Каталог слота создаётся через mkdtemp (случайное имя, права 0700):
+        # заранее подложить его или ссылку на его месте нельзя. PID в имени
+        # нужен cleanup_temp_files, чтобы удалить каталоги завершившихся
+        # процессов
+        self._libreoffice_dirs: List[str] = []
+        self._libreoffice_profiles: queue.Queue = queue.Queue()
+        for _ in range(self._pool_workers):
+            slot_dir = tempfile.mkdtemp(
+                prefix=f"extract-text-libreoffice-{os.getpid()}-"
+            )
+            os.mkdir(os.path.join(slot_dir, "work"))
+            self._libreoffice_dirs.append(slot_dir)
+            self._libreoffice_profiles.put(slot_dir)
+        # LRU-кэш результатов извлечения: ключ — хэш содержимого и имя файла,
+        # значение — результат и занимаемая его текстом память в байтах
+        self._result_cache: OrderedDict = OrderedDict()
+        self._result_cache_memory = 0
+        self._result_cache_lock = threading.Lock()
 
     def extract_text(self, file_content: bytes, filename: str) -> List[Dict[str, Any]]:
         """Основной метод извлечения текста (теперь синхронный для выполнения в threadpool)."""
+        # Извлечение — чистая функция от содержимого и имени файла, поэтому
+        # повторная загрузка того же файла обслуживается из кэша
+        cache_key = None
+        if settings.EXTRACTION_CACHE_SIZE > 0:
+            cache_key = (
+                hashlib.blake2b(file_content, digest_size=16).digest(),
+                filename,
+            )
+            cached = self._get_cached_result(cache_key)
+            if cached is not None:
+                logger.debug(f"Результат извлечения для {filename} взят из кэша")
+                return cached
+
+        result = self._extract_text_uncached(file_content, filename)
+
+        if cache_key is not None:
+            self._store_cached_result(cache_key, result)
+
+        return result
+
+    def warmup(
+        self,
+        executor: Optional[concurrent.futures.ThreadPoolExecutor] = None,
+        executor_workers: int = 0,
+    ) -> None:
+        """
+        Прогрев экстрактора при старте сервиса.
+
+        Импортирует отложенные библиотеки форматов и выполняет пробный OCR
+        маленького изображения: Tesseract и языковые данные попадают в page
+        cache до первого реального запроса. При OCR_IN_PROCESS пробный OCR
+        выполняется в каждом потоке пула экстрактора и переданного пула
+        executor (executor_workers потоков), чтобы экземпляры PyTessBaseAPI
+        с загруженными моделями были готовы заранее. Ошибки прогрева не
+        мешают запуску.
+        """
+        start_time = time.time()
+
+        # pandas не прогревается: он нужен только как fallback для Excel
+        missing = [
+            name
+            for name, library in (
+                ("pdfplumber", pdfplumber),
+                ("python-docx", Document),
+                ("python-pptx", Presentation),
+            )
+            if not library
+        ]
+        if missing:
+            logger.warning(f"Не установлены библиотеки форматов: {', '.join(missing)}")
+
+        if Image is not None:
+            try:
+                if tesserocr is not None and settings.OCR_IN_PROCESS:
+                    # Экземпляр API свой у каждого потока: загрузка моделей
+                    # в одном потоке не ускоряет первый OCR в остальных
+                    self._warmup_ocr_threads(self._thread_pool, self._pool_workers)
+                    if executor is not None:
+                        self._warmup_ocr_threads(executor, executor_workers)
+                else:
+                    self._safe_tesseract_ocr(Image.new("RGB", (32, 32), "white"))
+            except Exception as e:
+                logger.warning(f"Прогрев Tesseract не удался: {str(e)}")
+
+        logger.info(f"Прогрев экстрактора завершён за {time.time() - start_time:.2f}с")
+
+    def _warmup_ocr_threads(
+        self, pool: concurrent.futures.ThreadPoolExecutor, workers: int
+    ) -> None:
+        """Пробный OCR в каждом из workers потоков пула."""
+        if workers <= 0:
+            return
+
+        # Задача держит поток, пока остальные задачи не разобраны: пул
+        # не отдаст две задачи одному потоку и создаст все потоки
+        barrier = threading.Barrier(workers, timeout=_OCR_WARMUP_TIMEOUT)
+
+        def warmup_thread() -> None:
+            barrier.wait()
+            self._safe_tesseract_ocr(Image.new("RGB", (32, 32), "white"))
+
+        futures = [pool.submit(warmup_thread) for _ in range(workers)]
+        for future in futures:
+            future.result()
+
+    def _get_cached_result(self, cache_key: tuple) -> Optional[List[Dict[str, Any]]]:
+        """Получение результата извлечения из LRU-кэша."""
+        with self._result_cache_lock:
+            entry = self._result_cache.get(cache_key)
+            if entry is None:
+                return None
+            self._result_cache.move_to_end(cache_key)
+            result = entry[0]
+
+        # Копии словарей: вызывающий код может изменять результат
+        return [dict(item) for item in result]
+
+    def _store_cached_result(
+        self, cache_key: tuple, result: List[Dict[str, Any]]
+    ) -> None:
+        """Сохранение результата извлечения в LRU-кэш."""
+        texts = [item.get("text") or "" for item in result]
+        if sum(map(len, texts)) > _EXTRACTION_CACHE_MAX_TEXT_LENGTH:
+            return
+
+        # Память строки зависит от символов: 1, 2 или 4 байта на символ
+        # (латиница, кириллица, символы вне BMP), поэтому считается по
+        # sys.getsizeof, а не по длине
+        memory = sum(map(sys.getsizeof, texts))
+        if memory > settings.EXTRACTION_CACHE_MAX_MEMORY:
+            return
+
+        with self._result_cache_lock:
+            previous = self._result_cache.pop(cache_key, None)
+            if previous is not None:
+                self._result_cache_memory -= previous[1]
+            self._result_cache[cache_key] = ([dict(item) for item in result], memory)
+            self._result_cache_memory += memory
+            # Вытесняются самые давние записи, пока кэш не уложится и в число
+            # записей, и в объём памяти
+            while (
+                len(self._result_cache) > settings.EXTRACTION_CACHE_SIZE
+                or self._result_cache_memory > settings.EXTRACTION_CACHE_MAX_MEMORY
+            ):
+                _, (_, evicted_memory) = self._result_cache.popitem(last=False)
+                self._result_cache_memory -= evicted_memory
+
+    def _extract_text_uncached(
+        self, file_content: bytes, filename: str
+    ) -> List[Dict[str, Any]]:
+        """Извлечение текста без обращения к кэшу."""
         # Проверка, является ли файл архивом
         if is_archive_format(filename, settings.SUPPORTED_FORMATS):
             return self._extract_from_archive(file_content, filename)
@@ -183,125 +905,341 @@ class TextExtractor:
         self, content: bytes, extension: str, filename: str
     ) -> str:
         """Извлечение текста в зависимости от формата (синхронная версия)."""
-        # Создаем словарь сопоставления расширений с методами извлечения
-        extraction_methods = self._get_extraction_methods_mapping()
-
         # Проверяем, является ли файл исходным кодом
-        source_code_extensions = settings.SUPPORTED_FORMATS.get("source_code", [])
-        if extension in source_code_extensions:
+        if extension in settings.SUPPORTED_FORMAT_SETS["source_code"]:
             return self._extract_from_source_code_sync(content, extension, filename)
 
-        # Ищем подходящий метод извлечения
-        extractor_method = extraction_methods.get(extension)
-        if extractor_method:
-            return str(extractor_method(content))
+        # Ищем подходящий метод извлечения (одна hash-проверка)
+        method_name = _EXTRACTION_METHODS.get(extension)
+        if method_name is None:
+            raise ValueError(f"Unsupported file format: {extension}")
 
-        # Проверяем группы расширений
-        for extensions_group, method in self._get_group_extraction_methods():
-            if extension in extensions_group:
-                return str(method(content))
-
-        raise ValueError(f"Unsupported file format: {extension}")
-
-    def _get_extraction_methods_mapping(self) -> dict:
-        """Получение словаря сопоставления расширений с методами извлечения."""
-        return {
-            "pdf": self._extract_from_pdf_sync,
-            "docx": self._extract_from_docx_sync,
-            "doc": self._extract_from_doc_sync,
-            "csv": self._extract_from_csv_sync,
-            "pptx": self._extract_from_pptx_sync,
-            "ppt": self._extract_from_ppt_sync,
-            "txt": self._extract_from_txt_sync,
-            "json": self._extract_from_json_sync,
-            "rtf": self._extract_from_rtf_sync,
-            "odt": self._extract_from_odt_sync,
-            "xml": self._extract_from_xml_sync,
-            "epub": self._extract_from_epub_sync,
-            "eml": self._extract_from_eml_sync,
-            "msg": self._extract_from_msg_sync,
-        }
-
-    def _get_group_extraction_methods(self) -> list:
-        """Получение списка групп расширений с соответствующими методами."""
-        return [
-            (["xls", "xlsx"], self._extract_from_excel_sync),
-            (
-                ["jpg", "jpeg", "png", "tiff", "tif", "bmp", "gif"],
-                self._extract_from_image_sync,
-            ),
-            (["html", "htm"], self._extract_from_html_sync),
-            (["md", "markdown"], self._extract_from_markdown_sync),
-            (["yaml", "yml"], self._extract_from_yaml_sync),
-        ]
+        return str(getattr(self, method_name)(content))
 
     def _extract_from_pdf_sync(self, content: bytes) -> str:
         """Синхронное извлечение текста из PDF."""
         if not pdfplumber:
             raise ImportError("pdfplumber не установлен")
 
-        text_parts = []
-        temp_file_path = None
+        # Текст страниц, уже прочитанных через PDFium; pdfplumber разбирает
+        # только страницы с изображениями для OCR
+        page_blocks = None
+        ocr_pages = None
+        if settings.PDF_FAST_TEXT_EXTRACTION:
+            pdfium_result = self._extract_pdf_text_with_pdfium(content)
+            if pdfium_result is not None:
+                page_blocks, ocr_pages = pdfium_result
+                if not ocr_pages:
+                    return "\n\n".join(filter(None, page_blocks))
 
         try:
-            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp_file:
-                temp_file.write(content)
-                temp_file_path = temp_file.name
+            # pdfplumber принимает file-like объект: работаем прямо из памяти,
+            # без записи/чтения временного файла на диске
+            with pdfplumber.open(io.BytesIO(content), pages=ocr_pages) as pdf:
+                # pdfminer и PDFium читают один и тот же поток документа и не
+                # потокобезопасны: разбор страниц и рендеринг изображений идут
+                # под блокировкой, а сам Tesseract (отдельный процесс) — в пуле
+                # потоков параллельно для всех страниц
+                render_lock = threading.Lock()
+                with render_lock:
+                    pdf_pages = pdf.pages
+                if page_blocks is None:
+                    page_blocks = [""] * len(pdf_pages)
+                    ocr_pages = range(1, len(pdf_pages) + 1)
+
+                pages = []
+                early_batches = []
+                pending = []
+                try:
+                    for page_num, page in zip(ocr_pages, pdf_pages):
+                        page_texts, images = self._extract_pdf_page_content(
+                            page, page_num, render_lock
+                        )
+                        pages.append((page_num, page_texts, images))
+                        pending.extend((page, img) for img in images)
+
+                        # Полные пакеты уходят в Tesseract сразу: распознавание
+                        # идёт в отдельных процессах параллельно с разбором текста
+                        # следующих страниц, а не после него
+                        full = len(pending) - len(pending) % _OCR_BATCH_MAX_IMAGES
+                        if full:
+                            early_batches.extend(
+                                self._submit_pdf_ocr_batches(
+                                    pending[:full], render_lock, _OCR_BATCH_MAX_IMAGES
+                                )
+                            )
+                            del pending[:full]
+                except Exception:
+                    # Документ закрывается при выходе из with: отправленные
+                    # пакеты отменяются или дорабатывают до его закрытия
+                    for future, _ in early_batches:
+                        future.cancel()
+                    concurrent.futures.wait([future for future, _ in early_batches])
+                    raise
+
+                # Остаток изображений делится между воркерами; весь OCR
+                # завершается до закрытия документа
+                tail_texts = self._ocr_pdf_images(pending, render_lock)
+                image_texts = iter(
+                    self._collect_pdf_ocr_batches(early_batches) + tail_texts
+                )
 
-            with pdfplumber.open(temp_file_path) as pdf:
-                for page_num, page in enumerate(pdf.pages, 1):
-                    page_texts = self._extract_pdf_page_content(page, page_num)
-                    text_parts.extend(page_texts)
+            # Собираем результаты в порядке страниц
+            for page_num, page_texts, images in pages:
+                text_parts = list(page_texts)
+                for img_idx in range(len(images)):
+                    image_text = next(image_texts)
+                    if image_text.strip():
+                        text_parts.append(f"[Изображение {img_idx + 1}]\n{image_text}")
+                page_blocks[page_num - 1] = "\n\n".join(text_parts)
 
-            return "\n\n".join(text_parts)
+            return "\n\n".join(filter(None, page_blocks))
 
         except Exception as e:
             logger.error(f"Ошибка при обработке PDF: {str(e)}")
             raise ValueError(f"Error processing PDF: {str(e)}")
-        finally:
-            self._cleanup_temp_file(temp_file_path)
 
-    def _extract_pdf_page_content(self, page, page_num: int) -> list:
-        """Извлечение содержимого страницы PDF."""
+    def _extract_pdf_text_with_pdfium(
+        self, content: bytes
+    ) -> Optional[Tuple[List[str], List[int]]]:
+        """
+        Быстрое извлечение текста PDF через PDFium.
+
+        Returns:
+            Optional[tuple]: текст каждой страницы (пустая строка для страниц
+            с изображениями для OCR) и номера таких страниц — их разбирает
+            pdfplumber; None, если PDFium не открыл файл
+        """
+        if not pdfium:
+            return None
+
+        min_area = settings.MIN_OCR_IMAGE_AREA
         page_texts = []
+        ocr_pages = []
+        with _PDFIUM_LOCK:
+            try:
+                pdf = pdfium.PdfDocument(content)
+            except pdfium.PdfiumError as e:
+                logger.debug(f"PDFium не открыл PDF, используем pdfplumber: {e}")
+                return None
+
+            try:
+                for page_index in range(len(pdf)):
+                    page = pdf[page_index]
+                    try:
+                        images = page.get_objects(
+                            filter=(pdfium.raw.FPDF_PAGEOBJ_IMAGE,)
+                        )
+                        # Мелкие изображения (логотипы, маркеры) pdfplumber
+                        # всё равно не отправит в OCR: такие страницы остаются
+                        # на быстром пути
+                        if any(
+                            (right - left) * (top - bottom) >= min_area
+                            for left, bottom, right, top in (
+                                image.get_bounds() for image in images
+                            )
+                        ):
+                            page_texts.append("")
+                            ocr_pages.append(page_index + 1)
+                            continue
+                        textpage = page.get_textpage()
+                        try:
+                            page_text = textpage.get_text_range()
+                        finally:
+                            textpage.close()
+                    finally:
+                        page.close()
+
+                    # PDFium разделяет строки \r\n и оставляет пробел в конце
+                    # строки; приводим к виду pdfplumber
+                    page_text = "\n".join(
+                        line.rstrip() for line in page_text.splitlines()
+                    ).strip()
+                    page_texts.append(
+                        f"[Страница {page_index + 1}]\n{page_text}" if page_text else ""
+                    )
+            finally:
+                pdf.close()
+
+        return page_texts, ocr_pages
+
+    def _extract_pdf_page_content(
+        self, page, page_num: int, render_lock: threading.Lock
+    ) -> tuple:
+        """
+        Извлечение содержимого страницы PDF.
+
+        Returns:
+            tuple: тексты страницы и список её изображений для OCR
+        """
+        page_texts = []
+
+        with render_lock:
+            # Извлечение текста со страницы
+            page_text = page.extract_text()
+            # Список изображений берём один раз: для страниц без изображений
+            # OCR-ветка не выполняется вовсе
+            images = page.images
+
+        min_area = settings.MIN_OCR_IMAGE_AREA
+        if images and min_area > 0:
+            # Мелкие изображения (логотипы, маркеры, иконки) не рендерим и не
+            # отправляем в Tesseract
+            ocr_images = [
+                img
+                for img in images
+                if abs(img["x1"] - img["x0"]) * abs(img["y1"] - img["y0"]) >= min_area
+            ]
+            skipped = len(images) - len(ocr_images)
+            if skipped:
+                logger.debug(
+                    f"Страница {page_num}: пропущено мелких изображений: {skipped}"
+                )
+            images = ocr_images
 
-        # Извлечение текста со страницы
-        page_text = page.extract_text()
         if page_text:
             page_texts.append(f"[Страница {page_num}]\n{page_text}")
 
-        # Извлечение изображений и OCR
-        if page.images:
-            page_texts.extend(self._extract_pdf_page_images(page))
+        return page_texts, images
 
-        return page_texts
+    def _ocr_pdf_images(self, items: list, render_lock: threading.Lock) -> list:
+        """
+        OCR изображений PDF пакетами в пуле потоков.
 
-    def _extract_pdf_page_images(self, page) -> list:
-        """Извлечение текста из изображений на странице PDF."""
-        image_texts = []
+        Args:
+            items: пары (страница, описание изображения) в порядке документа
+            render_lock: блокировка доступа к потоку документа
 
-        for img_idx, img in enumerate(page.images):
+        Returns:
+            list: распознанный текст для каждого элемента items
+        """
+        if not items:
+            return []
+
+        # Изображения делятся между воркерами пула, но не больше
+        # _OCR_BATCH_MAX_IMAGES на один запуск Tesseract
+        batch_size = min(_OCR_BATCH_MAX_IMAGES, -(-len(items) // self._pool_workers))
+        return self._collect_pdf_ocr_batches(
+            self._submit_pdf_ocr_batches(items, render_lock, batch_size)
+        )
+
+    def _submit_pdf_ocr_batches(
+        self, items: list, render_lock: threading.Lock, batch_size: int
+    ) -> list:
+        """Отправка изображений PDF в пул потоков пакетами по batch_size.
+
+        Returns:
+            list: пары (future, число изображений в пакете)
+        """
+        batches = []
+        for i in range(0, len(items), batch_size):
+            batch = items[i : i + batch_size]
+            future = self._thread_pool.submit(
+                self._ocr_pdf_images_batch, batch, render_lock
+            )
+            batches.append((future, len(batch)))
+        return batches
+
+    def _collect_pdf_ocr_batches(self, batches: list) -> list:
+        """Тексты пакетов OCR в порядке отправки; пакет с ошибкой даёт пустые строки."""
+        texts = []
+        for future, size in batches:
             try:
-                image_text = self._ocr_from_pdf_image_sync(page, img)
-                if image_text.strip():
-                    image_texts.append(f"[Изображение {img_idx + 1}]\n{image_text}")
+                texts.extend(future.result())
             except Exception as e:
-                logger.warning(f"Ошибка OCR изображения {img_idx + 1}: {str(e)}")
+                logger.warning(f"Ошибка OCR пакета изображений PDF: {str(e)}")
+                texts.extend([""] * size)
+        return texts
 
-        return image_texts
+    def _ocr_pdf_images_batch(self, items: list, render_lock: threading.Lock) -> list:
+        """OCR пакета изображений PDF одним запуском Tesseract."""
+        if len(items) == 1:
+            page, img_info = items[0]
+            return [self._ocr_from_pdf_image_sync(page, img_info, render_lock)]
 
-    def _cleanup_temp_file(self, temp_file_path: str) -> None:
-        """Безопасное удаление временного файла."""
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.unlink(temp_file_path)
-            except OSError as e:
-                logger.warning(
-                    f"Не удалось удалить временный файл {temp_file_path}: {str(e)}"
-                )
+        texts = [""] * len(items)
+        if not Image:
+            return texts
+
+        # Отрендеренная целиком страница для альтернативного пути: изображения
+        # одной страницы идут подряд и обрезаются из одного рендера
+        page_render_cache: dict = {}
+        # Без запуска tesseract пакет не нужен: изображения распознаются
+        # экземпляром API потока по одному, без сохранения в файлы и без
+        # временного каталога
+        if self._tesserocr_api() is not None:
+            for idx, (page, img_info) in enumerate(items):
+                with render_lock:
+                    image = self._render_pdf_image_sync(
+                        page, img_info, page_render_cache
+                    )
+                if image is not None:
+                    texts[idx] = self._safe_tesseract_ocr(
+                        self._prepare_image_for_ocr(image)
+                    )
+            return texts
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            image_paths = []
+            indexes = []
+            for idx, (page, img_info) in enumerate(items):
+                with render_lock:
+                    image = self._render_pdf_image_sync(
+                        page, img_info, page_render_cache
+                    )
+                if image is None:
+                    continue
+
+                image_path = os.path.join(temp_dir, f"image_{idx}.png")
+                try:
+                    # Оттенки серого (или бинаризация) и уменьшение до
+                    # OCR_MAX_IMAGE_EDGE — как для отдельных изображений
+                    image = self._prepare_image_for_ocr(image)
+                    # Конвертируем в RGB для совместимости с PNG
+                    if image.mode in ("RGBA", "LA", "P"):
+                        image = image.convert("RGB")
+                    image.save(image_path, "PNG")
+                except Exception as e:
+                    logger.warning(f"Ошибка OCR изображения: {str(e)}")
+                    continue
+
+                image_paths.append(image_path)
+                indexes.append(idx)
+
+            if not image_paths:
+                return texts
+
+            batch_texts = self._safe_tesseract_ocr_batch(image_paths)
+            if batch_texts is None:
+                # Пакетный запуск не удался: распознаём изображения по одному
+                batch_texts = [
+                    self._safe_tesseract_ocr(None, image_path)
+                    for image_path in image_paths
+                ]
+
+            for idx, text in zip(indexes, batch_texts):
+                texts[idx] = text
+
+        return texts
 
     def _extract_from_docx_sync(self, content: bytes) -> str:
         """Синхронное извлечение текста из DOCX с полным извлечением согласно п.3.3 ТЗ."""
+        # Быстрый путь: прямой разбор XML через lxml без построения объектной
+        # модели python-docx. python-docx остаётся fallback'ом для
+        # повреждённых или нестандартных файлов.
+        if lxml_etree is not None:
+            try:
+                return self._extract_docx_from_xml(content)
+            except (
+                zipfile.BadZipFile,
+                KeyError,
+                ValueError,
+                lxml_etree.XMLSyntaxError,
+            ) as e:
+                logger.debug(
+                    f"Прямой разбор XML DOCX не удался, используем python-docx: {str(e)}"
+                )
+
         if not Document:
             raise ImportError("python-docx не установлен")
 
@@ -324,11 +1262,7 @@ class TextExtractor:
 
     def _extract_docx_paragraphs(self, doc) -> list:
         """Извлечение основного текста из параграфов DOCX."""
-        text_parts = []
-        for paragraph in doc.paragraphs:
-            if paragraph.text.strip():
-                text_parts.append(paragraph.text)
-        return text_parts
+        return self._extract_section_text(doc.paragraphs)
 
     def _extract_docx_tables(self, doc) -> list:
         """Извлечение текста из таблиц DOCX."""
@@ -337,8 +1271,15 @@ class TextExtractor:
             table_text = []
             for row in table.rows:
                 row_text = []
+                previous_cell = None
                 for cell in row.cells:
-                    row_text.append(cell.text.strip())
+                    # Ячейка с gridSpan повторяется в row.cells тем же объектом:
+                    # _Cell.text собирает строку из XML заново при каждом
+                    # обращении, поэтому текст берётся у предыдущей копии
+                    if cell is not previous_cell:
+                        cell_text = cell.text.strip()
+                        previous_cell = cell
+                    row_text.append(cell_text)
                 table_text.append("\t".join(row_text))
 
             if table_text:
@@ -366,10 +1307,13 @@ class TextExtractor:
 
     def _extract_section_text(self, paragraphs) -> list:
         """Извлечение текста из параграфов секции."""
+        # Paragraph.text собирает строку из XML при каждом обращении —
+        # читаем его один раз
         text_parts = []
         for paragraph in paragraphs:
-            if paragraph.text.strip():
-                text_parts.append(paragraph.text)
+            paragraph_text = paragraph.text
+            if paragraph_text.strip():
+                text_parts.append(paragraph_text)
         return text_parts
 
     def _extract_docx_footnotes(self, doc) -> list:
@@ -404,78 +1348,297 @@ class TextExtractor:
             logger.debug(f"Не удалось извлечь комментарии из DOCX: {str(e)}")
         return text_parts
 
-    def _extract_from_doc_sync(self, content: bytes) -> str:
-        """Синхронное извлечение текста из DOC через конвертацию в DOCX с помощью LibreOffice."""
-        if not Document:
-            raise ImportError("python-docx не установлен")
+    def _extract_docx_from_xml(self, content: bytes) -> str:
+        """Извлечение текста из DOCX прямым разбором XML-частей.
+
+        Структура результата совпадает с python-docx путём: параграфы тела,
+        таблицы, колонтитулы по секциям, комментарии.
+        """
+        with zipfile.ZipFile(io.BytesIO(content)) as docx_zip:
+            relationships = self._read_docx_relationships(docx_zip)
+            paragraphs, tables, sections = self._iterparse_docx_body(docx_zip)
+
+            text_parts = paragraphs + tables
+            text_parts.extend(
+                self._extract_docx_xml_headers_footers(
+                    docx_zip, sections, relationships
+                )
+            )
+            text_parts.extend(self._extract_docx_xml_comments(docx_zip, relationships))
+
+        return "\n\n".join(text_parts)
+
+    def _iterparse_docx_body(self, docx_zip: zipfile.ZipFile) -> tuple:
+        """Потоковый разбор word/document.xml.
+
+        Элементы верхнего уровня тела (параграфы, таблицы, свойства секций)
+        обрабатываются по событию end и сразу удаляются из дерева, поэтому
+        пиковая память ограничена самым крупным элементом, а не всем документом.
+
+        Returns:
+            tuple: (параграфы, таблицы, ссылки на колонтитулы по секциям)
+        """
+        name = "word/document.xml"
+        self._check_docx_part_size(docx_zip, name)
+
+        paragraphs = []
+        tables = []
+        sections = []
+        body_found = False
+        with docx_zip.open(name) as stream:
+            for _event, element in lxml_etree.iterparse(
+                stream,
+                events=("end",),
+                tag=(_W_P, _W_TBL, _W_SECT_PR),
+                resolve_entities=False,
+                no_network=True,
+            ):
+                parent = element.getparent()
+                # Вложенные параграфы (в таблицах) и sectPr внутри pPr
+                # обрабатываются вместе со своим элементом верхнего уровня
+                if parent is None or parent.tag != _W_BODY:
+                    continue
+                body_found = True
+
+                if element.tag == _W_P:
+                    text = self._docx_paragraph_text(element)
+                    if text.strip():
+                        paragraphs.append(text)
+                    sect_pr = element.find(f"{_W}pPr/{_W_SECT_PR}")
+                    if sect_pr is not None:
+                        sections.append(self._docx_section_references(sect_pr))
+                elif element.tag == _W_TBL:
+                    rows = self._docx_table_rows(element)
+                    if rows:
+                        tables.append("\n".join(rows))
+                else:
+                    sections.append(self._docx_section_references(element))
+
+                element.clear()
+                while element.getprevious() is not None:
+                    del parent[0]
+
+        if not body_found:
+            raise KeyError(f"{name}: w:body")
+        return paragraphs, tables, sections
+
+    def _docx_section_references(self, sect_pr) -> dict:
+        """rId основных (default) колонтитулов секции: тег ссылки -> rId."""
+        references = {}
+        for reference in sect_pr:
+            if reference.tag in _DOCX_HEADER_FOOTER_REFERENCES and (
+                reference.get(_W + "type") == "default"
+            ):
+                references[reference.tag] = reference.get("{" + _R_NS + "}id")
+        return references
 
+    def _check_docx_part_size(self, docx_zip: zipfile.ZipFile, name: str) -> None:
+        """Защита от zip-бомбы: размер распакованной части DOCX ограничен."""
+        self._check_ooxml_part_size(docx_zip, name, "DOCX")
+
+    def _read_docx_xml_part(self, docx_zip: zipfile.ZipFile, name: str):
+        """Чтение и разбор XML-части DOCX с защитой от zip-бомбы и XXE."""
+        return self._read_ooxml_xml_part(docx_zip, name, "DOCX")
+
+    def _read_docx_relationships(self, docx_zip: zipfile.ZipFile) -> dict:
+        """Чтение связей основного документа: rId -> (тип, путь части в архиве)."""
+        return self._read_ooxml_relationships(docx_zip, "word/document.xml", "DOCX")
+
+    def _check_ooxml_part_size(
+        self, package_zip: zipfile.ZipFile, name: str, format_name: str
+    ) -> None:
+        """Защита от zip-бомбы: размер распакованной части OOXML-пакета ограничен."""
+        info = package_zip.getinfo(name)
+        if info.file_size > settings.MAX_EXTRACTED_SIZE:
+            raise ValueError(
+                f"Error processing {format_name}: "
+                f"part {name} exceeds maximum extracted size"
+            )
+
+    def _read_ooxml_xml_part(
+        self, package_zip: zipfile.ZipFile, name: str, format_name: str
+    ):
+        """Чтение и разбор XML-части OOXML-пакета с защитой от zip-бомбы и XXE."""
+        self._check_ooxml_part_size(package_zip, name, format_name)
+
+        parser = lxml_etree.XMLParser(resolve_entities=False, no_network=True)
+        return lxml_etree.fromstring(package_zip.read(name), parser=parser)
+
+    def _read_ooxml_relationships(
+        self, package_zip: zipfile.ZipFile, part_name: str, format_name: str
+    ) -> dict:
+        """Чтение связей части OOXML-пакета: rId -> (тип, путь части в архиве)."""
+        part_dir, part_file = posixpath.split(part_name)
         try:
-            # Создаем временные файлы
-            with tempfile.NamedTemporaryFile(suffix=".doc", delete=False) as temp_doc:
-                temp_doc.write(content)
-                temp_doc_path = temp_doc.name
+            rels = self._read_ooxml_xml_part(
+                package_zip,
+                posixpath.join(part_dir, "_rels", part_file + ".rels"),
+                format_name,
+            )
+        except KeyError:
+            return {}
 
-            # Создаем временную директорию для вывода
-            temp_dir = tempfile.mkdtemp()
+        relationships = {}
+        for rel in rels.iter("{" + _PKG_REL_NS + "}Relationship"):
+            if rel.get("TargetMode") == "External":
+                continue
+            target = rel.get("Target", "")
+            if target.startswith("/"):
+                target_part = target.lstrip("/")
+            else:
+                target_part = posixpath.normpath(posixpath.join(part_dir, target))
+            relationships[rel.get("Id")] = (rel.get("Type", ""), target_part)
+        return relationships
+
+    def _docx_paragraph_text(self, paragraph) -> str:
+        """Текст параграфа по тем же правилам, что и Paragraph.text в python-docx."""
+        parts = []
+        for child in paragraph:
+            if child.tag == _W_R:
+                runs = (child,)
+            elif child.tag == _W_HYPERLINK:
+                runs = child.iterchildren(_W_R)
+            else:
+                continue
 
-            try:
-                # Конвертируем .doc в .docx с помощью LibreOffice с ограничениями ресурсов
-                from .config import settings
-                from .utils import run_subprocess_with_limits
-
-                result = run_subprocess_with_limits(
-                    command=[
-                        "libreoffice",
-                        "--headless",
-                        "--convert-to",
-                        "docx",
-                        "--outdir",
-                        temp_dir,
-                        temp_doc_path,
-                    ],
-                    timeout=30,
-                    memory_limit=settings.MAX_LIBREOFFICE_MEMORY,
-                    capture_output=True,
-                    text=True,
-                )
+            for run in runs:
+                for item in run:
+                    if item.tag == _W_T:
+                        if item.text:
+                            parts.append(item.text)
+                    elif item.tag == _W_BR:
+                        # Разрывы страниц/колонок текста не дают
+                        if item.get(_W + "type", "textWrapping") == "textWrapping":
+                            parts.append("\n")
+                    else:
+                        char = _DOCX_RUN_CHARS.get(item.tag)
+                        if char:
+                            parts.append(char)
+        return "".join(parts)
 
-                if result.returncode != 0:
-                    logger.error(f"LibreOffice conversion failed: {result.stderr}")
-                    raise ValueError("Failed to convert DOC to DOCX")
+    def _docx_table_rows(self, table) -> list:
+        """Строки таблицы DOCX: ячейки через табуляцию.
 
-                # Находим сконвертированный файл
-                doc_filename = os.path.splitext(os.path.basename(temp_doc_path))[0]
-                docx_path = os.path.join(temp_dir, f"{doc_filename}.docx")
+        Объединённые ячейки разворачиваются так же, как row.cells в python-docx:
+        gridSpan повторяет ячейку, продолжение vMerge берёт текст ячейки выше.
+        """
+        paragraph_text = self._docx_paragraph_text
+        rows = []
+        previous_row = {}
+        for tr in table.iterchildren(_W_TR):
+            cells = []
+            current_row = {}
+            column = 0
+            for tc in tr.iterchildren(_W_TC):
+                span = 1
+                merged_from_above = False
+                texts = []
+                # Один проход по детям ячейки вместо find() по путям с
+                # пространством имён: на больших таблицах поиск по пути
+                # занимал большую часть времени разбора
+                for child in tc:
+                    tag = child.tag
+                    if tag == _W_P:
+                        texts.append(paragraph_text(child))
+                    elif tag == _W_TC_PR:
+                        for prop in child:
+                            if prop.tag == _W_GRID_SPAN:
+                                span = _docx_grid_span(prop.get(_W_VAL))
+                            elif prop.tag == _W_V_MERGE:
+                                merged_from_above = (
+                                    prop.get(_W_VAL, "continue") == "continue"
+                                )
+
+                if merged_from_above:
+                    cell_text = previous_row.get(column, "")
+                else:
+                    cell_text = "\n".join(texts).strip()
 
-                if not os.path.exists(docx_path):
-                    raise ValueError("Converted DOCX file not found")
+                for offset in range(span):
+                    current_row[column + offset] = cell_text
+                cells.extend([cell_text] * span)
+                column += span
 
-                # Читаем сконвертированный DOCX файл
-                with open(docx_path, "rb") as docx_file:
-                    docx_content = docx_file.read()
+            previous_row = current_row
+            rows.append("\t".join(cells))
+        return rows
 
-                # Используем синхронный метод для извлечения текста из DOCX
-                text = self._extract_from_docx_sync(docx_content)
+    def _docx_part_paragraphs(self, docx_zip: zipfile.ZipFile, part_name: str) -> list:
+        """Непустые параграфы верхнего уровня XML-части (колонтитул, комментарий)."""
+        root = self._read_docx_xml_part(docx_zip, part_name)
+        return self._docx_element_paragraphs(root)
 
-                return text
+    def _docx_element_paragraphs(self, element) -> list:
+        """Непустые тексты дочерних параграфов элемента."""
+        text_parts = []
+        for paragraph in element.iterchildren(_W_P):
+            text = self._docx_paragraph_text(paragraph)
+            if text.strip():
+                text_parts.append(text)
+        return text_parts
 
-            finally:
-                # Очищаем временные файлы
-                try:
-                    os.unlink(temp_doc_path)
-                except Exception as e:
-                    logger.warning(
-                        f"Не удалось удалить временный файл {temp_doc_path}: {e}"
+    def _extract_docx_xml_headers_footers(
+        self, docx_zip: zipfile.ZipFile, sections: list, relationships: dict
+    ) -> list:
+        """Колонтитулы по секциям с наследованием от предыдущей секции."""
+        text_parts = []
+        # Секция без собственного колонтитула наследует его от предыдущей
+        current_parts = {}
+        parsed_parts = {}
+        for section in sections:
+            for reference_tag, label in _DOCX_HEADER_FOOTER_REFERENCES.items():
+                relationship = relationships.get(section.get(reference_tag))
+                if relationship:
+                    current_parts[reference_tag] = relationship[1]
+
+                part_name = current_parts.get(reference_tag)
+                if not part_name:
+                    continue
+                if part_name not in parsed_parts:
+                    parsed_parts[part_name] = self._docx_part_paragraphs(
+                        docx_zip, part_name
                     )
+                if parsed_parts[part_name]:
+                    text_parts.append(
+                        f"[Колонтитул - {label}]\n{' '.join(parsed_parts[part_name])}"
+                    )
+        return text_parts
 
-                try:
-                    import shutil
+    def _extract_docx_xml_comments(
+        self, docx_zip: zipfile.ZipFile, relationships: dict
+    ) -> list:
+        """Комментарии DOCX из части comments.xml."""
+        comments_text = []
+        for rel_type, part_name in relationships.values():
+            if not rel_type.endswith("/comments"):
+                continue
+            try:
+                root = self._read_docx_xml_part(docx_zip, part_name)
+            except KeyError:
+                continue
+            for comment in root.iterchildren(_W + "comment"):
+                comments_text.extend(self._docx_element_paragraphs(comment))
 
-                    shutil.rmtree(temp_dir, ignore_errors=True)
-                except Exception as e:
-                    logger.warning(
-                        f"Не удалось удалить временную директорию {temp_dir}: {e}"
-                    )
+        if comments_text:
+            return [f"[Комментарии]\n{' '.join(comments_text)}"]
+        return []
+
+    def _extract_from_doc_sync(self, content: bytes) -> str:
+        """Синхронное извлечение текста из DOC через конвертацию в DOCX с помощью LibreOffice."""
+        if not Document:
+            raise ImportError("python-docx не установлен")
+
+        try:
+            # Быстрый путь: antiword отдаёт текст без конвертации в DOCX
+            text = self._extract_doc_with_antiword(content)
+            if text is not None:
+                return text
+
+            # Конвертируем .doc в .docx с помощью LibreOffice с ограничениями ресурсов
+            docx_content = self._convert_with_libreoffice(content, "doc", "docx")
+
+            # Используем синхронный метод для извлечения текста из DOCX
+            return self._extract_from_docx_sync(docx_content)
 
         except subprocess.TimeoutExpired:
             logger.error("LibreOffice conversion timeout")
@@ -487,8 +1650,216 @@ class TextExtractor:
             logger.error(f"Ошибка при обработке DOC: {str(e)}")
             raise ValueError(f"Error processing DOC: {str(e)}")
 
+    def _extract_doc_with_antiword(self, content: bytes) -> Optional[str]:
+        """
+        Извлечение текста из DOC через antiword.
+
+        Возвращает None, если antiword недоступен или не справился с файлом
+        (зашифрованные и нестандартные DOC) — тогда используется LibreOffice.
+        """
+        if not shutil.which("antiword"):
+            return None
+
+        from .utils import run_subprocess_with_limits
+
+        # antiword читает OLE-контейнер с произвольным доступом, stdin не подходит
+        with tempfile.NamedTemporaryFile(suffix=".doc", delete=False) as temp_doc:
+            temp_doc.write(content)
+            temp_doc_path = temp_doc.name
+
+        try:
+            result = run_subprocess_with_limits(
+                command=["antiword", "-w", "0", "-m", "UTF-8.txt", temp_doc_path],
+                timeout=10,
+                capture_output=True,
+                text=False,
+            )
+        except (subprocess.TimeoutExpired, MemoryError) as e:
+            logger.warning(f"antiword не справился, используем LibreOffice: {e}")
+            return None
+        finally:
+            try:
+                os.unlink(temp_doc_path)
+            except Exception as e:
+                logger.warning(
+                    f"Не удалось удалить временный файл {temp_doc_path}: {e}"
+                )
+
+        if result.returncode != 0:
+            logger.info(
+                f"antiword завершился с кодом {result.returncode}, используем LibreOffice"
+            )
+            return None
+
+        text = result.stdout.decode("utf-8", errors="replace").strip()
+        return text or None
+
+    def _convert_with_libreoffice(
+        self, content: bytes, source_format: str, target_format: str
+    ) -> bytes:
+        """
+        Конвертация документа через LibreOffice с ограничениями ресурсов.
+
+        Каждая конвертация занимает свободный профиль из пула: прогретый
+        профиль не создаётся заново при каждом запуске, а одновременные
+        запуски не конфликтуют из-за общего профиля. Число параллельных
+        конвертаций ограничено размером пула. Вместе с профилем занимается
+        его рабочая директория для исходного и сконвертированного файлов.
+
+        Args:
+            content: Содержимое исходного файла
+            source_format: Расширение исходного файла (doc, ppt)
+            target_format: Формат результата (docx, pptx)
+
+        Returns:
+            bytes: Содержимое сконвертированного файла
+        """
+        if settings.LIBREOFFICE_SERVER:
+            converted = self._convert_with_unoserver(
+                content, source_format, target_format
+            )
+            if converted is not None:
+                return converted
+
+        from .utils import run_subprocess_with_limits
+
+        try:
+            slot_dir = self._libreoffice_profiles.get(
+                timeout=settings.PROCESSING_TIMEOUT_SECONDS
+            )
+        except queue.Empty:
+            raise ValueError("LibreOffice conversion queue timeout")
+
+        # Рабочая директория закреплена за слотом, как и профиль: она создана
+        # вместе с ним, а после конвертации из неё удаляются только файлы
+        profile_dir = os.path.join(slot_dir, "profile")
+        work_dir = os.path.join(slot_dir, "work")
+        source_path = os.path.join(work_dir, f"source.{source_format}")
+        target_path = os.path.join(work_dir, f"source.{target_format}")
+
+        try:
+            with open(source_path, "wb") as source_file:
+                source_file.write(content)
+
+            result = run_subprocess_with_limits(
+                command=[
+                    "libreoffice",
+                    f"-env:UserInstallation={Path(profile_dir).as_uri()}",
+                    "--headless",
+                    "--convert-to",
+                    target_format,
+                    "--outdir",
+                    work_dir,
+                    source_path,
+                ],
+                timeout=30,
+                memory_limit=settings.MAX_LIBREOFFICE_MEMORY,
+                capture_output=True,
+                text=True,
+            )
+
+            if result.returncode != 0:
+                logger.error(f"LibreOffice conversion failed: {result.stderr}")
+                raise ValueError(
+                    f"Failed to convert {source_format.upper()} "
+                    f"to {target_format.upper()}"
+                )
+
+            if not os.path.exists(target_path):
+                raise ValueError(f"Converted {target_format.upper()} file not found")
+
+            # Читаем сконвертированный файл
+            with open(target_path, "rb") as target_file:
+                return target_file.read()
+
+        finally:
+            # Очищаем файлы конвертации до возврата профиля в пул: следующая
+            # конвертация не увидит чужой результат
+            for path in (source_path, target_path):
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    logger.warning(f"Не удалось удалить временный файл {path}: {e}")
+            self._libreoffice_profiles.put(slot_dir)
+
+    def _convert_with_unoserver(
+        self, content: bytes, source_format: str, target_format: str
+    ) -> Optional[bytes]:
+        """
+        Конвертация документа через запущенный unoserver (LIBREOFFICE_SERVER).
+
+        LibreOffice уже запущен и прогрет, поэтому конвертация не платит за
+        старт процесса. Возвращает None, если клиент unoconvert не установлен,
+        сервер недоступен, не ответил за отведённое время или не справился —
+        тогда LibreOffice запускается локально.
+        """
+        if not shutil.which("unoconvert"):
+            logger.warning("unoconvert не найден, используем локальный LibreOffice")
+            return None
+
+        from .utils import run_subprocess_with_limits
+
+        host, port = _parse_unoserver_address(settings.LIBREOFFICE_SERVER)
+        # Документ передаётся через stdin, результат читается из stdout: без
+        # временных файлов, и сервер может работать на другом хосте
+        try:
+            result = run_subprocess_with_limits(
+                command=[
+                    "unoconvert",
+                    "--host",
+                    host,
+                    "--port",
+                    port,
+                    "--convert-to",
+                    target_format,
+                    "-",
+                    "-",
+                ],
+                timeout=30,
+                capture_output=True,
+                text=False,
+                input=content,
+            )
+        except subprocess.TimeoutExpired:
+            logger.warning(
+                f"unoserver {host}:{port} не ответил за 30 секунд, "
+                f"используем локальный LibreOffice"
+            )
+            return None
+        except OSError as e:
+            logger.warning(
+                f"Не удалось запустить unoconvert, используем локальный "
+                f"LibreOffice: {str(e)}"
+            )
+            return None
+
+        if result.returncode != 0 or not result.stdout:
+            stderr = (result.stderr or b"").decode("utf-8", errors="replace")
+            logger.warning(
+                f"unoserver не сконвертировал {source_format.upper()} "
+                f"(код {result.returncode}), используем локальный LibreOffice: "
+                f"{stderr}"
+            )
+            return None
+
+        return result.stdout
+
+    def _remove_libreoffice_profiles(self) -> None:
+        """Удаление профилей LibreOffice и их рабочих директорий (при завершении работы)."""
+        for slot_dir in self._libreoffice_dirs:
+            shutil.rmtree(slot_dir, ignore_errors=True)
+
     def _extract_from_excel_sync(self, content: bytes) -> str:
         """Синхронное извлечение данных из Excel файлов."""
+        if CalamineWorkbook is not None:
+            try:
+                return self._extract_excel_with_calamine(content)
+            except Exception as e:
+                logger.error(f"Ошибка при обработке Excel: {str(e)}")
+                raise ValueError(f"Error processing Excel: {str(e)}")
+
         if not pd:
             raise ImportError("pandas не установлен")
 
@@ -506,14 +1877,60 @@ class TextExtractor:
             logger.error(f"Ошибка при обработке Excel: {str(e)}")
             raise ValueError(f"Error processing Excel: {str(e)}")
 
+    def _extract_excel_with_calamine(self, content: bytes) -> str:
+        """
+        Извлечение листов Excel через calamine без построения DataFrame.
+
+        Формат повторяет pd.read_excel(...).to_csv(index=False): первая строка
+        листа — заголовок, пустые строки пропускаются, пустые ячейки заголовка
+        получают имена "Unnamed: N".
+        """
+        workbook = CalamineWorkbook.from_filelike(io.BytesIO(content))
+        text_parts = []
+
+        for sheet_name in workbook.sheet_names:
+            # iter_rows отдаёт строки по одной, не создавая Python-объекты
+            # всех ячеек листа сразу, как to_python
+            rows = workbook.get_sheet_by_name(sheet_name).iter_rows()
+            output = io.StringIO()
+            writer = csv.writer(output, lineterminator="\n")
+            header_written = False
+
+            for row in rows:
+                cells = [_format_excel_cell(value) for value in row]
+                if not any(cells):
+                    continue
+                if not header_written:
+                    cells = [
+                        cell or f"Unnamed: {index}" for index, cell in enumerate(cells)
+                    ]
+                    header_written = True
+                writer.writerow(cells)
+
+            text_parts.append(f"[Лист: {sheet_name}]")
+            text_parts.append(output.getvalue())
+
+        return "\n\n".join(text_parts)
+
     def _extract_from_csv_sync(self, content: bytes) -> str:
         """Синхронное извлечение данных из CSV файлов."""
-        if not pd:
-            raise ImportError("pandas не установлен")
-
         try:
-            df = pd.read_csv(io.BytesIO(content))
-            return str(df.to_csv(index=False))
+            # Потоковая обработка stdlib csv вместо построения DataFrame:
+            # строки читаются и пишутся без приведения типов и NumPy-массивов
+            text = self._decode_text_content(content).lstrip("\ufeff")
+            # Без кавычек поля не содержат разделителей строк, и запись через
+            # csv.writer возвращает строку без изменений: разбор и сборка
+            # сводятся к нормализации переводов строк и пропуску пустых строк
+            if '"' not in text and "\x00" not in text:
+                lines = text.replace("\r\n", "\n")
+                if "\r" not in lines:
+                    return "".join(f"{line}\n" for line in lines.split("\n") if line)
+
+            output = io.StringIO()
+            writer = csv.writer(output, lineterminator="\n")
+            # Пустые строки пропускаются, как и в pandas.read_csv
+            writer.writerows(row for row in csv.reader(io.StringIO(text)) if row)
+            return output.getvalue()
 
         except Exception as e:
             logger.error(f"Ошибка при обработке CSV: {str(e)}")
@@ -521,6 +1938,22 @@ class TextExtractor:
 
     def _extract_from_pptx_sync(self, content: bytes) -> str:
         """Синхронное извлечение текста из PPTX с полным извлечением согласно п.3.3 ТЗ."""
+        # Быстрый путь: разбор XML слайдов и заметок через lxml. python-pptx
+        # распаковывает все части пакета, включая изображения и видео, и
+        # остаётся fallback'ом для повреждённых или нестандартных файлов.
+        if lxml_etree is not None:
+            try:
+                return self._extract_pptx_from_xml(content)
+            except (
+                zipfile.BadZipFile,
+                KeyError,
+                ValueError,
+                lxml_etree.XMLSyntaxError,
+            ) as e:
+                logger.debug(
+                    f"Прямой разбор XML PPTX не удался, используем python-pptx: {str(e)}"
+                )
+
         if not Presentation:
             raise ImportError("python-pptx не установлен")
 
@@ -532,21 +1965,32 @@ class TextExtractor:
                 slide_text = []
                 slide_text.append(f"[Слайд {slide_num}]")
 
-                # Извлечение текста из фигур слайда
+                # Извлечение текста из фигур слайда. shape.text собирает строку
+                # из XML при каждом обращении, поэтому читаем его один раз.
                 for shape in slide.shapes:
-                    if hasattr(shape, "text") and shape.text.strip():
-                        slide_text.append(shape.text)
+                    if not shape.has_text_frame:
+                        continue
+                    shape_text = shape.text
+                    if shape_text.strip():
+                        slide_text.append(shape_text)
 
-                # Извлечение заметок спикера - согласно п.3.3 ТЗ
+                # Извлечение заметок спикера - согласно п.3.3 ТЗ. Обращение
+                # к slide.notes_slide создаёт слайд заметок из мастера, если
+                # его нет, поэтому сначала проверяется has_notes_slide
                 try:
-                    if hasattr(slide, "notes_slide") and slide.notes_slide:
+                    if slide.has_notes_slide:
                         notes_text = []
                         # Извлечение заметок из текстовых фигур
                         for shape in slide.notes_slide.shapes:
-                            if hasattr(shape, "text") and shape.text.strip():
-                                # Фильтруем стандартные заголовки PowerPoint
-                                if shape.text.strip() not in ["Заметки", "Notes"]:
-                                    notes_text.append(shape.text.strip())
+                            if not shape.has_text_frame:
+                                continue
+                            shape_text = shape.text.strip()
+                            # Фильтруем стандартные заголовки PowerPoint
+                            if (
+                                shape_text
+                                and shape_text not in _PPTX_NOTES_PLACEHOLDERS
+                            ):
+                                notes_text.append(shape_text)
 
                         if notes_text:
                             slide_text.append(
@@ -566,78 +2010,110 @@ class TextExtractor:
             logger.error(f"Ошибка при обработке PPTX: {str(e)}")
             raise ValueError(f"Error processing PPTX: {str(e)}")
 
-    def _extract_from_ppt_sync(self, content: bytes) -> str:
-        """Синхронное извлечение текста из PPT через конвертацию в PPTX с помощью LibreOffice."""
-        if not Presentation:
-            raise ImportError("python-pptx не установлен")
+    def _extract_pptx_from_xml(self, content: bytes) -> str:
+        """Извлечение текста из PPTX прямым разбором XML-частей.
 
-        try:
-            # Создаем временные файлы
-            with tempfile.NamedTemporaryFile(suffix=".ppt", delete=False) as temp_ppt:
-                temp_ppt.write(content)
-                temp_ppt_path = temp_ppt.name
+        Читаются только presentation.xml, слайды и заметки к ним — медиа не
+        распаковываются. Структура результата совпадает с python-pptx путём.
+        """
+        presentation_part = "ppt/presentation.xml"
+        text_parts = []
+
+        with zipfile.ZipFile(io.BytesIO(content)) as pptx_zip:
+            presentation = self._read_ooxml_xml_part(
+                pptx_zip, presentation_part, "PPTX"
+            )
+            relationships = self._read_ooxml_relationships(
+                pptx_zip, presentation_part, "PPTX"
+            )
 
-            # Создаем временную директорию для вывода
-            temp_dir = tempfile.mkdtemp()
+            slide_ids = presentation.iterfind(f"{_P}sldIdLst/{_P}sldId")
+            for slide_num, slide_id in enumerate(slide_ids, 1):
+                slide_part = relationships[slide_id.get("{" + _R_NS + "}id")][1]
+                slide = self._read_ooxml_xml_part(pptx_zip, slide_part, "PPTX")
 
-            try:
-                # Конвертируем .ppt в .pptx с помощью LibreOffice с ограничениями ресурсов
-                from .config import settings
-                from .utils import run_subprocess_with_limits
-
-                result = run_subprocess_with_limits(
-                    command=[
-                        "libreoffice",
-                        "--headless",
-                        "--convert-to",
-                        "pptx",
-                        "--outdir",
-                        temp_dir,
-                        temp_ppt_path,
-                    ],
-                    timeout=30,
-                    memory_limit=settings.MAX_LIBREOFFICE_MEMORY,
-                    capture_output=True,
-                    text=True,
+                slide_text = [f"[Слайд {slide_num}]"]
+                slide_text.extend(
+                    text for text in self._pptx_shape_texts(slide) if text.strip()
                 )
 
-                if result.returncode != 0:
-                    logger.error(f"LibreOffice conversion failed: {result.stderr}")
-                    raise ValueError("Failed to convert PPT to PPTX")
+                # Извлечение заметок спикера - согласно п.3.3 ТЗ
+                notes_text = self._extract_pptx_xml_notes(
+                    pptx_zip, slide_part, slide_num
+                )
+                if notes_text:
+                    slide_text.append(f"[Заметки спикера]\n{' '.join(notes_text)}")
 
-                # Находим сконвертированный файл
-                ppt_filename = os.path.splitext(os.path.basename(temp_ppt_path))[0]
-                pptx_path = os.path.join(temp_dir, f"{ppt_filename}.pptx")
+                if len(slide_text) > 1:  # Больше чем просто заголовок слайда
+                    text_parts.append("\n".join(slide_text))
 
-                if not os.path.exists(pptx_path):
-                    raise ValueError("Converted PPTX file not found")
+        return "\n\n".join(text_parts)
 
-                # Читаем сконвертированный PPTX файл
-                with open(pptx_path, "rb") as pptx_file:
-                    pptx_content = pptx_file.read()
+    def _extract_pptx_xml_notes(
+        self, pptx_zip: zipfile.ZipFile, slide_part: str, slide_num: int
+    ) -> list:
+        """Непустые тексты заметок спикера к слайду без стандартных заголовков."""
+        try:
+            relationships = self._read_ooxml_relationships(pptx_zip, slide_part, "PPTX")
+            notes = [
+                self._read_ooxml_xml_part(pptx_zip, part_name, "PPTX")
+                for rel_type, part_name in relationships.values()
+                if rel_type.endswith("/notesSlide")
+            ]
+        except (KeyError, lxml_etree.XMLSyntaxError) as e:
+            logger.debug(
+                f"Не удалось извлечь заметки спикера со слайда {slide_num}: {str(e)}"
+            )
+            return []
 
-                # Используем синхронный метод для извлечения текста из PPTX
-                text = self._extract_from_pptx_sync(pptx_content)
+        notes_text = []
+        for notes_slide in notes[:1]:
+            for text in self._pptx_shape_texts(notes_slide):
+                text = text.strip()
+                if text and text not in _PPTX_NOTES_PLACEHOLDERS:
+                    notes_text.append(text)
+        return notes_text
+
+    def _pptx_shape_texts(self, part_root) -> list:
+        """Тексты фигур верхнего уровня слайда по правилам python-pptx.
+
+        Как и slide.shapes, учитываются только фигуры p:sp, лежащие прямо в
+        дереве фигур: группы, таблицы и изображения текстовой рамки не имеют.
+        Параграфы разделяются переводом строки, разрыв строки a:br даёт
+        вертикальную табуляцию, как в python-pptx.
+        """
+        sp_tree = part_root.find(f"{_P}cSld/{_P}spTree")
+        if sp_tree is None:
+            return []
 
-                return text
+        texts = []
+        for shape in sp_tree.iterchildren(_P_SP):
+            tx_body = shape.find(_P_TX_BODY)
+            if tx_body is None:
+                continue
+            paragraphs = []
+            for paragraph in tx_body.iterchildren(_A_P):
+                parts = []
+                for child in paragraph:
+                    if child.tag in _PPTX_TEXT_RUNS:
+                        parts.append(child.findtext(_A_T) or "")
+                    elif child.tag == _PPTX_LINE_BREAK:
+                        parts.append("\v")
+                paragraphs.append("".join(parts))
+            texts.append("\n".join(paragraphs))
+        return texts
 
-            finally:
-                # Очищаем временные файлы
-                try:
-                    os.unlink(temp_ppt_path)
-                except Exception as e:
-                    logger.warning(
-                        f"Не удалось удалить временный файл {temp_ppt_path}: {e}"
-                    )
+    def _extract_from_ppt_sync(self, content: bytes) -> str:
+        """Синхронное извлечение текста из PPT через конвертацию в PPTX с помощью LibreOffice."""
+        if not Presentation:
+            raise ImportError("python-pptx не установлен")
 
-                try:
-                    import shutil
+        try:
+            # Конвертируем .ppt в .pptx с помощью LibreOffice с ограничениями ресурсов
+            pptx_content = self._convert_with_libreoffice(content, "ppt", "pptx")
 
-                    shutil.rmtree(temp_dir, ignore_errors=True)
-                except Exception as e:
-                    logger.warning(
-                        f"Не удалось удалить временную директорию {temp_dir}: {e}"
-                    )
+            # Используем синхронный метод для извлечения текста из PPTX
+            return self._extract_from_pptx_sync(pptx_content)
 
         except subprocess.TimeoutExpired:
             logger.error("LibreOffice conversion timeout")
@@ -659,9 +2135,39 @@ class TextExtractor:
 
     def _decode_text_content(self, content: bytes) -> str:
         """Декодирование содержимого с автоопределением кодировки."""
-        encodings = self._get_encoding_list()
+        for bom, encoding in _BOM_ENCODINGS:
+            if content.startswith(bom):
+                decoded_text = self._try_decode_with_encoding(content, encoding)
+                if decoded_text is not None:
+                    return decoded_text
+                break
+
+        # Быстрый путь: подавляющее большинство файлов в UTF-8 —
+        # один проход декодера без перебора кодировок
+        try:
+            decoded_text = content.decode("utf-8")
+            if self._is_decoding_quality_good(decoded_text):
+                return decoded_text
+        except UnicodeDecodeError:
+            pass
+
+        # Кандидата выбираем по начальному фрагменту, а целиком файл
+        # декодируем только выбранной кодировкой
+        sample = content[:_ENCODING_PROBE_SIZE]
+        if charset_normalizer is not None:
+            best_match = charset_normalizer.from_bytes(
+                sample, cp_isolation=_CHARSET_DETECTION_ENCODINGS
+            ).best()
+            if best_match is not None:
+                decoded_text = self._try_decode_with_encoding(
+                    content, best_match.encoding
+                )
+                if decoded_text is not None:
+                    return decoded_text
 
-        for encoding in encodings:
+        for encoding in self._get_encoding_list()[1:]:
+            if self._probe_encoding(sample, encoding) is None:
+                continue
             decoded_text = self._try_decode_with_encoding(content, encoding)
             if decoded_text is not None:
                 return decoded_text
@@ -689,6 +2195,26 @@ class TextExtractor:
             "ascii",  # ASCII (базовая кодировка)
         ]
 
+    def _probe_encoding(self, sample: bytes, encoding: str) -> Optional[str]:
+        """Пробное декодирование начального фрагмента файла.
+
+        Используется инкрементальный декодер с final=False, чтобы обрезанный
+        на границе фрагмента многобайтовый символ не считался ошибкой.
+        """
+        try:
+            decoder = codecs.getincrementaldecoder(encoding)()
+            decoded_text = decoder.decode(sample, final=False)
+        except UnicodeError:
+            return None
+
+        if not self._is_decoding_quality_good(decoded_text):
+            return None
+
+        if not self._is_mac_cyrillic_valid(decoded_text, encoding):
+            return None
+
+        return decoded_text
+
     def _try_decode_with_encoding(self, content: bytes, encoding: str) -> str:
         """Попытка декодирования с проверкой качества."""
         try:
@@ -739,8 +2265,10 @@ class TextExtractor:
 
     def _has_valid_cyrillic_ratio(self, text: str) -> bool:
         """Проверка соотношения кириллицы и латиницы."""
-        cyrillic_count = sum(1 for char in text if "\u0400" <= char <= "\u04ff")
-        latin_count = sum(1 for char in text if "a" <= char.lower() <= "z")
+        # Буквы считаются сериями в C-движке регулярных выражений, а не
+        # посимвольным циклом по всему тексту
+        cyrillic_count = sum(map(len, _CYRILLIC_RUN_RE.findall(text)))
+        latin_count = sum(map(len, _LATIN_RUN_RE.findall(text)))
         total_letters = cyrillic_count + latin_count
 
         if total_letters == 0:
@@ -779,127 +2307,7 @@ class TextExtractor:
 
     def _get_language_map(self) -> dict:
         """Получение словаря соответствия расширений языкам программирования."""
-        return {
-            # Python
-            "py": "Python",
-            "pyx": "Python",
-            "pyi": "Python",
-            "pyw": "Python",
-            # JavaScript/TypeScript
-            "js": "JavaScript",
-            "jsx": "JavaScript",
-            "ts": "TypeScript",
-            "tsx": "TypeScript",
-            "mjs": "JavaScript",
-            "cjs": "JavaScript",
-            # Java
-            "java": "Java",
-            "jav": "Java",
-            # C/C++
-            "c": "C",
-            "cpp": "C++",
-            "cxx": "C++",
-            "cc": "C++",
-            "c++": "C++",
-            "h": "C Header",
-            "hpp": "C++ Header",
-            "hxx": "C++ Header",
-            "h++": "C++ Header",
-            # C#
-            "cs": "C#",
-            "csx": "C#",
-            # PHP
-            "php": "PHP",
-            "php3": "PHP",
-            "php4": "PHP",
-            "php5": "PHP",
-            "phtml": "PHP",
-            # Ruby
-            "rb": "Ruby",
-            "rbw": "Ruby",
-            "rake": "Ruby",
-            "gemspec": "Ruby",
-            # Go
-            "go": "Go",
-            "mod": "Go Module",
-            "sum": "Go Sum",
-            # Rust
-            "rs": "Rust",
-            "rlib": "Rust Library",
-            # Swift
-            "swift": "Swift",
-            # Kotlin
-            "kt": "Kotlin",
-            "kts": "Kotlin Script",
-            # Scala
-            "scala": "Scala",
-            "sc": "Scala",
-            # R
-            "r": "R",
-            "R": "R",
-            "rmd": "R Markdown",
-            "Rmd": "R Markdown",
-            # SQL
-            "sql": "SQL",
-            "ddl": "SQL DDL",
-            "dml": "SQL DML",
-            # Shell
-            "sh": "Shell",
-            "bash": "Bash",
-            "zsh": "Zsh",
-            "fish": "Fish",
-            "ksh": "Ksh",
-            "csh": "Csh",
-            "tcsh": "Tcsh",
-            # PowerShell
-            "ps1": "PowerShell",
-            "psm1": "PowerShell Module",
-            "psd1": "PowerShell Data",
-            # Perl
-            "pl": "Perl",
-            "pm": "Perl Module",
-            "pod": "Perl Documentation",
-            "t": "Perl Test",
-            # Lua
-            "lua": "Lua",
-            # 1C and OneScript
-            "bsl": "1C:Enterprise",
-            "os": "OneScript",
-            # Configuration files
-            "ini": "INI Config",
-            "cfg": "Config",
-            "conf": "Config",
-            "config": "Config",
-            "toml": "TOML",
-            "properties": "Properties",
-            # Web
-            "css": "CSS",
-            "scss": "SCSS",
-            "sass": "Sass",
-            "less": "Less",
-            "styl": "Stylus",
-            # Markup
-            "tex": "LaTeX",
-            "latex": "LaTeX",
-            "rst": "reStructuredText",
-            "adoc": "AsciiDoc",
-            "asciidoc": "AsciiDoc",
-            # Data
-            "jsonl": "JSON Lines",
-            "ndjson": "NDJSON",
-            "jsonc": "JSON with Comments",
-            # Docker
-            "dockerfile": "Dockerfile",
-            "containerfile": "Containerfile",
-            # Makefile
-            "makefile": "Makefile",
-            "mk": "Makefile",
-            "mak": "Makefile",
-            # Git
-            "gitignore": "Git Ignore",
-            "gitattributes": "Git Attributes",
-            "gitmodules": "Git Modules",
-        }
+        return _PROGRAMMING_LANGUAGES
 
     def _create_source_code_header(
         self, language: str, filename: str, text: str
@@ -907,8 +2315,8 @@ class TextExtractor:
         """Создание заголовка для файла исходного кода."""
         header = f"=== {language} File: {filename} ===\n"
 
-        lines = text.split("\n")
-        line_count = len(lines)
+        # Подсчёт переводов строк без построения списка всех строк файла
+        line_count = text.count("\n") + 1
         header += f"Lines: {line_count}\n"
 
         # Если файл слишком длинный, добавляем предупреждение
@@ -919,12 +2327,19 @@ class TextExtractor:
 
     def _extract_from_html_sync(self, content: bytes) -> str:
         """Синхронное извлечение текста из HTML."""
-        if not BeautifulSoup:
+        if LexborHTMLParser is None and not BeautifulSoup:
             raise ImportError("beautifulsoup4 не установлен")
 
         try:
-            text = content.decode("utf-8", errors="replace")
-            soup = BeautifulSoup(text, "html.parser")
+            text = self._decode_text_content(content)
+
+            if LexborHTMLParser is not None:
+                # Разбор и сбор текста целиком в C без построения дерева
+                # Python-объектов BeautifulSoup
+                return _clean_html_text(_lexbor_html_text(text))
+
+            # C-парсер lxml (как и в веб-экстракторе) вместо pure-Python html.parser
+            soup = BeautifulSoup(text, "lxml")
 
             # Удаление script и style тегов
             for script in soup(["script", "style"]):
@@ -933,10 +2348,10 @@ class TextExtractor:
             # Получение текста
             text = soup.get_text()
 
-            # Очистка от лишних пробелов
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            return "\n".join(chunk for chunk in chunks if chunk)
+            # Очистка от лишних пробелов: каждый фрагмент между переводами строк
+            # и двойными пробелами — отдельная строка, пустые отбрасываются.
+            # Цепочка replace/splitlines/map/filter целиком выполняется в C.
+            return _clean_html_text(text)
 
         except Exception as e:
             logger.error(f"Ошибка при обработке HTML: {str(e)}")
@@ -945,11 +2360,21 @@ class TextExtractor:
     def _extract_from_markdown_sync(self, content: bytes) -> str:
         """Синхронное извлечение текста из Markdown."""
         try:
-            text = content.decode("utf-8", errors="replace")
+            text = self._decode_text_content(content)
+
+            if self._markdown_parser is not None:
+                # Текст берётся прямо из токенов: без рендеринга в HTML
+                # и повторного разбора HTML через BeautifulSoup
+                return self._markdown_tokens_to_text(text)
 
             if markdown:
                 # Конвертация в HTML и извлечение текста
-                html = markdown.markdown(text)
+                md = getattr(self._markdown_local, "markdown", None)
+                if md is None:
+                    md = self._markdown_local.markdown = markdown.Markdown()
+                html = md.reset().convert(text)
+                if LexborHTMLParser is not None:
+                    return _lexbor_html_text(html)
                 if BeautifulSoup:
                     soup = BeautifulSoup(html, "html.parser")
                     return str(soup.get_text())
@@ -961,44 +2386,72 @@ class TextExtractor:
             logger.error(f"Ошибка при обработке Markdown: {str(e)}")
             raise ValueError(f"Error processing Markdown: {str(e)}")
 
+    def _markdown_tokens_to_text(self, text: str) -> str:
+        """Извлечение текста Markdown из потока токенов markdown-it-py."""
+        tokens = self._markdown_parser.parse(text)
+        blocks = []
+        for token in tokens:
+            if token.type == "inline":
+                # Встроенные HTML-теги (html_inline) отбрасываются, их текст
+                # приходит отдельными text-токенами — как get_text() по HTML
+                parts = []
+                for child in token.children or ():
+                    if child.type in ("text", "code_inline"):
+                        parts.append(child.content)
+                    elif child.type in ("softbreak", "hardbreak"):
+                        parts.append("\n")
+                if parts:
+                    blocks.append("".join(parts))
+            elif token.type in ("fence", "code_block"):
+                blocks.append(token.content.rstrip("\n"))
+            elif token.type == "html_block":
+                block_text = _HTML_TAG_RE.sub("", token.content).strip()
+                if block_text:
+                    blocks.append(block_text)
+        return "\n".join(blocks)
+
     def _extract_from_json_sync(self, content: bytes) -> str:
         """Синхронное извлечение текста из JSON."""
-        import json
-
         try:
-            text = content.decode("utf-8", errors="replace")
-            data = json.loads(text)
-
-            # Рекурсивное извлечение всех строковых значений
-            def extract_strings(obj, path=""):
-                strings = []
-                if isinstance(obj, dict):
-                    for key, value in obj.items():
-                        new_path = f"{path}.{key}" if path else key
-                        strings.extend(extract_strings(value, new_path))
-                elif isinstance(obj, list):
-                    for i, value in enumerate(obj):
-                        new_path = f"{path}[{i}]" if path else f"[{i}]"
-                        strings.extend(extract_strings(value, new_path))
-                elif isinstance(obj, str):
-                    if obj.strip():
-                        strings.append(f"{path}: {obj}")
-                return strings
-
-            strings = extract_strings(data)
-            return "\n".join(strings)
+            data = self._parse_json(content)
+            return "\n".join(_structured_strings(data))
 
         except Exception as e:
             logger.error(f"Ошибка при обработке JSON: {str(e)}")
             raise ValueError(f"Error processing JSON: {str(e)}")
 
+    def _parse_json(self, content: bytes) -> Any:
+        """Разбор JSON: orjson при наличии, иначе stdlib json."""
+        if orjson is not None:
+            try:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError:
+                # orjson строже stdlib (NaN, числа вне int64, невалидный UTF-8) —
+                # повторяем разбор прежним способом
+                pass
+
+        # json.loads принимает bytes и сам определяет UTF-8/16/32 (в т.ч. BOM) —
+        # без промежуточной строки. Файлы в однобайтовых кодировках (cp1251 и
+        # т.п.) декодируем один раз кодировкой, выбранной по началу файла.
+        try:
+            return json.loads(content)
+        except UnicodeDecodeError:
+            return json.loads(self._decode_text_content(content))
+
     def _extract_from_rtf_sync(self, content: bytes) -> str:
         """Синхронное извлечение текста из RTF."""
         if not rtf_to_text:
             raise ImportError("striprtf не установлен")
 
         try:
-            text = content.decode("utf-8", errors="replace")
+            # RTF — 7-битный ASCII с escape-последовательностями (\'XX, \uN),
+            # кодовую страницу для них striprtf берёт из \ansicpg. Сырые 8-битные
+            # байты (нестандартные генераторы) декодируем без потерь через
+            # latin-1 вместо UTF-8 с заменой на U+FFFD.
+            try:
+                text = content.decode("utf-8")
+            except UnicodeDecodeError:
+                text = content.decode("latin-1")
             plain_text = rtf_to_text(text)
             return str(plain_text)
 
@@ -1008,37 +2461,97 @@ class TextExtractor:
 
     def _extract_from_xml_sync(self, content: bytes) -> str:
         """Синхронное извлечение текста из XML."""
+        # Быстрый путь: потоковый разбор lxml без построения всего дерева.
+        # При ошибке разбора (в т.ч. невалидный UTF-8) работает прежний путь
+        # через defusedxml, который и формирует итоговую ошибку
+        if lxml_etree is not None:
+            try:
+                return self._extract_xml_with_iterparse(content)
+            except lxml_etree.XMLSyntaxError as e:
+                logger.debug(f"Потоковый разбор XML не удался: {str(e)}")
+
         try:
             text = content.decode("utf-8", errors="replace")
             root = ET.fromstring(text)
+            return "\n".join(self._extract_xml_element_strings(root))
 
-            # Рекурсивное извлечение всех элементов и атрибутов
-            def extract_from_element(elem, path=""):
-                strings = []
+        except Exception as e:
+            logger.error(f"Ошибка при обработке XML: {str(e)}")
+            raise ValueError(f"Error processing XML: {str(e)}")
 
-                current_path = f"{path}.{elem.tag}" if path else elem.tag
+    def _extract_xml_element_strings(self, root) -> list:
+        """Текст и атрибуты всех элементов дерева XML в порядке документа.
 
-                # Добавляем текст элемента
-                if elem.text and elem.text.strip():
-                    strings.append(f"{current_path}: {elem.text.strip()}")
+        Обход с явным стеком: глубокая вложенность не упирается в лимит
+        рекурсии, а строки сразу пишутся в один список без копирования
+        списков дочерних элементов на каждом уровне.
+        """
+        strings = []
+        stack = [(root, root.tag)]
+        while stack:
+            elem, path = stack.pop()
 
-                # Добавляем атрибуты
-                for attr_name, attr_value in elem.attrib.items():
-                    if attr_value.strip():
-                        strings.append(f"{current_path}@{attr_name}: {attr_value}")
+            # Добавляем текст элемента
+            if elem.text and elem.text.strip():
+                strings.append(f"{path}: {elem.text.strip()}")
 
-                # Рекурсивно обрабатываем дочерние элементы
-                for child in elem:
-                    strings.extend(extract_from_element(child, current_path))
+            # Добавляем атрибуты
+            for attr_name, attr_value in elem.attrib.items():
+                if attr_value.strip():
+                    strings.append(f"{path}@{attr_name}: {attr_value}")
 
-                return strings
+            # Дочерние элементы в обратном порядке: первый снимается со стека первым
+            stack.extend((child, f"{path}.{child.tag}") for child in reversed(elem))
 
-            strings = extract_from_element(root)
-            return "\n".join(strings)
+        return strings
 
-        except Exception as e:
-            logger.error(f"Ошибка при обработке XML: {str(e)}")
-            raise ValueError(f"Error processing XML: {str(e)}")
+    def _extract_xml_with_iterparse(self, content: bytes) -> str:
+        """Потоковое извлечение текста и атрибутов XML через lxml.iterparse.
+
+        Порядок строк совпадает с рекурсивным обходом: текст элемента, его
+        атрибуты, затем дочерние элементы. Атрибуты доступны уже на событии
+        start, а текст — только на end, поэтому под него заранее резервируется
+        позиция. Обработанные элементы сразу очищаются. Сущности не
+        раскрываются, сеть не используется (защита от XXE).
+        """
+        strings = []
+        # Стек (путь элемента, индекс зарезервированной строки текста)
+        stack = []
+
+        for event, elem in lxml_etree.iterparse(
+            io.BytesIO(content),
+            events=("start", "end"),
+            resolve_entities=False,
+            no_network=True,
+            remove_comments=True,
+            remove_pis=True,
+        ):
+            if event == "start":
+                path = f"{stack[-1][0]}.{elem.tag}" if stack else elem.tag
+                stack.append((path, len(strings)))
+                strings.append(None)
+
+                # items() читает атрибуты напрямую, без прокси-объекта attrib
+                for attr_name, attr_value in elem.items():
+                    if attr_value.strip():
+                        strings.append(f"{path}@{attr_name}: {attr_value}")
+            else:
+                path, text_index = stack.pop()
+                # Каждое обращение к elem.text создаёт новую строку из дерева
+                text = elem.text
+                if text:
+                    text = text.strip()
+                    if text:
+                        strings[text_index] = f"{path}: {text}"
+
+                elem.clear()
+                # Удаляем уже обработанных предыдущих соседей из родителя
+                if elem.getprevious() is not None:
+                    parent = elem.getparent()
+                    while elem.getprevious() is not None:
+                        del parent[0]
+
+        return "\n".join(filter(None, strings))
 
     def _extract_from_yaml_sync(self, content: bytes) -> str:
         """Синхронное извлечение текста из YAML."""
@@ -1046,56 +2559,136 @@ class TextExtractor:
             raise ImportError("PyYAML не установлен")
 
         try:
-            text = content.decode("utf-8", errors="replace")
-            data = yaml.safe_load(text)
-            strings = self._extract_yaml_strings(data)
+            # YAML почти всегда в UTF-8 — один проход декодера; иначе
+            # кодировка определяется по началу файла (BOM, cp1251 и т.п.)
+            try:
+                text = content.decode("utf-8")
+            except UnicodeDecodeError:
+                text = self._decode_text_content(content)
+            strings = self._extract_yaml_event_strings(text)
+            if strings is None:
+                # Алиасы, merge-ключи, повторяющиеся ключи и т.п.: нужен
+                # полный граф объектов
+                data = yaml.load(text, Loader=_YamlLoader)
+                strings = _structured_strings(data, _YAML_ALIAS_MAX_ITEMS)
             return "\n".join(strings)
 
         except Exception as e:
             logger.error(f"Ошибка при обработке YAML: {str(e)}")
             raise ValueError(f"Error processing YAML: {str(e)}")
 
-    def _extract_yaml_strings(self, obj, path="") -> list:
-        """Рекурсивное извлечение всех строковых значений из YAML."""
-        strings = []
+    def _extract_yaml_event_strings(self, text: str) -> Optional[list]:
+        """Строки YAML с путями за один проход по событиям парсера.
+
+        Результат тот же, что у yaml.load + _structured_strings, но без
+        построения словарей и списков всего документа: из скаляров
+        конструируются только нестроковые ключи.
 
-        if isinstance(obj, dict):
-            strings.extend(self._extract_yaml_dict_strings(obj, path))
-        elif isinstance(obj, list):
-            strings.extend(self._extract_yaml_list_strings(obj, path))
-        elif isinstance(obj, str) and obj.strip():
-            strings.append(f"{path}: {obj}")
+        Returns:
+            Optional[list]: строки или None, если документу нужен полный
+            граф объектов (алиасы, merge-ключи, повторяющиеся или составные
+            ключи, нестандартные теги, несколько документов)
+        """
+        loader = _YamlLoader(text)
+        try:
+            strings = []
+            # Кадры коллекций: [путь, для отображения — ожидается ключ,
+            # путь значения текущего ключа, множество ключей] либо
+            # [путь, None, индекс элемента последовательности]
+            stack = []
+            documents = 0
+
+            while loader.check_event():
+                event = loader.get_event()
+                event_type = type(event)
+
+                if event_type in _YAML_END_EVENTS:
+                    stack.pop()
+                    continue
+                if event_type is yaml.DocumentStartEvent:
+                    documents += 1
+                    if documents > 1:
+                        return None
+                    continue
+                if event_type not in _YAML_NODE_EVENTS:
+                    # Начало и конец потока и документа
+                    continue
+                if event_type is yaml.AliasEvent:
+                    return None
+
+                frame = stack[-1] if stack else None
+                if frame is not None and frame[1] is True:
+                    # Ключ отображения
+                    if event_type is not yaml.ScalarEvent:
+                        return None
+                    key = self._yaml_scalar_key(loader, event)
+                    if key is None or key[0] in frame[3]:
+                        return None
+                    key = key[0]
+                    frame[3].add(key)
+                    frame[2] = f"{frame[0]}.{key}" if frame[0] else key
+                    frame[1] = False
+                    continue
+
+                # Значение: корень документа, элемент отображения или
+                # последовательности
+                if frame is None:
+                    path = ""
+                elif frame[1] is False:
+                    path = frame[2]
+                    frame[1] = True
+                else:
+                    path = f"{frame[0]}[{frame[2]}]" if frame[0] else f"[{frame[2]}]"
+                    frame[2] += 1
+
+                if event_type is yaml.ScalarEvent:
+                    tag = event.tag
+                    if tag is None or tag == "!":
+                        tag = loader.resolve(
+                            yaml.ScalarNode, event.value, event.implicit
+                        )
+                    elif tag not in loader.yaml_constructors:
+                        return None
+                    if tag == _YAML_STR_TAG and event.value.strip():
+                        strings.append(f"{path}: {event.value}")
+                elif event_type is yaml.MappingStartEvent:
+                    if event.tag not in (None, "!", _YAML_MAP_TAG):
+                        return None
+                    stack.append([path, True, None, set()])
+                else:
+                    if event.tag not in (None, "!", _YAML_SEQ_TAG):
+                        return None
+                    stack.append([path, None, 0])
 
-        return strings
+            return strings
+        finally:
+            loader.dispose()
 
-    def _extract_yaml_dict_strings(self, obj_dict: dict, path: str) -> list:
-        """Извлечение строк из словаря YAML."""
-        strings = []
-        for key, value in obj_dict.items():
-            new_path = f"{path}.{key}" if path else key
-            strings.extend(self._extract_yaml_strings(value, new_path))
-        return strings
+    def _yaml_scalar_key(self, loader, event) -> Optional[tuple]:
+        """Ключ отображения YAML, как его построил бы SafeLoader.
 
-    def _extract_yaml_list_strings(self, obj_list: list, path: str) -> list:
-        """Извлечение строк из списка YAML."""
-        strings = []
-        for i, value in enumerate(obj_list):
-            new_path = f"{path}[{i}]" if path else f"[{i}]"
-            strings.extend(self._extract_yaml_strings(value, new_path))
-        return strings
+        Returns:
+            Optional[tuple]: (ключ,) или None для merge-ключа и
+            нестандартного тега
+        """
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+        if tag == _YAML_STR_TAG:
+            return (event.value,)
+        if tag == _YAML_MERGE_TAG or tag not in loader.yaml_constructors:
+            return None
+        node = yaml.ScalarNode(tag, event.value, style=event.style)
+        return (loader.construct_object(node, deep=True),)
 
     def _extract_from_odt_sync(self, content: bytes) -> str:
         """Синхронное извлечение текста из ODT."""
         if not load:
             raise ImportError("odfpy не установлен")
 
-        temp_file_path = None
         try:
-            with tempfile.NamedTemporaryFile(suffix=".odt", delete=False) as temp_file:
-                temp_file.write(content)
-                temp_file_path = temp_file.name
-
-            doc = load(temp_file_path)
+            # odfpy читает ODT (zip-контейнер) из file-like объекта
+            doc = load(io.BytesIO(content))
             text_parts = []
 
             # Извлечение всех текстовых элементов
@@ -1109,41 +2702,50 @@ class TextExtractor:
         except Exception as e:
             logger.error(f"Ошибка при обработке ODT: {str(e)}")
             raise ValueError(f"Error processing ODT: {str(e)}")
-        finally:
-            # Гарантированное удаление временного файла
-            if temp_file_path and os.path.exists(temp_file_path):
-                try:
-                    os.unlink(temp_file_path)
-                except OSError as e:
-                    logger.warning(
-                        f"Не удалось удалить временный файл {temp_file_path}: {str(e)}"
-                    )
 
     def _extract_from_epub_sync(self, content: bytes) -> str:
         """Синхронное извлечение текста из EPUB."""
-        if not BeautifulSoup:
+        if LexborHTMLParser is None and not BeautifulSoup:
             raise ImportError("beautifulsoup4 не установлен")
 
         try:
-            text_parts = []
+            chapters = []
             extracted_size = 0
 
             with zipfile.ZipFile(io.BytesIO(content), "r") as zip_ref:
                 for file_info in zip_ref.infolist():
+                    # Лимит считается только по главам, которые действительно
+                    # читаются: изображения и шрифты не распаковываются и не
+                    # должны обрывать извлечение текста. ZipExtFile не читает
+                    # больше file_size, поэтому заявленный размер надёжен.
+                    if not self._is_epub_html_file(file_info.filename):
+                        continue
+
                     if self._should_stop_epub_extraction(
                         extracted_size, file_info.file_size
                     ):
                         break
 
-                    if self._is_epub_html_file(file_info.filename):
-                        text, new_size = self._extract_epub_html_text(
-                            zip_ref, file_info
+                    chapters.append(file_info)
+                    extracted_size += file_info.file_size
+
+                # Главы распаковываются и разбираются в пуле потоков: zlib и
+                # парсер Lexbor отпускают GIL. Чтение одного ZipFile из разных
+                # потоков безопасно, порядок глав сохраняет map.
+                if len(chapters) > 1:
+                    texts = list(
+                        self._thread_pool.map(
+                            functools.partial(self._extract_epub_html_text, zip_ref),
+                            chapters,
                         )
-                        if text:
-                            text_parts.append(text)
-                        extracted_size += new_size
+                    )
+                else:
+                    texts = [
+                        self._extract_epub_html_text(zip_ref, file_info)
+                        for file_info in chapters
+                    ]
 
-            return "\n\n".join(text_parts)
+            return "\n\n".join(filter(None, texts))
 
         except Exception as e:
             logger.error(f"Ошибка при обработке EPUB: {str(e)}")
@@ -1158,33 +2760,40 @@ class TextExtractor:
 
     def _is_epub_html_file(self, filename: str) -> bool:
         """Проверка является ли файл HTML для EPUB."""
-        return filename.endswith((".html", ".xhtml", ".htm"))
+        return filename.endswith(_EPUB_HTML_SUFFIXES)
 
-    def _extract_epub_html_text(self, zip_ref, file_info) -> tuple:
+    def _extract_epub_html_text(self, zip_ref, file_info) -> Optional[str]:
         """Извлечение текста из HTML файла EPUB."""
         try:
-            html_content = zip_ref.read(file_info.filename)
-            html_text = html_content.decode("utf-8", errors="replace")
+            html_content = zip_ref.read(file_info)
 
-            # Парсинг HTML
-            soup = BeautifulSoup(html_text, "html.parser")
+            if LexborHTMLParser is not None:
+                # Разбор и сбор текста в C, как для HTML-файлов. Байты главы
+                # передаются без промежуточной строки: Lexbor декодирует их
+                # сам, а str он всё равно перекодировал бы обратно в UTF-8
+                text = _lexbor_html_text(html_content)
+            else:
+                # C-парсер lxml вместо pure-Python html.parser
+                html_text = html_content.decode("utf-8", errors="replace")
+                soup = BeautifulSoup(html_text, "lxml")
 
-            # Удаление script и style тегов
-            for script in soup(["script", "style"]):
-                script.decompose()
+                # Удаление script и style тегов
+                for script in soup(["script", "style"]):
+                    script.decompose()
 
-            # Извлечение текста
-            text = soup.get_text()
-            return text.strip() if text.strip() else None, file_info.file_size
+                # Извлечение текста
+                text = soup.get_text()
+
+            # Та же очистка пробелов, что и для HTML-файлов: отступы разметки
+            # и пустые строки между блоками не попадают в результат
+            return _clean_html_text(text) or None
 
         except Exception as e:
             logger.warning(f"Ошибка при обработке файла {file_info.filename}: {e}")
-            return None, 0
+            return None
 
     def _extract_from_eml_sync(self, content: bytes) -> str:
         """Синхронное извлечение текста из EML."""
-        import email
-
         try:
             msg_text = self._decode_eml_content(content)
             msg = email.message_from_string(msg_text)
@@ -1221,22 +2830,30 @@ class TextExtractor:
 
     def _extract_eml_headers(self, msg) -> list:
         """Извлечение заголовков из EML."""
-        from email.header import decode_header
+        # Один проход по заголовкам письма вместо отдельного поиска
+        # каждого имени через msg.get; берётся первое вхождение, как в get
+        found = {}
+        for name, value in msg.raw_items():
+            header = _EML_TEXT_HEADERS_BY_KEY.get(name.lower())
+            if header is not None and header not in found:
+                found[header] = msg.policy.header_fetch_parse(name, value)
 
         text_parts = []
-        headers = ["From", "To", "Subject", "Date"]
-
-        for header in headers:
-            value = msg.get(header)
+        for header in _EML_TEXT_HEADERS:
+            value = found.get(header)
             if value:
-                decoded_value = self._decode_eml_header(value, decode_header)
+                decoded_value = self._decode_eml_header(value)
                 text_parts.append(f"{header}: {decoded_value}")
 
         return text_parts
 
-    def _decode_eml_header(self, value: str, decode_header_func) -> str:
+    def _decode_eml_header(self, value: str) -> str:
         """Декодирование заголовка EML."""
-        decoded_parts = decode_header_func(value)
+        # Заголовок без encoded-word (RFC 2047) возвращается как есть
+        if isinstance(value, str) and _ENCODED_WORD_RE.search(value) is None:
+            return value
+
+        decoded_parts = decode_header(value)
         decoded_value = ""
 
         for part, encoding in decoded_parts:
@@ -1253,10 +2870,16 @@ class TextExtractor:
     def _extract_eml_body_multipart(self, msg) -> list:
         """Извлечение тела многочастного EML письма."""
         text_parts = []
+        # Части, уже обработанные или заменённые текстовой альтернативой
+        skipped = set()
 
         for part in msg.walk():
+            if id(part) in skipped:
+                continue
             content_type = part.get_content_type()
-            if content_type in ["text/plain", "text/html"]:
+            if content_type == "multipart/alternative":
+                text_parts.extend(self._extract_eml_alternative_text(part, skipped))
+            elif content_type in ["text/plain", "text/html"]:
                 try:
                     body_text = self._extract_eml_part_text(part, content_type)
                     if body_text and body_text.strip():
@@ -1266,6 +2889,38 @@ class TextExtractor:
 
         return text_parts
 
+    def _extract_eml_alternative_text(self, part, skipped: set) -> list:
+        """Текст multipart/alternative: text/plain без разбора HTML-варианта.
+
+        Если у части есть непустая text/plain альтернатива, она берётся как
+        текст письма, а HTML-варианты (в том числе внутри multipart/related)
+        помечаются в skipped и не декодируются и не разбираются. Без текстовой
+        альтернативы ничего не помечается: HTML обработается при обходе.
+        """
+        alternatives = part.get_payload()
+        if not isinstance(alternatives, list):
+            return []
+
+        text_parts = []
+        for alternative in alternatives:
+            if alternative.get_content_type() != "text/plain":
+                continue
+            try:
+                body_text = self._extract_eml_part_text(alternative, "text/plain")
+            except Exception as e:
+                logger.warning(f"Ошибка при обработке части письма: {e}")
+                continue
+            skipped.add(id(alternative))
+            if body_text and body_text.strip():
+                text_parts.append(body_text)
+
+        if text_parts:
+            for alternative in alternatives:
+                for subpart in alternative.walk():
+                    if subpart.get_content_type() == "text/html":
+                        skipped.add(id(subpart))
+        return text_parts
+
     def _extract_eml_body_simple(self, msg) -> list:
         """Извлечение тела простого EML письма."""
         text_parts = []
@@ -1291,10 +2946,14 @@ class TextExtractor:
         charset = part.get_content_charset() or "utf-8"
         body_text = self._decode_payload(payload, charset)
 
-        # Обработка HTML
-        if content_type == "text/html" and BeautifulSoup:
-            soup = BeautifulSoup(body_text, "html.parser")
-            body_text = soup.get_text()
+        # Обработка HTML: текст собирается Lexbor в C без дерева
+        # BeautifulSoup, как и для HTML-файлов
+        if content_type == "text/html":
+            if LexborHTMLParser is not None:
+                body_text = _lexbor_html_text(body_text)
+            elif BeautifulSoup:
+                soup = BeautifulSoup(body_text, "html.parser")
+                body_text = soup.get_text()
 
         return body_text
 
@@ -1307,6 +2966,14 @@ class TextExtractor:
 
     def _extract_from_msg_sync(self, content: bytes) -> str:
         """Синхронное извлечение текста из MSG."""
+        if self._looks_like_eml(content):
+            # Письмо в формате EML разбирается парсером email целиком,
+            # без эвристик поиска текста в двоичных данных
+            try:
+                return self._extract_from_eml_sync(content)
+            except ValueError:
+                logger.warning("MSG похож на EML, но не разобран как EML")
+
         try:
             text_parts = []
 
@@ -1326,52 +2993,53 @@ class TextExtractor:
             logger.error(f"Ошибка при обработке MSG: {str(e)}")
             raise ValueError(f"Error processing MSG: {str(e)}")
 
+    def _looks_like_eml(self, content: bytes) -> bool:
+        """Проверка, начинается ли файл с блока заголовков письма RFC 822."""
+        match = _EML_HEADER_BLOCK_RE.match(content, 0, _EML_PROBE_SIZE)
+        if match is None:
+            return False
+        headers = match.group().lower()
+        return b"from:" in headers or b"content-type:" in headers
+
     def _extract_utf16_text_from_msg(self, content: bytes) -> list:
         """Извлечение UTF-16 текста из MSG файла."""
         text_parts = []
         try:
             text = content.decode("utf-16le", errors="ignore")
-            lines = text.split("\n")
-            clean_lines = self._clean_msg_lines(lines)
+            clean_lines = self._clean_msg_lines(text)
             unique_lines = self._filter_unique_lines(clean_lines, min_length=5)
             text_parts.extend(unique_lines)
         except Exception as e:
             logger.warning(f"Ошибка при декодировании UTF-16: {e}")
         return text_parts
 
-    def _clean_msg_lines(self, lines: list) -> list:
-        """Очистка строк MSG от управляющих символов."""
-        clean_lines = []
-        for line in lines:
-            # Убираем нулевые байты и управляющие символы
-            clean_line = "".join(
-                char for char in line if ord(char) >= 32 or char in "\t\n\r"
-            )
-            clean_line = clean_line.strip()
-
-            # Пропускаем слишком короткие или бессмысленные строки
-            if self._is_valid_msg_line(clean_line):
-                clean_lines.append(clean_line)
+    def _clean_msg_lines(self, text: str) -> list:
+        """Строки текста MSG без управляющих символов."""
+        # Нулевые байты и управляющие символы убираются одним проходом по
+        # всему тексту, а не отдельным вызовом на каждую строку
+        text = _MSG_CONTROL_CHARS_RE.sub("", text)
 
-        return clean_lines
+        # Пропускаем слишком короткие или бессмысленные строки
+        return [
+            line
+            for line in map(str.strip, text.split("\n"))
+            if self._is_valid_msg_line(line)
+        ]
 
     def _is_valid_msg_line(self, line: str) -> bool:
         """Проверка валидности строки MSG."""
         return (
             len(line) > 3
             and not line.startswith(("_", "\x00"))
-            and any(c.isalpha() for c in line)
+            # map со встроенным методом перебирает символы без
+            # Python-генератора и останавливается на первой букве
+            and any(map(str.isalpha, line))
         )
 
     def _filter_unique_lines(self, lines: list, min_length: int = 5) -> list:
         """Фильтрация уникальных строк с минимальной длиной."""
-        unique_lines = []
-        seen = set()
-        for line in lines:
-            if line not in seen and len(line) > min_length:
-                unique_lines.append(line)
-                seen.add(line)
-        return unique_lines
+        # dict.fromkeys сохраняет порядок первых вхождений
+        return list(dict.fromkeys(line for line in lines if len(line) > min_length))
 
     def _extract_ascii_text_from_msg(
         self, content: bytes, existing_text_parts: list
@@ -1379,24 +3047,27 @@ class TextExtractor:
         """Извлечение ASCII текста из MSG файла."""
         text_parts = []
         try:
-            ascii_text = content.decode("ascii", errors="ignore")
-            lines = ascii_text.split("\n")
-
-            for line in lines:
-                clean_line = line.strip()
-                if self._is_valid_ascii_line(clean_line, existing_text_parts):
-                    text_parts.append(clean_line)
+            # Байты вне ASCII удаляются bytes.translate, а строки разбираются
+            # прямо в bytes: в str декодируются только подходящие строки,
+            # без полной копии файла
+            ascii_content = content.translate(None, _NON_ASCII_BYTES)
+            # Множество вместо списка: проверка на дубликат за O(1), а не
+            # проход по всем строкам UTF-16 для каждой строки ASCII
+            existing_parts = set(existing_text_parts)
+
+            for line in ascii_content.split(b"\n"):
+                clean_line = line.strip(_ASCII_STR_WHITESPACE)
+                if self._is_valid_ascii_line(clean_line):
+                    text = clean_line.decode("ascii")
+                    if text not in existing_parts:
+                        text_parts.append(text)
         except Exception as e:
             logger.warning(f"Ошибка при извлечении ASCII: {e}")
         return text_parts
 
-    def _is_valid_ascii_line(self, line: str, existing_parts: list) -> bool:
+    def _is_valid_ascii_line(self, line: bytes) -> bool:
         """Проверка валидности ASCII строки."""
-        return (
-            len(line) > 10
-            and any(c.isalpha() for c in line)
-            and line not in existing_parts
-        )
+        return len(line) > 10 and _ASCII_LETTER_RE.search(line) is not None
 
     def _safe_tesseract_ocr(self, image, temp_image_path: str = None) -> str:
         """
@@ -1404,102 +3075,188 @@ class TextExtractor:
 
         Args:
             image: PIL Image объект
-            temp_image_path: Путь к временному файлу (если None, создается автоматически)
+            temp_image_path: Путь к уже сохранённому изображению (если None,
+                изображение передаётся Tesseract через stdin)
 
         Returns:
             str: Распознанный текст
         """
-        import os
-        import tempfile
-
-        from .config import settings
-        from .utils import run_subprocess_with_limits
-
-        temp_file_created = False
-
         try:
-            # Если путь к временному файлу не указан, создаем его
-            if temp_image_path is None:
-                with tempfile.NamedTemporaryFile(
-                    suffix=".png", delete=False
-                ) as temp_file:
-                    temp_image_path = temp_file.name
-                    temp_file_created = True
-
-                # Сохраняем изображение во временный файл
+            api = self._tesserocr_api()
+            if api is not None:
+                # Модели языков уже загружены в экземпляр потока: ни запуска
+                # процесса, ни кодирования изображения
+                if temp_image_path is None:
+                    api.SetImage(image)
+                else:
+                    api.SetImageFile(temp_image_path)
+                text = api.GetUTF8Text()
+            elif temp_image_path is None:
+                # Изображение кодируется в PNG в памяти и передаётся через
+                # stdin: без записи, чтения и удаления временного файла.
+                # Сильное сжатие для канала не нужно, а время кодирования
+                # на странице A4 при compress_level=1 почти вдвое меньше.
                 # Конвертируем в RGB для совместимости с PNG
                 if image.mode in ("RGBA", "LA", "P"):
                     image = image.convert("RGB")
-                image.save(temp_image_path, "PNG")
+                buffer = io.BytesIO()
+                image.save(buffer, "PNG", compress_level=1)
+                text = self._run_tesseract(
+                    "stdin", timeout=30, input_data=buffer.getvalue()
+                )
+            else:
+                text = self._run_tesseract(temp_image_path, timeout=30)
+            return text.strip() if text is not None else ""
 
-            # Создаем временный файл для вывода
-            with tempfile.NamedTemporaryFile(
-                suffix=".txt", delete=False
-            ) as output_file:
-                output_path = output_file.name
+        except subprocess.TimeoutExpired:
+            logger.error("Tesseract OCR timeout")
+            return ""
+        except MemoryError as e:
+            logger.error(f"Tesseract превысил лимит памяти: {str(e)}")
+            return ""
+        except Exception as e:
+            logger.error(f"Ошибка при OCR: {str(e)}")
+            return ""
 
-            try:
-                # Вызываем tesseract через безопасную функцию
-                result = run_subprocess_with_limits(
-                    command=[
-                        "tesseract",
-                        temp_image_path,
-                        output_path.replace(".txt", ""),
-                        "-l",
-                        self.ocr_languages,
-                    ],
-                    timeout=30,
-                    memory_limit=settings.MAX_TESSERACT_MEMORY,
-                    capture_output=True,
-                    text=True,
-                )
+    def _tesserocr_api(self):
+        """PyTessBaseAPI текущего потока или None, если OCR идёт через CLI."""
+        if tesserocr is None or not settings.OCR_IN_PROCESS:
+            return None
 
-                if result.returncode != 0:
-                    logger.warning(
-                        f"Tesseract завершился с кодом {result.returncode}: {result.stderr}"
-                    )
-                    return ""
+        api = getattr(self._tesserocr_local, "api", None)
+        if api is None:
+            # Состояние Tesseract не потокобезопасно: у каждого потока пула
+            # свой экземпляр, модели языков загружаются один раз на поток
+            api = tesserocr.PyTessBaseAPI(lang=self.ocr_languages)
+            self._tesserocr_local.api = api
+        return api
 
-                # Читаем результат OCR
-                if os.path.exists(output_path):
-                    with open(output_path, "r", encoding="utf-8") as f:
-                        return f.read().strip()
-                else:
-                    logger.warning("Файл результата OCR не найден")
-                    return ""
+    def _prepare_image_for_ocr(self, image):
+        """
+        Подготовка изображения к OCR: уменьшение и перевод в оттенки серого.
 
-            finally:
-                # Удаляем временный файл вывода
-                try:
-                    if os.path.exists(output_path):
-                        os.unlink(output_path)
-                except Exception as e:
-                    logger.warning(
-                        f"Не удалось удалить временный файл {output_path}: {e}"
-                    )
+        Сканы сверх ~300 DPI не повышают точность Tesseract, но время
+        распознавания растёт пропорционально числу пикселей. Оттенки серого
+        Tesseract всё равно получает внутри, а PNG для него в 3 раза меньше.
+        """
+        max_edge = settings.OCR_MAX_IMAGE_EDGE
+        width, height = image.size
+        if max_edge > 0 and max(width, height) > max_edge:
+            scale = max_edge / max(width, height)
+            image = image.resize(
+                (max(1, int(width * scale)), max(1, int(height * scale))),
+                Image.Resampling.LANCZOS,
+            )
+
+        # Режимы с глубиной > 8 бит (I;16, F) не трогаем — convert("L") их обрежет
+        if image.mode in _OCR_GRAYSCALE_MODES:
+            image = image.convert("L")
+        if settings.OCR_BINARIZE and image.mode == "L":
+            image = self._binarize_for_ocr(image)
+        return image
+
+    def _binarize_for_ocr(self, image):
+        """
+        Адаптивная бинаризация по локальному среднему (аналог adaptiveThreshold).
+
+        Порог считается для каждого пикселя по окну вокруг него, поэтому
+        неравномерное освещение и тени на фотографиях документов не сливаются
+        с текстом. Tesseract получает готовое чёрно-белое изображение.
+        """
+        mean = image.filter(ImageFilter.BoxBlur(_OCR_BINARIZE_RADIUS))
+        # Насколько пиксель темнее локального среднего (отрицательное -> 0)
+        darkness = ImageChops.subtract(mean, image)
+        return darkness.point(_OCR_BINARIZE_TABLE, "1")
+
+    def _safe_tesseract_ocr_batch(self, image_paths: list) -> Optional[list]:
+        """
+        OCR нескольких изображений одним запуском Tesseract.
+
+        Tesseract принимает текстовый файл со списком путей к изображениям и
+        разделяет результаты страниц символом form feed.
+
+        Args:
+            image_paths: Пути к изображениям в одной временной директории
+
+        Returns:
+            Optional[list]: Текст каждого изображения или None, если пакетный
+            запуск не удался и изображения нужно распознать по одному
+        """
+        list_path = os.path.join(os.path.dirname(image_paths[0]), "images.txt")
 
+        try:
+            with open(list_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(image_paths) + "\n")
+
+            text = self._run_tesseract(list_path, timeout=30 * len(image_paths))
         except subprocess.TimeoutExpired:
             logger.error("Tesseract OCR timeout")
-            return ""
+            return None
         except MemoryError as e:
             logger.error(f"Tesseract превысил лимит памяти: {str(e)}")
-            return ""
+            return None
         except Exception as e:
             logger.error(f"Ошибка при OCR: {str(e)}")
-            return ""
-        finally:
-            # Удаляем временный файл изображения, если мы его создали
-            if (
-                temp_file_created
-                and temp_image_path
-                and os.path.exists(temp_image_path)
-            ):
-                try:
-                    os.unlink(temp_image_path)
-                except Exception as e:
-                    logger.warning(
-                        f"Не удалось удалить временный файл {temp_image_path}: {e}"
-                    )
+            return None
+
+        if text is None:
+            return None
+
+        # Разделитель ставится после каждой страницы или только между ними
+        # (зависит от версии Tesseract)
+        pages = text.split("\f")
+        if len(pages) == len(image_paths) + 1 and not pages[-1].strip():
+            pages.pop()
+        if len(pages) != len(image_paths):
+            logger.warning(
+                f"Tesseract вернул {len(pages)} страниц вместо {len(image_paths)}"
+            )
+            return None
+
+        return [page.strip() for page in pages]
+
+    def _run_tesseract(
+        self, input_path: str, timeout: int, input_data: Optional[bytes] = None
+    ) -> Optional[str]:
+        """
+        Запуск Tesseract с ограничениями ресурсов.
+
+        Args:
+            input_path: Путь к изображению или к списку изображений
+                ("stdin" — изображение из input_data)
+            timeout: Таймаут выполнения в секундах
+            input_data: Содержимое изображения для передачи через stdin
+
+        Returns:
+            Optional[str]: Распознанный текст или None при ошибке Tesseract
+        """
+        from .utils import run_subprocess_with_limits
+
+        # Результат читается из stdout: без временного файла вывода и
+        # лишних открытия, чтения и удаления на каждый запуск
+        result = run_subprocess_with_limits(
+            command=[
+                "tesseract",
+                input_path,
+                "stdout",
+                "-l",
+                self.ocr_languages,
+            ],
+            timeout=timeout,
+            memory_limit=settings.MAX_TESSERACT_MEMORY,
+            capture_output=True,
+            text=False,
+            input=input_data,
+        )
+
+        if result.returncode != 0:
+            stderr = result.stderr.decode("utf-8", errors="replace")
+            logger.warning(
+                f"Tesseract завершился с кодом {result.returncode}: {stderr}"
+            )
+            return None
+
+        return result.stdout.decode("utf-8", errors="replace")
 
     def _extract_from_image_sync(self, content: bytes) -> str:
         """Синхронный OCR изображения."""
@@ -1517,7 +3274,7 @@ class TextExtractor:
 
             with Image.open(io.BytesIO(content)) as image:
                 # Безопасный OCR с ограничениями ресурсов
-                text = self._safe_tesseract_ocr(image)
+                text = self._safe_tesseract_ocr(self._prepare_image_for_ocr(image))
                 return text
 
         except DecompressionBombError as e:
@@ -1529,53 +3286,29 @@ class TextExtractor:
 
     def _check_mime_type(self, content: bytes, filename: str) -> bool:
         """Проверка MIME-типа файла для предотвращения подделки расширений."""
-        import mimetypes
-
         try:
-            # Определяем MIME-тип по содержимому (первые байты)
-            mime_signatures = {
-                b"\x50\x4b\x03\x04": [
-                    "application/zip",
-                    "application/epub+zip",
-                    "application/vnd.openxmlformats",
-                ],
-                b"\x50\x4b\x07\x08": ["application/zip", "application/epub+zip"],
-                b"\x50\x4b\x05\x06": ["application/zip", "application/epub+zip"],
-                b"%PDF": ["application/pdf"],
-                b"\xd0\xcf\x11\xe0": [
-                    "application/msword",
-                    "application/vnd.ms-excel",
-                    "application/vnd.ms-powerpoint",
-                ],
-                b"\x89PNG": ["image/png"],
-                b"\xff\xd8\xff": ["image/jpeg"],
-                b"GIF8": ["image/gif"],
-                b"BM": ["image/bmp"],
-                b"II*\x00": ["image/tiff"],
-                b"MM\x00*": ["image/tiff"],
-                b"<!DOCTYPE": ["text/html"],
-                b"<html": ["text/html"],
-                b"<?xml": ["text/xml", "application/xml"],
-            }
-
-            # Проверяем сигнатуру файла
-            file_start = content[:10]
-            detected_mime = None
-
-            for signature, mime_types in mime_signatures.items():
-                if file_start.startswith(signature):
-                    detected_mime = mime_types[0]
+            if not content:
+                return True
+
+            # Проверяем только сигнатуры с тем же первым байтом
+            detected_mimes = None
+            for signature, mime_types in _MIME_SIGNATURES_BY_FIRST_BYTE.get(
+                content[0], ()
+            ):
+                if content.startswith(signature):
+                    detected_mimes = mime_types
                     break
 
             # Определяем ожидаемый MIME-тип по расширению
             expected_mime, _ = mimetypes.guess_type(filename)
 
             # Если не можем определить MIME-тип, разрешаем
-            if not detected_mime or not expected_mime:
+            if not detected_mimes or not expected_mime:
                 return True
 
-            # Проверяем соответствие
-            return detected_mime in mime_signatures.get(file_start[:4], [expected_mime])
+            # Ожидаемый тип должен входить в типы найденной сигнатуры
+            # (для OOXML и OpenDocument — начинаться с указанного префикса)
+            return expected_mime.startswith(tuple(detected_mimes))
 
         except Exception as e:
             logger.warning(f"Ошибка при проверке MIME-типа: {str(e)}")
@@ -1602,71 +3335,66 @@ class TextExtractor:
             f"Обработка архива {filename} (тип: {extension}, размер: {len(content)} байт)"
         )
 
-        extracted_files = []
-
-        # Создаем временную директорию для безопасной работы
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            archive_path = temp_path / f"archive_{int(time.time())}.{extension}"
-
-            try:
-                # Записываем архив во временный файл
-                with open(archive_path, "wb") as f:
-                    f.write(content)
-
-                # Извлекаем файлы в зависимости от типа архива
-                extract_dir = temp_path / "extracted"
-                extract_dir.mkdir(exist_ok=True)
+        # ZIP, TAR и 7Z читаются прямо из памяти, и файлы архива на диск не
+        # распаковываются: каталог извлечения нужен только для проверки путей
+        # и не создаётся
+        extract_dir = Path(tempfile.gettempdir()) / "extract-text-archive"
 
-                if extension == "zip":
-                    extracted_files = self._extract_zip_files(
-                        archive_path, extract_dir, filename, nesting_level
-                    )
-                elif extension in [
-                    "tar",
-                    "gz",
-                    "bz2",
-                    "xz",
-                    "tar.gz",
-                    "tar.bz2",
-                    "tar.xz",
-                    "tgz",
-                    "tbz2",
-                    "txz",
-                ]:
-                    extracted_files = self._extract_tar_files(
-                        archive_path, extract_dir, filename, nesting_level
-                    )
-                elif extension == "rar":
+        try:
+            if extension == "zip":
+                extracted_files = self._extract_zip_files(
+                    io.BytesIO(content), extract_dir, filename, nesting_level
+                )
+            elif extension in [
+                "tar",
+                "gz",
+                "bz2",
+                "xz",
+                "tar.gz",
+                "tar.bz2",
+                "tar.xz",
+                "tgz",
+                "tbz2",
+                "txz",
+            ]:
+                extracted_files = self._extract_tar_files(
+                    io.BytesIO(content), extract_dir, filename, nesting_level
+                )
+            elif extension == "rar":
+                # RAR распаковывает внешняя утилита unrar, ей нужен файл:
+                # временный каталог создаётся только для этого формата
+                with tempfile.TemporaryDirectory() as temp_dir:
+                    archive_path = Path(temp_dir) / f"archive.{extension}"
+                    archive_path.write_bytes(content)
                     extracted_files = self._extract_rar_files(
                         archive_path, extract_dir, filename, nesting_level
                     )
-                elif extension == "7z":
-                    extracted_files = self._extract_7z_files(
-                        archive_path, extract_dir, filename, nesting_level
-                    )
-                else:
-                    raise ValueError(f"Unsupported archive format: {extension}")
-
-                logger.info(
-                    f"Успешно обработано {len(extracted_files)} файлов из архива {filename}"
+            elif extension == "7z":
+                extracted_files = self._extract_7z_files(
+                    io.BytesIO(content), extract_dir, filename, nesting_level
                 )
-                return extracted_files
+            else:
+                raise ValueError(f"Unsupported archive format: {extension}")
 
-            except Exception as e:
-                logger.error(f"Ошибка при обработке архива {filename}: {str(e)}")
-                raise ValueError(f"Error processing archive: {str(e)}")
+            logger.info(
+                f"Успешно обработано {len(extracted_files)} файлов из архива {filename}"
+            )
+            return extracted_files
+
+        except Exception as e:
+            logger.error(f"Ошибка при обработке архива {filename}: {str(e)}")
+            raise ValueError(f"Error processing archive: {str(e)}")
 
     def _extract_zip_files(
         self,
-        archive_path: Path,
+        archive_file: BinaryIO,
         extract_dir: Path,
         archive_name: str,
         nesting_level: int,
     ) -> List[Dict[str, Any]]:
         """Извлечение файлов из ZIP-архива."""
         try:
-            with zipfile.ZipFile(archive_path, "r") as zip_ref:
+            with zipfile.ZipFile(archive_file, "r") as zip_ref:
                 self._validate_zip_size(zip_ref)
                 return self._process_zip_files(
                     zip_ref, extract_dir, archive_name, nesting_level
@@ -1676,14 +3404,13 @@ class TextExtractor:
 
     def _validate_zip_size(self, zip_ref) -> None:
         """Проверка размера файлов в ZIP-архиве для защиты от zip bomb."""
-        total_size = 0
-        for info in zip_ref.infolist():
-            if not info.is_dir():
-                total_size += info.file_size
-                if total_size > settings.MAX_EXTRACTED_SIZE:
-                    raise ValueError(
-                        "Extracted files size exceeds maximum allowed size (zip bomb protection)"
-                    )
+        # Каталоги имеют нулевой размер и на сумму не влияют. ZipExtFile не
+        # читает больше заявленного file_size, поэтому сумма — точная граница
+        total_size = sum(info.file_size for info in zip_ref.infolist())
+        if total_size > settings.MAX_EXTRACTED_SIZE:
+            raise ValueError(
+                "Extracted files size exceeds maximum allowed size (zip bomb protection)"
+            )
 
     def _process_zip_files(
         self, zip_ref, extract_dir: Path, archive_name: str, nesting_level: int
@@ -1723,15 +3450,10 @@ class TextExtractor:
                 f"Заблокирована попытка path traversal в ZIP: {info.filename}"
             )
             return []
-        safe_path.parent.mkdir(parents=True, exist_ok=True)
 
         try:
-            # Извлекаем файл
-            with zip_ref.open(info) as source, open(safe_path, "wb") as target:
-                shutil.copyfileobj(source, target)
-
-            # Обрабатываем файл
-            file_content = safe_path.read_bytes()
+            # Читаем файл в память: без записи на диск и повторного чтения
+            file_content = zip_ref.read(info)
             return (
                 self._process_extracted_file(
                     file_content,
@@ -1751,7 +3473,7 @@ class TextExtractor:
 
     def _extract_tar_files(
         self,
-        archive_path: Path,
+        archive_file: BinaryIO,
         extract_dir: Path,
         archive_name: str,
         nesting_level: int,
@@ -1761,7 +3483,7 @@ class TextExtractor:
         total_size = 0
 
         try:
-            with tarfile.open(archive_path, "r:*") as tar_ref:
+            with tarfile.open(fileobj=archive_file, mode="r:*") as tar_ref:
                 # Проверяем размер распакованных файлов
                 for member in tar_ref.getmembers():
                     if member.isfile():
@@ -1798,19 +3520,14 @@ class TextExtractor:
                             f"Заблокирована попытка path traversal в TAR: {member.name}"
                         )
                         continue
-                    safe_path.parent.mkdir(parents=True, exist_ok=True)
 
                     try:
-                        # Извлекаем файл
-                        with (
-                            tar_ref.extractfile(member) as source,
-                            open(safe_path, "wb") as target,
-                        ):
-                            if source:
-                                shutil.copyfileobj(source, target)
+                        # Читаем файл в память: без записи на диск и
+                        # повторного чтения
+                        with tar_ref.extractfile(member) as source:
+                            file_content = source.read()
 
                         # Обрабатываем файл
-                        file_content = safe_path.read_bytes()
                         file_result = self._process_extracted_file(
                             file_content,
                             safe_filename,
@@ -1881,18 +3598,13 @@ class TextExtractor:
                             f"Заблокирована попытка path traversal в RAR: {info.filename}"
                         )
                         continue
-                    safe_path.parent.mkdir(parents=True, exist_ok=True)
 
                     try:
-                        # Извлекаем файл
-                        with (
-                            rar_ref.open(info) as source,
-                            open(safe_path, "wb") as target,
-                        ):
-                            shutil.copyfileobj(source, target)
+                        # Читаем файл в память: без записи на диск и
+                        # повторного чтения
+                        file_content = rar_ref.read(info)
 
                         # Обрабатываем файл
-                        file_content = safe_path.read_bytes()
                         file_result = self._process_extracted_file(
                             file_content,
                             safe_filename,
@@ -1917,7 +3629,7 @@ class TextExtractor:
 
     def _extract_7z_files(
         self,
-        archive_path: Path,
+        archive_file: BinaryIO,
         extract_dir: Path,
         archive_name: str,
         nesting_level: int,
@@ -1930,7 +3642,7 @@ class TextExtractor:
         total_size = 0
 
         try:
-            with py7zr.SevenZipFile(archive_path, "r") as sz_ref:
+            with py7zr.SevenZipFile(archive_file, "r") as sz_ref:
                 # Проверяем размер распакованных файлов
                 for info in sz_ref.list():
                     if info.is_dir:
@@ -1943,7 +3655,7 @@ class TextExtractor:
                         )
 
                 # Безопасная распаковка: читаем содержимое в память (Dict[name, BytesIO])
-                # и сами записываем на диск с валидацией пути — защита от Zip Slip.
+                # и проверяем пути сами — защита от Zip Slip.
                 extracted_data = sz_ref.readall() or {}
 
                 # Per-file size cap: один файл не может занимать больше суммарного
@@ -1968,7 +3680,6 @@ class TextExtractor:
                             f"Заблокирована попытка path traversal в 7Z: {member_name}"
                         )
                         continue
-                    safe_path.parent.mkdir(parents=True, exist_ok=True)
 
                     try:
                         bio.seek(0, io.SEEK_END)
@@ -1981,7 +3692,6 @@ class TextExtractor:
                             )
                             continue
                         file_content = bio.read()
-                        safe_path.write_bytes(file_content)
 
                         file_result = self._process_extracted_file(
                             file_content,
@@ -2108,82 +3818,99 @@ class TextExtractor:
 
         return False
 
-    def _ocr_from_pdf_image_sync(self, page, img_info) -> str:
+    def _ocr_from_pdf_image_sync(
+        self, page, img_info, render_lock: Optional[threading.Lock] = None
+    ) -> str:
         """Синхронный OCR изображения из PDF."""
         if not Image:
             return ""
 
+        # Рендеринг обращается к потоку документа и выполняется под блокировкой,
+        # Tesseract запускается уже вне её
+        with render_lock if render_lock is not None else contextlib.nullcontext():
+            image = self._render_pdf_image_sync(page, img_info)
+
+        if image is None:
+            return ""
+
+        # Безопасный OCR с ограничениями ресурсов
+        return self._safe_tesseract_ocr(self._prepare_image_for_ocr(image))
+
+    def _render_pdf_image_sync(
+        self, page, img_info, page_render_cache: Optional[dict] = None
+    ):
+        """
+        Рендеринг области изображения страницы PDF в PIL Image для OCR.
+
+        pdfplumber рендерит страницу целиком даже для page.crop(...), поэтому
+        страница рендерится один раз, а изображения вырезаются из готового
+        рендера.
+
+        Args:
+            page: страница pdfplumber
+            img_info: описание изображения из page.images
+            page_render_cache: рендер последней страницы (переиспользуется
+                между изображениями одной страницы)
+        """
         try:
-            # Получаем координаты изображения
-            x0, y0, x1, y1 = (
+            # Координаты от верхнего края страницы: y0/y1 в page.images
+            # отсчитываются от нижнего края
+            x0, top, x1, bottom = (
                 img_info["x0"],
-                img_info["y0"],
+                img_info["top"],
                 img_info["x1"],
-                img_info["y1"],
+                img_info["bottom"],
             )
 
             # Проверяем разумность размеров области
             width = abs(x1 - x0)
-            height = abs(y1 - y0)
+            height = abs(bottom - top)
 
             # Ограничиваем размер области для предотвращения DoS
             max_dimension = 5000  # максимальный размер по любой оси
             if width > max_dimension or height > max_dimension:
                 logger.warning(f"Область изображения слишком большая: {width}x{height}")
-                return ""
+                return None
 
-            # Обрезаем область изображения из всей страницы
-            cropped_bbox = (x0, y0, x1, y1)
-            cropped_page = page.crop(cropped_bbox)
+            page_image = None
+            if page_render_cache is not None:
+                page_image = page_render_cache.get(page.page_number)
+            if page_image is None:
+                # pdfplumber рендерит страницу через собственный PdfDocument
+                # PDFium: вызовы PDFium из разных потоков недопустимы даже для
+                # разных документов, поэтому рендер идёт под общей блокировкой
+                with _PDFIUM_LOCK:
+                    page_image = page.to_image(resolution=settings.OCR_PDF_RESOLUTION)
+                if page_render_cache is not None:
+                    page_render_cache.clear()
+                    page_render_cache[page.page_number] = page_image
+
+            # Пункты PDF -> пиксели рендера с учётом начала области страницы
+            left, upper = page_image.bbox[0], page_image.bbox[1]
+            scale = page_image.scale
+            pixel_bbox = (
+                int((x0 - left) * scale),
+                int((top - upper) * scale),
+                int((x1 - left) * scale),
+                int((bottom - upper) * scale),
+            )
 
-            # Конвертируем обрезанную область в изображение с высоким разрешением
-            img_pil = cropped_page.to_image(resolution=300)
+            # Проверяем разумность размеров в пикселях
+            pixel_width = abs(pixel_bbox[2] - pixel_bbox[0])
+            pixel_height = abs(pixel_bbox[3] - pixel_bbox[1])
 
-            # Безопасный OCR с ограничениями ресурсов
-            text = self._safe_tesseract_ocr(img_pil.original)
+            if pixel_width * pixel_height > 25000000:  # 25MP максимум
+                logger.warning(
+                    f"Область изображения слишком большая: {pixel_width}x{pixel_height} пикселей"
+                )
+                return None
 
-            return text
+            # Обрезаем область изображения
+            return page_image.original.crop(pixel_bbox)
 
         except Exception as e:
             logger.warning(f"Ошибка OCR изображения: {str(e)}")
-            # Альтернативный подход - рендерим всю страницу и обрезаем
-            try:
-                # Конвертируем всю страницу в изображение PIL
-                page_image = page.to_image(resolution=300)
-                pil_image = page_image.original  # Получаем PIL изображение
-
-                # Вычисляем координаты в пикселях (учитывая resolution=300)
-                scale = 300 / 72  # PDF обычно 72 DPI, мы рендерим в 300 DPI
-                pixel_bbox = (
-                    int(x0 * scale),
-                    int(y0 * scale),
-                    int(x1 * scale),
-                    int(y1 * scale),
-                )
-
-                # Проверяем разумность размеров в пикселях
-                pixel_width = abs(pixel_bbox[2] - pixel_bbox[0])
-                pixel_height = abs(pixel_bbox[3] - pixel_bbox[1])
-
-                if pixel_width * pixel_height > 25000000:  # 25MP максимум
-                    logger.warning(
-                        f"Область изображения слишком большая: {pixel_width}x{pixel_height} пикселей"
-                    )
-                    return ""
-
-                # Обрезаем область изображения
-                cropped_img = pil_image.crop(pixel_bbox)
-
-                # Безопасный OCR с ограничениями ресурсов
-                text = self._safe_tesseract_ocr(cropped_img)
-
-                return text
-
-            except Exception as e2:
-                logger.warning(
-                    f"Альтернативная попытка OCR также не удалась: {str(e2)}"
-                )
-                return ""
+            return None
 
     # Веб-экстракция (новое в v1.10.0)
 
@@ -2315,8 +4042,6 @@ class TextExtractor:
                         self._safe_scroll_for_lazy_loading(page, extraction_options)
 
                     # Дополнительная задержка для завершения JS
-                    import time
-
                     time.sleep(web_page_delay)
 
                 # Получаем финальный HTML
@@ -2369,8 +4094,6 @@ class TextExtractor:
                 page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
 
                 # Ждем небольшую задержку для загрузки контента
-                import time
-
                 time.sleep(1)
 
                 # Проверяем новую высоту
@@ -2631,7 +4354,6 @@ class TextExtractor:
         session = requests.Session()
         session.headers.update(headers)
 
-        temp_file_path = None
         try:
             logger.info(f"Скачиваю файл с URL: {url}")
 
@@ -2665,33 +4387,21 @@ class TextExtractor:
             # Определяем имя файла
             filename = self._extract_filename_from_response(response, url)
 
-            # Создаем временный файл
-            import tempfile
-
-            suffix = (
-                f".{get_file_extension(filename)}"
-                if get_file_extension(filename)
-                else ""
-            )
-            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-                temp_file_path = temp_file.name
-
-                # Скачиваем файл порциями с проверкой размера
-                downloaded_size = 0
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        downloaded_size += len(chunk)
-                        if downloaded_size > settings.MAX_FILE_SIZE:
-                            raise ValueError(
-                                f"File too large: exceeded {settings.MAX_FILE_SIZE} bytes during download"
-                            )
-                        temp_file.write(chunk)
-
-            logger.info(f"Файл скачан ({downloaded_size} байт): {filename}")
+            # Скачиваем файл порциями с проверкой размера прямо в память:
+            # содержимое всё равно целиком нужно экстрактору, поэтому запись
+            # во временный файл и повторное чтение с диска не требуются
+            buffer = bytearray()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                if chunk:
+                    buffer += chunk
+                    if len(buffer) > settings.MAX_FILE_SIZE:
+                        raise ValueError(
+                            f"File too large: exceeded {settings.MAX_FILE_SIZE} bytes during download"
+                        )
 
-            # Читаем скачанный файл и обрабатываем его как обычный файл
-            with open(temp_file_path, "rb") as f:
-                file_content = f.read()
+            logger.info(f"Файл скачан ({len(buffer)} байт): {filename}")
+            file_content = bytes(buffer)
+            del buffer
 
             # Используем существующую логику извлечения текста
             return self.extract_text(file_content, filename)
@@ -2700,15 +4410,6 @@ class TextExtractor:
             logger.error(f"Ошибка при скачивании файла {url}: {str(e)}")
             raise ValueError(f"Error downloading file: {str(e)}")
         finally:
-            # Очистка временного файла
-            if temp_file_path and os.path.exists(temp_file_path):
-                try:
-                    os.unlink(temp_file_path)
-                    logger.debug(f"Временный файл удален: {temp_file_path}")
-                except OSError as e:
-                    logger.warning(
-                        f"Не удалось удалить временный файл {temp_file_path}: {str(e)}"
-                    )
             session.close()
 
     def _extract_filename_from_response(self, response, url: str) -> str:
@@ -2725,8 +4426,6 @@ class TextExtractor:
         # Пытаемся получить имя файла из заголовка Content-Disposition
         content_disposition = response.headers.get("content-disposition", "")
         if "filename=" in content_disposition:
-            import re
-
             filename_match = re.search(
                 r'filename=["\']*([^"\';\r\n]*)', content_disposition
             )
@@ -2738,8 +4437,6 @@ class TextExtractor:
                     return sanitize_filename(filename)
 
         # Используем последний сегмент URL как имя файла
-        from urllib.parse import unquote, urlparse
-
         parsed_url = urlparse(url)
         filename = unquote(parsed_url.path.split("/")[-1])
 
@@ -3027,8 +4724,6 @@ class TextExtractor:
 
     def _resolve_hostname_ips(self, hostname: str) -> list:
         """Разрешение IP-адресов для hostname."""
-        import socket
-
         try:
             addr_info = socket.getaddrinfo(
                 hostname, None, socket.AF_UNSPEC, socket.SOCK_STREAM
@@ -3124,27 +4819,26 @@ class TextExtractor:
 
     def _extract_text_from_html(self, html_content: str) -> str:
         """Извлечение текста из HTML контента."""
-        if not BeautifulSoup:
+        if LexborHTMLParser is None and not BeautifulSoup:
             raise ValueError("BeautifulSoup not available for HTML parsing")
 
         try:
-            soup = BeautifulSoup(html_content, "lxml")
-
-            # Удаляем скрипты, стили и другие нетекстовые элементы
-            for script in soup(["script", "style", "nav", "header", "footer", "aside"]):
-                script.decompose()
+            if LexborHTMLParser is not None:
+                # Разбор и сбор текста в C без дерева BeautifulSoup, как и
+                # для HTML-файлов
+                text = _lexbor_html_text(html_content, _WEB_NON_TEXT_SELECTOR)
+            else:
+                soup = BeautifulSoup(html_content, "lxml")
 
-            # Извлекаем текст
-            text = soup.get_text()
+                # Удаляем скрипты, стили и другие нетекстовые элементы
+                for script in soup(_WEB_NON_TEXT_TAGS):
+                    script.decompose()
 
-            # Очистка текста
-            lines = []
-            for line in text.splitlines():
-                line = line.strip()
-                if line:
-                    lines.append(line)
+                # Извлекаем текст
+                text = soup.get_text()
 
-            return "\n".join(lines)
+            # Очистка текста: непустые строки без крайних пробелов
+            return "\n".join(filter(None, map(str.strip, text.splitlines())))
 
         except Exception as e:
             logger.error(f"Error extracting text from HTML: {str(e)}")
@@ -3242,15 +4936,24 @@ class TextExtractor:
         self, base64_images: list, extraction_options: Optional[Any]
     ) -> list:
         """Обработка base64 изображений."""
-        results = []
-        for img_tag in base64_images:
+        if not base64_images:
+            return []
+
+        def process(img_tag):
             try:
-                result = self._process_base64_image(img_tag, extraction_options)
-                if result:
-                    results.append(result)
+                return self._process_base64_image(img_tag, extraction_options)
             except Exception as e:
                 logger.warning(f"Error processing base64 image: {str(e)}")
-        return results
+                return None
+
+        # Изображения уже в памяти: OCR (отдельный процесс Tesseract или
+        # экземпляр tesserocr потока) идёт параллельно в пуле экстрактора,
+        # порядок результатов сохраняет map
+        if len(base64_images) > 1:
+            results = self._thread_pool.map(process, base64_images)
+        else:
+            results = [process(base64_images[0])]
+        return [result for result in results if result]
 
     def _process_url_images(
         self, url_images: list, base_url: str, extraction_options: Optional[Any]
@@ -3259,54 +4962,32 @@ class TextExtractor:
         if not url_images:
             return []
 
+        # Не больше двух загрузок одновременно, но без ожидания самого
+        # медленного изображения пары: следующая загрузка начинается сразу
+        # после завершения любой из текущих
         results = []
-        image_download_timeout = (
-            extraction_options.image_download_timeout
-            if extraction_options
-            and extraction_options.image_download_timeout is not None
-            else settings.IMAGE_DOWNLOAD_TIMEOUT
-        )
-
-        # Обработка изображений группами по 2
-        for i in range(0, len(url_images), 2):
-            batch = url_images[i : i + 2]
-            batch_results = self._process_images_batch(
-                batch, base_url, extraction_options, image_download_timeout
-            )
-            results.extend(batch_results)
-
-        return results
-
-    def _process_images_batch(
-        self,
-        batch: list,
-        base_url: str,
-        extraction_options: Optional[Any],
-        timeout: int,
-    ) -> list:
-        """Обработка группы изображений параллельно."""
-        batch_results = []
-
         with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            futures = []
-            for img_tag in batch:
-                future = executor.submit(
+            futures = [
+                executor.submit(
                     self._process_single_image,
                     img_tag,
                     base_url,
                     extraction_options,
                 )
-                futures.append(future)
+                for img_tag in url_images
+            ]
 
-            for future in concurrent.futures.as_completed(futures):
+            # Таймаут задан самой загрузке: ожидание в очереди пула не должно
+            # отбрасывать изображения, до которых ещё не дошла очередь
+            for future in futures:
                 try:
-                    result = future.result(timeout=timeout + 5)
+                    result = future.result()
                     if result:
-                        batch_results.append(result)
+                        results.append(result)
                 except Exception as e:
                     logger.warning(f"Error processing image: {str(e)}")
 
-        return batch_results
+        return results
 
     def _process_single_image(
         self, img_tag, base_url: str, extraction_options: Optional[Any] = None
@@ -3388,7 +5069,7 @@ class TextExtractor:
 
                 # OCR изображения
                 logger.info(f"Starting OCR for image: {img_url}")
-                text = self._safe_tesseract_ocr(img)
+                text = self._safe_tesseract_ocr(self._prepare_image_for_ocr(img))
                 logger.info(f"OCR result length: {len(text) if text else 0} characters")
 
                 if not text or not text.strip():
@@ -3497,7 +5178,7 @@ class TextExtractor:
 
                 # OCR изображения
                 logger.info("Starting OCR for base64 image")
-                text = self._safe_tesseract_ocr(img)
+                text = self._safe_tesseract_ocr(self._prepare_image_for_ocr(img))
                 logger.info(f"OCR result length: {len(text) if text else 0} characters")
 
                 if not text or not text.strip():
@@ -3518,3 +5199,29 @@ class TextExtractor:
         except Exception as e:
             logger.warning(f"Error processing base64 image: {str(e)}")
             return None
+
+
+# Экземпляр экстрактора в процессе пула извлечения (EXTRACTION_PROCESSES)
+_process_extractor: Optional[TextExtractor] = None
+
+
+def init_extraction_process() -> None:
+    """Инициализация процесса пула извлечения: свой экстрактор и прогрев."""
+    global _process_extractor
+
+    from .utils import setup_logging
+
+    setup_logging()
+    _process_extractor = TextExtractor()
+    # Профили LibreOffice у каждого процесса свои: удаляются при его
+    # штатном завершении (остановка пула). После аварийного завершения их
+    # удаляет cleanup_temp_files при следующем запуске сервиса
+    atexit.register(_process_extractor._remove_libreoffice_profiles)
+    if settings.ENABLE_WARMUP:
+        _process_extractor.warmup()
+
+
+def extract_text_in_process(file_content: bytes, filename: str) -> List[Dict[str, Any]]:
+    """Извлечение текста в процессе пула: функция модуля, чтобы её можно было
+    передать в ProcessPoolExecutor."""
+    return _process_extractor.extract_text(file_content, filename)
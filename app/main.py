@@ -6,7 +6,9 @@ Text Extraction API for RAG.
 
 import asyncio
 import base64
+import concurrent.futures
 import logging
+import multiprocessing
 import os
 import time
 from contextlib import asynccontextmanager
@@ -29,7 +31,11 @@ from pydantic import BaseModel, Field
 
 from app.auth import verify_api_key
 from app.config import settings
-from app.extractors import TextExtractor
+from app.extractors import (
+    TextExtractor,
+    extract_text_in_process,
+    init_extraction_process,
+)
 from app.utils import (
     cleanup_recent_temp_files,
     cleanup_temp_files,
@@ -49,6 +55,61 @@ FILE_UPLOAD = File(...)
 text_extractor = TextExtractor()
 
 
+# Отдельный ограниченный пул для извлечения текста из файлов: CPU-bound разбор
+# не занимает общий пул run_in_threadpool (40 потоков anyio), которым
+# пользуются проверка типа файла, чтение base64 и извлечение с URL. Запросы
+# сверх EXTRACTION_THREADS ждут в очереди пула.
+def create_extraction_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Пул потоков извлечения с лимитом EXTRACTION_THREADS."""
+    return concurrent.futures.ThreadPoolExecutor(
+        max_workers=settings.EXTRACTION_THREADS, thread_name_prefix="extraction"
+    )
+
+
+extraction_executor = create_extraction_executor()
+
+# Пул процессов извлечения (EXTRACTION_PROCESSES > 0): создаётся в lifespan
+# каждого воркера
+extraction_process_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+
+def create_extraction_process_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """Пул процессов извлечения с прогретым экстрактором в каждом процессе."""
+    # spawn вместо fork: у воркера уже есть потоки (пулы, anyio), и fork
+    # скопировал бы их блокировки в произвольном состоянии
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=settings.EXTRACTION_PROCESSES,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_extraction_process,
+    )
+
+
+async def run_extraction(content: bytes, filename: str) -> list:
+    """Извлечение текста из файла в пуле потоков с лимитом EXTRACTION_THREADS
+    или в пуле процессов при EXTRACTION_PROCESSES > 0."""
+    global extraction_process_pool
+
+    loop = asyncio.get_running_loop()
+    if extraction_process_pool is None:
+        return await loop.run_in_executor(
+            extraction_executor, text_extractor.extract_text, content, filename
+        )
+
+    pool = extraction_process_pool
+    try:
+        return await loop.run_in_executor(
+            pool, extract_text_in_process, content, filename
+        )
+    except concurrent.futures.process.BrokenProcessPool:
+        # Процесс пула аварийно завершился (например, сбой нативной
+        # библиотеки): пул больше не принимает задачи, создаём новый
+        logger.error(f"Процесс извлечения аварийно завершился на файле {filename}")
+        if extraction_process_pool is pool:
+            extraction_process_pool = create_extraction_process_pool()
+            pool.shutdown(wait=False)
+        raise ValueError("Extraction process crashed")
+
+
 # Pydantic модели
 class Base64FileRequest(BaseModel):
     """Модель для запроса обработки base64-файла."""
@@ -154,10 +215,42 @@ async def lifespan(app: FastAPI):
     # Очистка временных файлов при старте
     cleanup_temp_files()
 
+    # Прогрев выполняется в каждом воркере: lifespan запускается после fork
+    if settings.ENABLE_WARMUP:
+        await run_in_threadpool(
+            text_extractor.warmup, extraction_executor, settings.EXTRACTION_THREADS
+        )
+
+    global extraction_process_pool
+    if settings.EXTRACTION_PROCESSES > 0:
+        extraction_process_pool = create_extraction_process_pool()
+        # Процессы пула запускаются по требованию: пробные задачи запускают
+        # их все сразу, и прогрев (init_extraction_process) проходит до
+        # первого запроса
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(extraction_process_pool, os.getpid)
+                for _ in range(settings.EXTRACTION_PROCESSES)
+            )
+        )
+        logger.info(f"Пул процессов извлечения: {settings.EXTRACTION_PROCESSES}")
+
     yield
 
-    # Graceful shutdown: корректно закрываем пул потоков
+    if extraction_process_pool is not None:
+        extraction_process_pool.shutdown(wait=True, cancel_futures=True)
+        extraction_process_pool = None
+
+    # Graceful shutdown: корректно закрываем пулы потоков
     logger.info("Завершение работы Text Extraction API")
+    try:
+        # Извлечения из очереди пула отменяются, уже идущие не ожидаются:
+        # они ограничены PROCESSING_TIMEOUT_SECONDS
+        extraction_executor.shutdown(wait=False, cancel_futures=True)
+    except Exception as e:
+        logger.warning(f"Ошибка при закрытии пула извлечения: {str(e)}")
+
     try:
         if hasattr(text_extractor, "_thread_pool"):
             logger.info("Закрытие пула потоков...")
@@ -166,6 +259,12 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Ошибка при закрытии пула потоков: {str(e)}")
 
+    # Профили LibreOffice, созданные для конвертации DOC/PPT
+    try:
+        text_extractor._remove_libreoffice_profiles()
+    except Exception as e:
+        logger.warning(f"Ошибка при удалении профилей LibreOffice: {str(e)}")
+
     # Финальная очистка временных файлов
     try:
         cleanup_temp_files()
@@ -293,8 +392,11 @@ async def extract_text(file: UploadFile = FILE_UPLOAD):
             logger.warning(f"Файл {original_filename} пуст")
             raise HTTPException(status_code=422, detail="File is empty")
 
-        # Проверка соответствия расширения файла его содержимому
-        is_valid, validation_error = validate_file_type(content, original_filename)
+        # Проверка соответствия расширения файла его содержимому.
+        # libmagic — блокирующий C-вызов, выносим его из event loop.
+        is_valid, validation_error = await run_in_threadpool(
+            validate_file_type, content, original_filename
+        )
         if not is_valid:
             logger.warning(
                 f"Файл {original_filename} не прошел проверку типа: {validation_error}"
@@ -312,9 +414,7 @@ async def extract_text(file: UploadFile = FILE_UPLOAD):
         start_time = time.time()
         try:
             extracted_files = await asyncio.wait_for(
-                run_in_threadpool(
-                    text_extractor.extract_text, content, safe_filename_for_processing
-                ),
+                run_extraction(content, safe_filename_for_processing),
                 timeout=settings.PROCESSING_TIMEOUT_SECONDS,  # 300 секунд согласно ТЗ п.5.1
             )
         except asyncio.TimeoutError:
@@ -332,7 +432,9 @@ async def extract_text(file: UploadFile = FILE_UPLOAD):
         finally:
             # Дополнительная очистка временных файлов после обработки
             try:
-                cleanup_recent_temp_files()
+                # Обход и удаление файлов во временной папке — блокирующий
+                # ввод-вывод, выполняем его вне event loop
+                await run_in_threadpool(cleanup_recent_temp_files)
             except Exception as cleanup_error:
                 logger.warning(
                     f"Ошибка при очистке временных файлов: {str(cleanup_error)}"
@@ -412,7 +514,10 @@ async def extract_text_base64(request: Base64FileRequest):
 
         # Декодирование base64
         try:
-            content = base64.b64decode(request.encoded_base64_file)
+            # Декодирование до ~27 MB base64 — CPU-bound, не блокируем event loop
+            content = await run_in_threadpool(
+                base64.b64decode, request.encoded_base64_file
+            )
         except Exception as e:
             logger.warning(
                 f"Ошибка декодирования base64 для файла {original_filename}: {str(e)}"
@@ -441,8 +546,11 @@ async def extract_text_base64(request: Base64FileRequest):
             logger.warning(f"Файл {original_filename} пуст")
             raise HTTPException(status_code=422, detail="File is empty")
 
-        # Проверка соответствия расширения файла его содержимому
-        is_valid, validation_error = validate_file_type(content, original_filename)
+        # Проверка соответствия расширения файла его содержимому.
+        # libmagic — блокирующий C-вызов, выносим его из event loop.
+        is_valid, validation_error = await run_in_threadpool(
+            validate_file_type, content, original_filename
+        )
         if not is_valid:
             logger.warning(
                 f"Файл {original_filename} не прошел проверку типа: {validation_error}"
@@ -460,9 +568,7 @@ async def extract_text_base64(request: Base64FileRequest):
         start_time = time.time()
         try:
             extracted_files = await asyncio.wait_for(
-                run_in_threadpool(
-                    text_extractor.extract_text, content, safe_filename_for_processing
-                ),
+                run_extraction(content, safe_filename_for_processing),
                 timeout=settings.PROCESSING_TIMEOUT_SECONDS,  # 300 секунд согласно ТЗ п.5.1
             )
         except asyncio.TimeoutError:
@@ -480,7 +586,9 @@ async def extract_text_base64(request: Base64FileRequest):
         finally:
             # Дополнительная очистка временных файлов после обработки base64-файла
             try:
-                cleanup_recent_temp_files()
+                # Обход и удаление файлов во временной папке — блокирующий
+                # ввод-вывод, выполняем его вне event loop
+                await run_in_threadpool(cleanup_recent_temp_files)
             except Exception as cleanup_error:
                 logger.warning(
                     f"Ошибка при очистке временных файлов: {str(cleanup_error)}"
@@ -1,6 +1,8 @@
 """Утилиты для приложения."""
 
+import functools
 import glob
+import importlib
 import logging
 import os
 import shutil
@@ -8,6 +10,7 @@ import signal
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 from pathlib import Path
 from typing import Any, Callable, Dict, Optional, Union
@@ -37,6 +40,53 @@ if not HAS_RESOURCE:
     )
 
 
+class LazyImport:
+    """
+    Отложенный импорт тяжёлой опциональной зависимости.
+
+    Модуль импортируется при первом обращении к атрибуту, вызове или
+    проверке истинности. Если пакет не установлен, объект ложен так же,
+    как заглушка None, поэтому проверки `if not pd:` работают без изменений.
+    """
+
+    def __init__(self, module_name: str, attribute: Optional[str] = None):
+        self._module_name = module_name
+        self._attribute = attribute
+        self._target: Any = None
+        self._missing = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> Any:
+        if self._target is None and not self._missing:
+            with self._lock:
+                if self._target is None and not self._missing:
+                    try:
+                        module = importlib.import_module(self._module_name)
+                        self._target = (
+                            getattr(module, self._attribute)
+                            if self._attribute
+                            else module
+                        )
+                    except ImportError:
+                        self._missing = True
+        return self._target
+
+    def __bool__(self) -> bool:
+        return self._load() is not None
+
+    def __getattr__(self, name: str) -> Any:
+        target = self._load()
+        if target is None:
+            raise ImportError(f"{self._module_name} is not installed")
+        return getattr(target, name)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        target = self._load()
+        if target is None:
+            raise ImportError(f"{self._module_name} is not installed")
+        return target(*args, **kwargs)
+
+
 def setup_logging() -> None:
     """Настройка структурированного логирования."""
     # Создание форматтера для логов
@@ -61,8 +111,13 @@ def setup_logging() -> None:
     uvicorn_logger.propagate = False
 
 
+@functools.lru_cache(maxsize=4096)
 def get_file_extension(filename: str) -> Optional[str]:
-    """Получение расширения файла."""
+    """Получение расширения файла.
+
+    Результат кэшируется: функция чистая и вызывается несколько раз
+    на каждый файл (проверка архива, поддержки формата, диспетчеризация).
+    """
     if not filename or "." not in filename:
         return None
 
@@ -84,6 +139,10 @@ def is_supported_format(filename: str, supported_formats: dict) -> bool:
     if not extension:
         return False
 
+    # Быстрый путь для глобальных настроек: одна проверка по frozenset
+    if supported_formats is settings.SUPPORTED_FORMATS:
+        return extension in settings.ALL_SUPPORTED_EXTENSIONS
+
     for format_group in supported_formats.values():
         if extension in format_group:
             return True
@@ -97,6 +156,9 @@ def is_archive_format(filename: str, supported_formats: dict) -> bool:
     if not extension:
         return False
 
+    if supported_formats is settings.SUPPORTED_FORMATS:
+        return extension in settings.SUPPORTED_FORMAT_SETS["archives"]
+
     archives = supported_formats.get("archives", [])
     return extension in archives
 
@@ -449,6 +511,22 @@ def cleanup_temp_files() -> None:
                             f"Не удалось удалить временную папку {temp_dir_path}: {str(e)}"
                         )
 
+        # Профили LibreOffice процессов, которые завершились без очистки
+        # (например, аварийно завершённые процессы пула извлечения). В имени
+        # extract-text-libreoffice-<pid>-... записан PID процесса-владельца:
+        # профили работающих процессов не трогаем
+        profiles_pattern = os.path.join(temp_dir, "extract-text-libreoffice-*")
+        for profile_path in glob.glob(profiles_pattern):
+            try:
+                pid = int(os.path.basename(profile_path).split("-")[3])
+            except (IndexError, ValueError):
+                continue
+            if is_process_alive(pid):
+                continue
+            shutil.rmtree(profile_path, ignore_errors=True)
+            dirs_removed += 1
+            logger.debug(f"Удален профиль LibreOffice: {profile_path}")
+
         if files_removed > 0 or dirs_removed > 0:
             logger.info(
                 f"Очистка временных файлов завершена. Удалено файлов: {files_removed}, папок: {dirs_removed}"
@@ -462,6 +540,18 @@ def cleanup_temp_files() -> None:
         logger.error(f"Ошибка при очистке временных файлов: {str(e)}", exc_info=True)
 
 
+def is_process_alive(pid: int) -> bool:
+    """Проверка, что процесс с указанным PID существует."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Процесс есть, но принадлежит другому пользователю
+        return True
+    return True
+
+
 def cleanup_recent_temp_files() -> None:
     """
     Немедленная очистка временных файлов текущего процесса.
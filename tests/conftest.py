@@ -1,7 +1,9 @@
 """Общие фикстуры для тестирования Text Extraction API."""
 
 import asyncio
+import glob
 import os
+import shutil
 import tempfile
 from pathlib import Path
 from typing import Any, BinaryIO, Generator
@@ -11,6 +13,7 @@ import pytest
 from fastapi.testclient import TestClient
 from httpx import AsyncClient
 
+import app.main as main_module
 from app.config import settings
 from app.extractors import TextExtractor
 from app.main import app
@@ -24,6 +27,26 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(scope="session", autouse=True)
+def remove_libreoffice_dirs():
+    """Удаляет каталоги LibreOffice экстракторов, созданных в тестах."""
+    yield
+    pattern = os.path.join(
+        tempfile.gettempdir(), f"extract-text-libreoffice-{os.getpid()}-*"
+    )
+    for slot_dir in glob.glob(pattern):
+        shutil.rmtree(slot_dir, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def extraction_executor(monkeypatch):
+    """Отдельный пул извлечения на тест: lifespan закрывает пул при выходе."""
+    executor = main_module.create_extraction_executor()
+    monkeypatch.setattr(main_module, "extraction_executor", executor)
+    yield executor
+    executor.shutdown(wait=True)
+
+
 @pytest.fixture
 def test_client():
     """Создает тестовый клиент для FastAPI."""
@@ -23,7 +23,7 @@ class TestSettings:
         importlib.reload(config)
         settings = config.Settings()
 
-        assert settings.VERSION == "1.11.0"
+        assert settings.VERSION == "1.12.0"
         assert settings.API_PORT == 7555
         assert settings.MAX_FILE_SIZE == 20971520  # 20MB
         assert settings.PROCESSING_TIMEOUT_SECONDS == 300
@@ -125,6 +125,17 @@ class TestSettings:
         settings = config.Settings()
         assert settings.PROCESSING_TIMEOUT_SECONDS == 600
 
+    @patch.dict(os.environ, {"EXTRACTION_THREADS": "2"})
+    def test_extraction_threads_override(self):
+        """Тест переопределения лимита одновременных извлечений."""
+        import importlib
+
+        from app import config
+
+        importlib.reload(config)
+        settings = config.Settings()
+        assert settings.EXTRACTION_THREADS == 2
+
     @patch.dict(os.environ, {"MAX_ARCHIVE_SIZE": "10485760"})  # 10MB
     def test_max_archive_size_override(self):
         """Тест переопределения максимального размера архива."""
@@ -158,6 +169,21 @@ class TestSettings:
         settings = config.Settings()
         assert settings.MAX_ARCHIVE_NESTING == 5
 
+    def test_supported_extension_indexes(self):
+        """Тест предвычисленных индексов расширений."""
+        settings = Settings()
+
+        for category, formats in settings.SUPPORTED_FORMATS.items():
+            assert settings.SUPPORTED_FORMAT_SETS[category] == frozenset(formats)
+            for format_ext in formats:
+                assert format_ext in settings.all_supported_extensions_set
+                assert settings.FORMAT_GROUP_BY_EXTENSION[format_ext] == category
+
+        assert isinstance(settings.all_supported_extensions, list)
+        assert set(settings.all_supported_extensions) == (
+            settings.all_supported_extensions_set
+        )
+
     def test_all_formats_are_lowercase(self):
         """Тест, что все форматы записаны в нижнем регистре."""
         settings = Settings()
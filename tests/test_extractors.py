@@ -1,17 +1,30 @@
 """Unit тесты для модуля извлечения текста."""
 
 import asyncio
+import concurrent.futures
 import io
+import json
 import os
+import subprocess
+import sys
+import tarfile
 import tempfile
+import threading
+import time
 import zipfile
+from datetime import datetime
 from pathlib import Path
 from unittest.mock import AsyncMock, Mock, mock_open, patch
 
 import pytest
 
 from app.config import settings
-from app.extractors import TextExtractor
+from app.extractors import (
+    _EXTRACTION_METHODS,
+    TextExtractor,
+    _parse_unoserver_address,
+    _structured_strings,
+)
 
 
 @pytest.mark.unit
@@ -57,6 +70,119 @@ class TestTextExtractor:
             with pytest.raises(ValueError, match="Error extracting text"):
                 extractor.extract_text(b"test content", "test.txt")
 
+    def test_warmup(self, text_extractor):
+        """Тест прогрева: пробный OCR выполняется, ошибки не пробрасываются."""
+        with patch.object(
+            text_extractor, "_safe_tesseract_ocr", return_value=""
+        ) as mock_ocr:
+            text_extractor.warmup()
+        mock_ocr.assert_called_once()
+
+        with patch.object(
+            text_extractor,
+            "_safe_tesseract_ocr",
+            side_effect=FileNotFoundError("tesseract"),
+        ):
+            text_extractor.warmup()
+
+    def test_warmup_in_process_all_threads(self):
+        """Тест прогрева OCR_IN_PROCESS: API создаётся в каждом потоке пулов."""
+        extractor = TextExtractor()
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        mock_tesserocr = Mock()
+        mock_tesserocr.PyTessBaseAPI.return_value.GetUTF8Text.return_value = ""
+        try:
+            with (
+                patch("app.extractors.tesserocr", mock_tesserocr),
+                patch("app.extractors.settings.OCR_IN_PROCESS", True),
+            ):
+                extractor.warmup(executor, 2)
+        finally:
+            executor.shutdown()
+
+        # 4 потока пула экстрактора и 2 потока переданного пула
+        assert mock_tesserocr.PyTessBaseAPI.call_count == 6
+
+    def test_extraction_methods_cover_supported_formats(self):
+        """Тест наличия экстрактора для каждого поддерживаемого формата."""
+        for group, extensions in settings.SUPPORTED_FORMATS.items():
+            if group in ("archives", "source_code"):
+                continue
+            for extension in extensions:
+                method_name = _EXTRACTION_METHODS.get(extension)
+                assert method_name is not None, extension
+                assert hasattr(TextExtractor, method_name)
+
+    def test_extract_text_result_cache(self):
+        """Тест кэширования результата извлечения по содержимому файла."""
+        extractor = TextExtractor()
+
+        with patch.object(
+            extractor, "_extract_text_by_format", return_value="Текст"
+        ) as mock_extract:
+            first = extractor.extract_text(b"content", "test.txt")
+            first[0]["text"] = "изменено вызывающим кодом"
+            second = extractor.extract_text(b"content", "test.txt")
+            extractor.extract_text(b"other content", "test.txt")
+            extractor.extract_text(b"content", "renamed.txt")
+
+        assert second[0]["text"] == "Текст"
+        assert mock_extract.call_count == 3
+
+    def test_extract_text_result_cache_skips_large_text(self):
+        """Тест: результат с очень длинным текстом в кэш не попадает."""
+        extractor = TextExtractor()
+
+        with (
+            patch("app.extractors._EXTRACTION_CACHE_MAX_TEXT_LENGTH", 5),
+            patch.object(
+                extractor, "_extract_text_by_format", return_value="Длинный текст"
+            ) as mock_extract,
+        ):
+            extractor.extract_text(b"content", "test.txt")
+            extractor.extract_text(b"content", "test.txt")
+
+        assert mock_extract.call_count == 2
+        assert not extractor._result_cache
+
+    def test_extract_text_result_cache_memory_budget(self):
+        """Тест вытеснения давних записей кэша по объёму памяти."""
+        extractor = TextExtractor()
+        entry_memory = sys.getsizeof("Текст")
+
+        with (
+            patch(
+                "app.extractors.settings.EXTRACTION_CACHE_MAX_MEMORY",
+                entry_memory * 2,
+            ),
+            patch.object(
+                extractor, "_extract_text_by_format", return_value="Текст"
+            ) as mock_extract,
+        ):
+            extractor.extract_text(b"first", "test.txt")
+            extractor.extract_text(b"second", "test.txt")
+            extractor.extract_text(b"third", "test.txt")
+            extractor.extract_text(b"third", "test.txt")
+            extractor.extract_text(b"first", "test.txt")
+
+        assert mock_extract.call_count == 4
+        assert len(extractor._result_cache) == 2
+        assert extractor._result_cache_memory == entry_memory * 2
+
+    def test_extract_text_result_cache_disabled(self):
+        """Тест отключения кэша результатов извлечения."""
+        extractor = TextExtractor()
+
+        with patch("app.extractors.settings.EXTRACTION_CACHE_SIZE", 0):
+            with patch.object(
+                extractor, "_extract_text_by_format", return_value="Текст"
+            ) as mock_extract:
+                extractor.extract_text(b"content", "test.txt")
+                extractor.extract_text(b"content", "test.txt")
+
+        assert mock_extract.call_count == 2
+        assert not extractor._result_cache
+
     def test_extract_from_txt_sync(self, text_extractor):
         """Тест синхронного извлечения из текстового файла."""
         test_content = "Простой текст\nВторая строка"
@@ -76,6 +202,28 @@ class TestTextExtractor:
 
         assert result == test_content
 
+    @pytest.mark.parametrize(
+        "encoding",
+        ["cp1251", "koi8-r", "cp866", "iso-8859-5", "utf-8-sig", "utf-16", "utf-32"],
+    )
+    def test_decode_text_content_encodings(self, text_extractor, encoding):
+        """Тест определения кодировки русского текста."""
+        test_content = "Привет, мир! Это тестовый текст на русском языке."
+
+        result = text_extractor._decode_text_content(test_content.encode(encoding))
+
+        assert result == test_content
+
+    def test_has_valid_cyrillic_ratio(self, text_extractor):
+        """Тест доли кириллицы при проверке декодирования как mac-cyrillic."""
+        assert text_extractor._has_valid_cyrillic_ratio("Привет, мир! 123")
+        assert text_extractor._has_valid_cyrillic_ratio("Hello, world!")
+        assert text_extractor._has_valid_cyrillic_ratio("")
+        # Латиница, включая İ и знак Кельвина, преобладает над кириллицей
+        assert not text_extractor._has_valid_cyrillic_ratio("Жab")
+        assert not text_extractor._has_valid_cyrillic_ratio("Ж\u0130\u212a")
+        assert text_extractor._has_valid_cyrillic_ratio("ЖЖЖЖЖЖЖЖa")
+
     def test_extract_from_json_sync(self, text_extractor):
         """Тест синхронного извлечения из JSON файла."""
         json_content = '{"name": "Тест", "value": 42, "nested": {"key": "значение"}}'
@@ -89,6 +237,36 @@ class TestTextExtractor:
         # Числовые значения не извлекаются
         assert "value: 42" not in result
 
+    def test_extract_from_json_sync_paths_and_order(self, text_extractor):
+        """Тест путей и порядка строк при обходе вложенного JSON."""
+        data = {
+            "a": [" ", "x", 1, None, {"b": "y", "": "z"}],
+            "": {"c": [["w"]]},
+            "d": "",
+            "e": {},
+        }
+        content_bytes = json.dumps(data).encode("utf-8")
+
+        result = text_extractor._extract_from_json_sync(content_bytes)
+
+        assert result == "a[1]: x\na[4].b: y\na[4].: z\nc[0][0]: w"
+
+    def test_extract_from_json_sync_root_values(self, text_extractor):
+        """Тест JSON со строкой или списком в корне."""
+        assert text_extractor._extract_from_json_sync(b'"text"') == ": text"
+        assert text_extractor._extract_from_json_sync(b'["a", 5]') == "[0]: a"
+        assert text_extractor._extract_from_json_sync(b"42") == ""
+
+    def test_extract_from_json_sync_cp1251(self, text_extractor):
+        """Тест JSON в cp1251: кодировка определяется, а не заменяется U+FFFD."""
+        content_bytes = '{"title": "Отчёт о продажах за третий квартал"}'.encode(
+            "cp1251"
+        )
+
+        result = text_extractor._extract_from_json_sync(content_bytes)
+
+        assert result == "title: Отчёт о продажах за третий квартал"
+
     def test_extract_from_json_sync_invalid(self, text_extractor):
         """Тест обработки некорректного JSON."""
         invalid_json = b'{"invalid": json}'
@@ -96,6 +274,54 @@ class TestTextExtractor:
         with pytest.raises(ValueError, match="Error processing JSON"):
             text_extractor._extract_from_json_sync(invalid_json)
 
+    def test_extract_from_markdown_sync(self, text_extractor):
+        """Тест извлечения текста из Markdown без разметки."""
+        md_content = (
+            "# Заголовок\n\nТекст с **жирным** и [ссылкой](http://example.com).\n"
+        )
+
+        result = text_extractor._extract_from_markdown_sync(md_content.encode("utf-8"))
+
+        assert "Заголовок" in result
+        assert "Текст с жирным и ссылкой." in result
+        assert "**" not in result
+        assert "http://example.com" not in result
+
+    def test_extract_from_markdown_sync_fallback_reuse(self, text_extractor):
+        """Тест повторного использования python-markdown в fallback."""
+        pytest.importorskip("markdown")
+        text_extractor._markdown_parser = None
+        first = "[ссылка][ref]\n\n[ref]: http://example.com\n".encode("utf-8")
+        second = "[ссылка][ref]\n".encode("utf-8")
+
+        assert text_extractor._extract_from_markdown_sync(first).strip() == "ссылка"
+        md = text_extractor._markdown_local.markdown
+        # Определения ссылок из прошлого документа не переносятся
+        assert (
+            text_extractor._extract_from_markdown_sync(second).strip()
+            == "[ссылка][ref]"
+        )
+        assert text_extractor._markdown_local.markdown is md
+
+    def test_extract_from_markdown_sync_fallback_lexbor(self, text_extractor):
+        """Тест fallback python-markdown: текст HTML через Lexbor как в bs4."""
+        markdown = pytest.importorskip("markdown")
+        pytest.importorskip("selectolax")
+        from bs4 import BeautifulSoup
+
+        text_extractor._markdown_parser = None
+        md_content = (
+            "# Заголовок &amp; тест\n\nТекст с **жирным** и [ссылкой](http://x.ru)."
+            "\n\n- пункт 1\n- пункт 2\n\n```\ncode <x>\n```\n"
+        )
+        html = markdown.markdown(md_content)
+
+        result = text_extractor._extract_from_markdown_sync(md_content.encode("utf-8"))
+
+        assert result == BeautifulSoup(html, "html.parser").get_text()
+        assert "Заголовок & тест" in result
+        assert "code <x>" in result
+
     def test_extract_from_csv_sync(self, text_extractor):
         """Тест синхронного извлечения из CSV файла."""
         csv_content = "Название,Цена,Количество\nТовар 1,100,5\nТовар 2,200,3"
@@ -107,6 +333,21 @@ class TestTextExtractor:
         assert "Товар 1,100,5" in result
         assert "Товар 2,200,3" in result
 
+    def test_extract_from_csv_sync_fast_path(self, text_extractor):
+        """Тест CSV без кавычек: результат совпадает с разбором через csv."""
+        content = "\ufeffa,b\r\n\r\n1, 2\r\n,,\n3,4".encode("utf-8")
+
+        with patch("app.extractors.csv.reader") as mock_reader:
+            result = text_extractor._extract_from_csv_sync(content)
+
+        assert result == "a,b\n1, 2\n,,\n3,4\n"
+        mock_reader.assert_not_called()
+
+        quoted = 'a,"b, c"\r\n\r\n"x ""y""",2\n'.encode("utf-8")
+        assert (
+            text_extractor._extract_from_csv_sync(quoted) == 'a,"b, c"\n"x ""y""",2\n'
+        )
+
     def test_extract_from_xml_sync(self, text_extractor):
         """Тест синхронного извлечения из XML файла."""
         xml_content = """<?xml version="1.0" encoding="UTF-8"?>
@@ -123,6 +364,36 @@ class TestTextExtractor:
         assert "Товар 1" in result
         assert "100" in result
 
+    def test_extract_from_xml_sync_iterparse_matches_etree(self, text_extractor):
+        """Тест потокового разбора XML: результат совпадает с обходом дерева."""
+        xml_content = """<?xml version="1.0" encoding="UTF-8"?>
+        <root xmlns:a="urn:a" version="2">
+            <!-- комментарий -->
+            <a:item id="1" empty=" ">Товар<name>Название</name>хвост</a:item>
+            <item id="2"><value>&amp; 200</value><nested><deep k="v"/></nested></item>
+        </root>"""
+        content_bytes = xml_content.encode("utf-8")
+
+        fast_result = text_extractor._extract_from_xml_sync(content_bytes)
+        with patch("app.extractors.lxml_etree", None):
+            etree_result = text_extractor._extract_from_xml_sync(content_bytes)
+
+        assert fast_result == etree_result
+        assert "root.{urn:a}item.name: Название" in fast_result
+        assert "root.item.nested.deep@k: v" in fast_result
+
+    def test_extract_from_xml_sync_deep_nesting(self, text_extractor):
+        """Тест XML с вложенностью глубже лимита рекурсии Python."""
+        depth = 1500
+        xml_content = ("<a>" * depth + '<b id="x">Текст</b>' + "</a>" * depth).encode(
+            "utf-8"
+        )
+
+        result = text_extractor._extract_from_xml_sync(xml_content)
+
+        path = ".".join(["a"] * depth + ["b"])
+        assert result == f"{path}: Текст\n{path}@id: x"
+
     def test_extract_from_xml_sync_invalid(self, text_extractor):
         """Тест обработки некорректного XML."""
         invalid_xml = b"<invalid><unclosed>tag</invalid>"
@@ -143,6 +414,48 @@ class TestTextExtractor:
         # Числовые значения не извлекаются
         assert "value: 42" not in result
 
+    def test_extract_from_yaml_sync_order_and_depth(self, text_extractor):
+        """Тест порядка строк и глубокой вложенности YAML."""
+        yaml_content = "a:\n  - x\n  - b: y\n  - z\n1: число\nc: w"
+        result = text_extractor._extract_from_yaml_sync(yaml_content.encode())
+        assert result == "a[0]: x\na[1].b: y\na[2]: z\n1: число\nc: w"
+
+        # Вложенность глубже лимита рекурсии Python
+        depth = 1500
+        deep_yaml = "[" * depth + "глубоко" + "]" * depth
+        result = text_extractor._extract_from_yaml_sync(deep_yaml.encode())
+        assert result == "[0]" * depth + ": глубоко"
+
+    def test_extract_yaml_event_strings_matches_tree(self, text_extractor):
+        """Тест разбора YAML по событиям: совпадение с обходом дерева объектов."""
+        import yaml
+
+        documents = [
+            "a: 1\nb: text\nc: [x, 'y', 3, null, true, '']\nd: {e: [f, {g: h}]}",
+            "0: [a]\n1.5: {k: v}\n2020-01-01: d\nnull: [q]\n'': [z]",
+            "m: |\n  многострочный\n  текст\nempty: {}\nnone:",
+            "просто строка",
+        ]
+        for document in documents:
+            expected = _structured_strings(yaml.safe_load(document))
+            assert text_extractor._extract_yaml_event_strings(document) == expected
+
+        # Алиасы и повторяющиеся ключи разбираются через полное дерево
+        aliased = "base: &b {k: v}\ncopy: *b\n"
+        assert text_extractor._extract_yaml_event_strings(aliased) is None
+        assert text_extractor._extract_from_yaml_sync(aliased.encode()) == (
+            "base.k: v\ncopy.k: v"
+        )
+        assert text_extractor._extract_yaml_event_strings("a: x\na: y") is None
+
+    def test_extract_from_yaml_sync_cp1251(self, text_extractor):
+        """Тест YAML в cp1251: кодировка определяется, а не заменяется U+FFFD."""
+        content_bytes = "title: Отчёт о продажах за третий квартал\n".encode("cp1251")
+
+        result = text_extractor._extract_from_yaml_sync(content_bytes)
+
+        assert result == "title: Отчёт о продажах за третий квартал"
+
     def test_extract_from_yaml_sync_invalid(self, text_extractor):
         """Тест обработки некорректного YAML."""
         invalid_yaml = b"invalid: yaml: content: ["
@@ -150,6 +463,186 @@ class TestTextExtractor:
         with pytest.raises(ValueError, match="Error processing YAML"):
             text_extractor._extract_from_yaml_sync(invalid_yaml)
 
+    def test_extract_from_yaml_sync_recursive_alias(self, text_extractor):
+        """Тест: рекурсивный алиас YAML отклоняется, а не обходится бесконечно."""
+        with pytest.raises(ValueError, match="Recursive reference"):
+            text_extractor._extract_from_yaml_sync(b"a: &a [x, *a]")
+
+    def test_extract_from_yaml_sync_alias_limits(self, text_extractor):
+        """Тест ограничений обхода YAML с алиасами: общие узлы и размер."""
+        shared = b"a: &a [x]\nb: *a\n"
+        assert text_extractor._extract_from_yaml_sync(shared) == "a[0]: x\nb[0]: x"
+
+        with patch("app.extractors._YAML_ALIAS_MAX_ITEMS", 3):
+            with pytest.raises(ValueError, match="Too many elements"):
+                text_extractor._extract_from_yaml_sync(shared)
+
+    def test_structured_strings_depth_limit(self):
+        """Тест ограничения вложенности при обходе документа."""
+        data = []
+        for _ in range(2000):
+            data = [data]
+
+        with pytest.raises(ValueError, match="too deep"):
+            _structured_strings(data)
+
+    def test_decode_eml_header(self, text_extractor):
+        """Тест декодирования заголовков EML с encoded-word и без них."""
+        assert text_extractor._decode_eml_header("Plain =? subject") == (
+            "Plain =? subject"
+        )
+        assert (
+            text_extractor._decode_eml_header(
+                "=?utf-8?b?0KLQtdGB0YLQvtCy0L7QtSDQv9C40YHRjNC80L4=?="
+            )
+            == "Тестовое письмо"
+        )
+
+    def test_extract_eml_headers(self, text_extractor):
+        """Тест порядка заголовков EML и выбора первого вхождения."""
+        import email
+
+        msg = email.message_from_bytes(
+            b"Date: Mon, 1 Jan 2024 00:00:00 +0000\r\n"
+            b"subject: First\r\n"
+            b"Received: from mx\r\n"
+            b"FROM: a@example.com\r\n"
+            b"Subject: Second\r\n"
+            b"\r\nBody"
+        )
+
+        assert text_extractor._extract_eml_headers(msg) == [
+            "From: a@example.com",
+            "Subject: First",
+            "Date: Mon, 1 Jan 2024 00:00:00 +0000",
+        ]
+
+    def test_extract_from_eml_sync_html_part(self, text_extractor):
+        """Тест извлечения текста из HTML-части письма без разметки и стилей."""
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+
+        message = MIMEMultipart("alternative")
+        message["Subject"] = "Письмо"
+        message.attach(
+            MIMEText(
+                "<html><head><style>p {color: red}</style></head>"
+                "<body><p>Текст <b>письма</b></p></body></html>",
+                "html",
+                "utf-8",
+            )
+        )
+
+        result = text_extractor._extract_from_eml_sync(message.as_bytes())
+
+        assert result.endswith("---\nТекст письма")
+
+    def test_extract_from_eml_sync_alternative_prefers_plain(self, text_extractor):
+        """Тест multipart/alternative: HTML-вариант не разбирается при наличии текста."""
+        pytest.importorskip("selectolax")
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+
+        message = MIMEMultipart("mixed")
+        alternative = MIMEMultipart("alternative")
+        alternative.attach(MIMEText("Текст письма", "plain", "utf-8"))
+        alternative.attach(MIMEText("<p>Текст письма</p>", "html", "utf-8"))
+        message.attach(alternative)
+        message.attach(MIMEText("<p>Приложение</p>", "html", "utf-8"))
+
+        with patch(
+            "app.extractors._lexbor_html_text", return_value="Приложение"
+        ) as mock_html:
+            result = text_extractor._extract_from_eml_sync(message.as_bytes())
+
+        assert result.split("---\n")[1] == "Текст письма\nПриложение"
+        mock_html.assert_called_once()
+
+    def test_extract_from_msg_sync_eml_format(self, text_extractor):
+        """Тест разбора MSG в формате EML парсером писем."""
+        content = (Path(__file__).parent / "test.msg").read_bytes()
+
+        result = text_extractor._extract_from_msg_sync(content)
+
+        assert "Subject: Тестовое письмо" in result
+        assert "Это тестовое письмо в формате EML" in result
+        assert not text_extractor._looks_like_eml(b"\xd0\xcf\x11\xe0" + content)
+
+    def test_extract_from_msg_sync_control_chars(self, text_extractor):
+        """Тест очистки управляющих символов в тексте MSG."""
+        content = (
+            b"\x00\x00\x01\x00"
+            + "Тема\x00\x07 письма\tо поставке\r\n".encode("utf-16le")
+            + b"\x1f\x00"
+        )
+
+        result = text_extractor._extract_from_msg_sync(content)
+
+        assert result.splitlines()[0] == "Тема письма\tо поставке"
+
+        # ASCII-текст среди двоичных данных извлекается без байтов вне ASCII
+        content = b"\xff\xfe\x81Subject:\xd0\x9f plain\x80 ascii text\n\xfe"
+        assert "Subject: plain ascii text" in (
+            text_extractor._extract_from_msg_sync(content).splitlines()
+        )
+
+    def test_extract_from_epub_sync(self, text_extractor):
+        """Тест извлечения из EPUB: Lexbor и запасной BeautifulSoup дают один текст."""
+        content = (Path(__file__).parent / "test.epub").read_bytes()
+
+        result = text_extractor._extract_from_epub_sync(content)
+        with patch("app.extractors.LexborHTMLParser", None):
+            soup_result = text_extractor._extract_from_epub_sync(content)
+
+        assert "Алфавитный указатель" in result
+        assert result.split() == soup_result.split()
+
+    def test_extract_from_epub_sync_size_limit_counts_chapters(self, text_extractor):
+        """Тест лимита EPUB: крупное изображение не обрывает извлечение глав."""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as epub:
+            epub.writestr("OEBPS/cover.jpg", b"\0" * 2000)
+            epub.writestr(
+                "OEBPS/ch1.xhtml", "<html><body><p>Глава один</p></body></html>"
+            )
+            epub.writestr(
+                "OEBPS/ch2.xhtml", "<html><body><p>Глава два</p></body></html>"
+            )
+
+        with patch("app.extractors.settings.MAX_EXTRACTED_SIZE", 1000):
+            result = text_extractor._extract_from_epub_sync(buffer.getvalue())
+
+        assert result == "Глава один\n\nГлава два"
+
+    def test_validate_zip_size(self, text_extractor):
+        """Тест защиты от zip bomb по суммарному размеру файлов."""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("data/", b"")
+            archive.writestr("data/a.txt", b"\0" * 600)
+            archive.writestr("data/b.txt", b"\0" * 600)
+
+        with zipfile.ZipFile(buffer) as zip_ref:
+            with patch("app.extractors.settings.MAX_EXTRACTED_SIZE", 1200):
+                text_extractor._validate_zip_size(zip_ref)
+            with patch("app.extractors.settings.MAX_EXTRACTED_SIZE", 1199):
+                with pytest.raises(ValueError, match="zip bomb protection"):
+                    text_extractor._validate_zip_size(zip_ref)
+
+    def test_extract_from_epub_sync_utf16_chapter(self, text_extractor):
+        """Тест главы EPUB в UTF-16 с BOM."""
+        pytest.importorskip("selectolax")
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as epub:
+            epub.writestr(
+                "OEBPS/ch1.xhtml",
+                "<html><body><p>Глава в UTF-16</p></body></html>".encode("utf-16"),
+            )
+
+        result = text_extractor._extract_from_epub_sync(buffer.getvalue())
+
+        assert result == "Глава в UTF-16"
+
     def test_extract_from_html_sync(self, text_extractor):
         """Тест синхронного извлечения из HTML файла."""
         html_content = """<html>
@@ -167,6 +660,40 @@ class TestTextExtractor:
         assert "Заголовок" in result
         assert "Тестовый параграф с жирным текстом." in result
 
+    def test_extract_from_html_sync_lexbor_matches_bs4(self, text_extractor):
+        """Тест разбора HTML через Lexbor: результат совпадает с BeautifulSoup."""
+        pytest.importorskip("selectolax")
+        html_content = """<html><head><title>Заголовок</title>
+        <style>p { color: red; }</style><script>var a = 1;</script></head>
+        <body><!-- комментарий --><p>Текст  с  пробелами&nbsp;и &amp; сущностями</p>
+        <ul><li>Один</li><li>Два</li></ul><pre>  код
+           с отступами</pre><p>Без закрытия<br>после br</body></html>"""
+        content_bytes = html_content.encode("utf-8")
+
+        fast_result = text_extractor._extract_from_html_sync(content_bytes)
+        with patch("app.extractors.LexborHTMLParser", None):
+            bs4_result = text_extractor._extract_from_html_sync(content_bytes)
+
+        assert fast_result == bs4_result
+        assert "var a" not in fast_result
+        assert "комментарий" not in fast_result
+
+    def test_extract_text_from_html_web_lexbor_matches_bs4(self, text_extractor):
+        """Тест текста веб-страницы через Lexbor: совпадение с BeautifulSoup."""
+        pytest.importorskip("selectolax")
+        html_content = """<html><head><style>p {}</style></head><body>
+        <header>Шапка</header><nav><a href="/">Меню</a></nav>
+        <main><h1>Статья</h1><p>Первый   абзац</p><script>var a = 1;</script>
+        <aside>Реклама</aside><p>Второй<br>абзац</p></main>
+        <footer>Подвал</footer></body></html>"""
+
+        fast_result = text_extractor._extract_text_from_html(html_content)
+        with patch("app.extractors.LexborHTMLParser", None):
+            bs4_result = text_extractor._extract_text_from_html(html_content)
+
+        assert fast_result == bs4_result
+        assert fast_result == "СтатьяПервый   абзац\nВторойабзац"
+
     def test_extract_from_source_code_sync(self, text_extractor):
         """Тест синхронного извлечения из файла исходного кода."""
         python_content = """#!/usr/bin/env python3
@@ -241,12 +768,438 @@ if __name__ == "__main__":
                     assert "OCR текст" in result
                     assert "[Изображение 1]" in result
 
+    @patch("app.extractors.pdfplumber")
+    def test_extract_from_pdf_sync_ocr_order(self, mock_pdfplumber, text_extractor):
+        """Тест сохранения порядка страниц при пакетном OCR изображений PDF."""
+        mock_pages = []
+        for page_num in range(1, 4):
+            mock_page = Mock()
+            mock_page.extract_text.return_value = f"Текст {page_num}"
+            mock_page.images = [
+                {"page": page_num, "img": img, "x0": 0, "y0": 0, "x1": 200, "y1": 200}
+                for img in (1, 2)
+            ]
+            mock_pages.append(mock_page)
+        mock_pdf = Mock()
+        mock_pdf.pages = mock_pages
+        mock_pdfplumber.open.return_value.__enter__.return_value = mock_pdf
+
+        def fake_batch(items, render_lock):
+            # Первые пакеты распознаются дольше последующих
+            time.sleep(0.05 if items[0][1]["page"] == 1 else 0)
+            return [f"OCR {img['page']}.{img['img']}" for _, img in items]
+
+        with patch.object(
+            text_extractor, "_ocr_pdf_images_batch", side_effect=fake_batch
+        ) as mock_batch:
+            result = text_extractor._extract_from_pdf_sync(b"fake pdf content")
+
+        # 6 изображений делятся между 4 воркерами пакетами по 2
+        assert mock_batch.call_count == 3
+        positions = [
+            result.index(marker)
+            for page_num in range(1, 4)
+            for marker in (
+                f"Текст {page_num}",
+                f"OCR {page_num}.1",
+                f"OCR {page_num}.2",
+            )
+        ]
+        assert positions == sorted(positions)
+
+    @patch("app.extractors.pdfplumber")
+    def test_extract_from_pdf_sync_ocr_overlaps_text(
+        self, mock_pdfplumber, text_extractor
+    ):
+        """Тест OCR полных пакетов PDF параллельно с разбором следующих страниц."""
+        batch_started = threading.Event()
+        overlapped = []
+
+        def last_page_text():
+            overlapped.append(batch_started.wait(5))
+            return "Текст 10"
+
+        mock_pages = []
+        for page_num in range(1, 11):
+            mock_page = Mock()
+            mock_page.extract_text.return_value = f"Текст {page_num}"
+            mock_page.images = [
+                {"page": page_num, "img": img, "x0": 0, "y0": 0, "x1": 200, "y1": 200}
+                for img in (1, 2)
+            ]
+            mock_pages.append(mock_page)
+        mock_pages[-1].extract_text.side_effect = last_page_text
+        mock_pdf = Mock()
+        mock_pdf.pages = mock_pages
+        mock_pdfplumber.open.return_value.__enter__.return_value = mock_pdf
+
+        def fake_batch(items, render_lock):
+            batch_started.set()
+            return [f"OCR {img['page']}.{img['img']}" for _, img in items]
+
+        with patch.object(
+            text_extractor, "_ocr_pdf_images_batch", side_effect=fake_batch
+        ) as mock_batch:
+            result = text_extractor._extract_from_pdf_sync(b"fake pdf content")
+
+        assert overlapped == [True]
+        # Два полных пакета по 8 изображений и остаток 4 изображения по одному
+        assert [len(call.args[0]) for call in mock_batch.call_args_list] == [
+            8,
+            8,
+            1,
+            1,
+            1,
+            1,
+        ]
+        assert result == "\n\n".join(
+            f"[Страница {page_num}]\nТекст {page_num}\n\n"
+            f"[Изображение 1]\nOCR {page_num}.1\n\n"
+            f"[Изображение 2]\nOCR {page_num}.2"
+            for page_num in range(1, 11)
+        )
+
+    @patch("app.extractors.pdfplumber")
+    def test_extract_from_pdf_sync_skips_small_images(
+        self, mock_pdfplumber, text_extractor
+    ):
+        """Тест пропуска мелких изображений PDF перед OCR."""
+        mock_page = Mock()
+        mock_page.extract_text.return_value = "Текст страницы"
+        photo = {"x0": 50, "y0": 100, "x1": 350, "y1": 400}
+        mock_page.images = [
+            {"x0": 10, "y0": 10, "x1": 40, "y1": 40},  # логотип
+            photo,
+            {"x0": 0, "y0": 500, "x1": 600, "y1": 502},  # линия
+        ]
+        mock_pdf = Mock()
+        mock_pdf.pages = [mock_page]
+        mock_pdfplumber.open.return_value.__enter__.return_value = mock_pdf
+
+        with patch.object(
+            text_extractor, "_ocr_from_pdf_image_sync", return_value="OCR текст"
+        ) as mock_ocr:
+            result = text_extractor._extract_from_pdf_sync(b"fake pdf content")
+
+        mock_ocr.assert_called_once()
+        assert mock_ocr.call_args[0][1] is photo
+        assert "[Изображение 1]\nOCR текст" in result
+
+        with patch("app.extractors.settings.MIN_OCR_IMAGE_AREA", 0):
+            with patch.object(
+                text_extractor, "_ocr_pdf_images", return_value=["", "", ""]
+            ) as mock_ocr_images:
+                text_extractor._extract_from_pdf_sync(b"fake pdf content")
+
+        assert len(mock_ocr_images.call_args[0][0]) == 3
+
+    def test_extract_from_pdf_sync_pdfium(self, text_extractor):
+        """Тест быстрого извлечения текстового PDF через PDFium."""
+        pytest.importorskip("pypdfium2")
+        pdf_path = Path(__file__).parent / "test.pdf"
+
+        with patch("app.extractors.pdfplumber") as mock_pdfplumber:
+            result = text_extractor._extract_from_pdf_sync(pdf_path.read_bytes())
+
+        assert result.startswith("[Страница 1]\nДОГОВОР ПОСТАВКИ")
+        assert "[Страница 3]" in result
+        assert "\r" not in result
+        mock_pdfplumber.open.assert_not_called()
+
+    def test_extract_pdf_text_with_pdfium_fallback(self, text_extractor):
+        """Тест отказа от PDFium для страниц с изображениями и битых файлов."""
+        pytest.importorskip("pypdfium2")
+        image_pdf = (Path(__file__).parent / "test.image.pdf").read_bytes()
+
+        assert text_extractor._extract_pdf_text_with_pdfium(image_pdf) == ([""], [1])
+        assert text_extractor._extract_pdf_text_with_pdfium(b"not a pdf") is None
+
+    def test_extract_pdf_text_with_pdfium_small_images(self, text_extractor):
+        """Тест быстрого пути PDFium для страниц только с мелкими изображениями."""
+        pdfium = pytest.importorskip("pypdfium2")
+        from PIL import Image
+
+        def make_pdf(scale):
+            pdf = pdfium.PdfDocument(Path(__file__).parent / "test.pdf")
+            image = pdfium.PdfImage.new(pdf)
+            image.set_bitmap(pdfium.PdfBitmap.from_pil(Image.new("RGB", (8, 8))))
+            image.set_matrix(pdfium.PdfMatrix().scale(scale, scale))
+            page = pdf[0]
+            page.insert_obj(image)
+            page.gen_content()
+            buffer = io.BytesIO()
+            pdf.save(buffer)
+            return buffer.getvalue()
+
+        with patch("app.extractors.settings.MIN_OCR_IMAGE_AREA", 10000):
+            logo_pages, logo_ocr = text_extractor._extract_pdf_text_with_pdfium(
+                make_pdf(20)
+            )
+            scan_pages, scan_ocr = text_extractor._extract_pdf_text_with_pdfium(
+                make_pdf(300)
+            )
+
+        assert logo_ocr == []
+        assert logo_pages[0].startswith("[Страница 1]\nДОГОВОР ПОСТАВКИ")
+        assert scan_ocr == [1]
+        assert scan_pages[0] == ""
+        assert scan_pages[1].startswith("[Страница 2]")
+
+    def test_extract_from_pdf_sync_pdfium_hybrid(self, text_extractor):
+        """Тест разбора через pdfplumber только страниц с изображениями для OCR."""
+        pdfium = pytest.importorskip("pypdfium2")
+        from PIL import Image
+
+        pdf = pdfium.PdfDocument(Path(__file__).parent / "test.pdf")
+        image = pdfium.PdfImage.new(pdf)
+        image.set_bitmap(pdfium.PdfBitmap.from_pil(Image.new("RGB", (8, 8))))
+        image.set_matrix(pdfium.PdfMatrix().scale(300, 300))
+        page = pdf[1]
+        page.insert_obj(image)
+        page.gen_content()
+        buffer = io.BytesIO()
+        pdf.save(buffer)
+
+        page_2 = Mock()
+        page_2.extract_text.return_value = "Текст pdfplumber"
+        page_2.images = [{"x0": 0, "y0": 0, "x1": 300, "y1": 300}]
+
+        with (
+            patch("app.extractors.pdfplumber") as mock_pdfplumber,
+            patch.object(text_extractor, "_ocr_pdf_images", return_value=["OCR"]),
+        ):
+            mock_pdfplumber.open.return_value.__enter__.return_value.pages = [page_2]
+            result = text_extractor._extract_from_pdf_sync(buffer.getvalue())
+
+        assert mock_pdfplumber.open.call_args.kwargs["pages"] == [2]
+        blocks = result.split("\n\n")
+        assert blocks[0].startswith("[Страница 1]\nДОГОВОР ПОСТАВКИ")
+        assert "[Страница 2]\nТекст pdfplumber\n\n[Изображение 1]\nOCR" in result
+        assert result.index("[Изображение 1]") < result.index("[Страница 3]")
+
+    def test_render_pdf_image_sync_page_cache(self, text_extractor):
+        """Тест однократного рендера страницы для всех её изображений PDF."""
+        mock_page = Mock()
+        mock_page.page_number = 1
+        page_image = mock_page.to_image.return_value
+        page_image.bbox = (0, 0, 595, 842)
+        page_image.scale = 2
+        images = [
+            {"x0": 0, "top": 10, "x1": 72, "bottom": 82, "y0": 760, "y1": 832},
+            {"x0": 100, "top": 200, "x1": 136, "bottom": 236, "y0": 606, "y1": 642},
+        ]
+        page_render_cache = {}
+
+        with patch("app.extractors.settings.OCR_PDF_RESOLUTION", 144):
+            for img_info in images:
+                text_extractor._render_pdf_image_sync(
+                    mock_page, img_info, page_render_cache
+                )
+
+        mock_page.to_image.assert_called_once_with(resolution=144)
+        mock_page.crop.assert_not_called()
+        assert [call.args[0] for call in page_image.original.crop.call_args_list] == [
+            (0, 20, 144, 164),
+            (200, 400, 272, 472),
+        ]
+
+    def test_render_pdf_image_sync_pdfium_lock(self, text_extractor):
+        """Тест рендера PDF под общей блокировкой PDFium параллельно с быстрым путём."""
+        import pdfplumber
+        from pdfplumber.page import Page
+
+        class OwnedLock:
+            """Блокировка, запоминающая владеющий поток."""
+
+            def __init__(self):
+                self.lock = threading.Lock()
+                self.owner = None
+
+            def __enter__(self):
+                self.lock.acquire()
+                self.owner = threading.get_ident()
+
+            def __exit__(self, *exc_info):
+                self.owner = None
+                self.lock.release()
+
+        pdfium_lock = OwnedLock()
+        text_pdf = (Path(__file__).parent / "test.pdf").read_bytes()
+        image_pdf = Path(__file__).parent / "test.image.pdf"
+        original_to_image = Page.to_image
+        lock_held = []
+
+        def to_image(page, *args, **kwargs):
+            lock_held.append(pdfium_lock.owner == threading.get_ident())
+            return original_to_image(page, *args, **kwargs)
+
+        stop = threading.Event()
+
+        def fast_path():
+            while not stop.is_set():
+                assert text_extractor._extract_pdf_text_with_pdfium(text_pdf)
+
+        with pdfplumber.open(image_pdf) as pdf:
+            page = pdf.pages[0]
+            img_info = page.images[0]
+            with (
+                patch.object(Page, "to_image", to_image),
+                patch("app.extractors._PDFIUM_LOCK", pdfium_lock),
+                concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor,
+            ):
+                future = executor.submit(fast_path)
+                try:
+                    for _ in range(3):
+                        image = text_extractor._render_pdf_image_sync(page, img_info)
+                        assert image is not None
+                finally:
+                    stop.set()
+                future.result()
+
+        assert lock_held == [True, True, True]
+
+    def test_ocr_pdf_images_prepared(self, text_extractor):
+        """Тест подготовки изображений PDF к OCR: оттенки серого и бинаризация."""
+        import pdfplumber
+        from PIL import Image
+
+        pdf_path = Path(__file__).parent / "test.image.pdf"
+        modes = []
+
+        def fake_ocr(image, temp_image_path=None):
+            modes.append(image.mode)
+            return ""
+
+        def fake_batch(image_paths):
+            for image_path in image_paths:
+                with Image.open(image_path) as image:
+                    modes.append(image.mode)
+            return [""] * len(image_paths)
+
+        with (
+            pdfplumber.open(pdf_path) as pdf,
+            patch.object(text_extractor, "_safe_tesseract_ocr", side_effect=fake_ocr),
+            patch.object(
+                text_extractor, "_safe_tesseract_ocr_batch", side_effect=fake_batch
+            ),
+        ):
+            page = pdf.pages[0]
+            img_info = page.images[0]
+            render_lock = threading.Lock()
+            for binarize in (False, True):
+                with patch("app.extractors.settings.OCR_BINARIZE", binarize):
+                    text_extractor._ocr_from_pdf_image_sync(page, img_info, render_lock)
+                    text_extractor._ocr_pdf_images_batch(
+                        [(page, img_info), (page, img_info)], render_lock
+                    )
+
+        assert modes == ["L", "L", "L", "1", "1", "1"]
+
+    def test_render_pdf_image_sync_region(self, text_extractor):
+        """Тест вырезания изображения PDF по координатам от верха страницы."""
+        import pdfplumber
+
+        pdf_path = Path(__file__).parent / "test.image.pdf"
+
+        with pdfplumber.open(pdf_path) as pdf:
+            page = pdf.pages[0]
+            img_info = page.images[0]
+            with patch("app.extractors.settings.OCR_PDF_RESOLUTION", 72):
+                image = text_extractor._render_pdf_image_sync(page, img_info)
+
+        width, height = image.size
+        assert abs(width - (img_info["x1"] - img_info["x0"])) <= 1
+        assert abs(height - (img_info["bottom"] - img_info["top"])) <= 1
+        # Над изображением на странице пустые строки: в вырезанную область
+        # они не попадают
+        gray = image.convert("L")
+        assert all(
+            gray.crop((0, y, gray.width, y + 1)).getextrema()[0] < 255
+            for y in range(gray.height)
+        )
+
+    def test_safe_tesseract_ocr_batch(self, text_extractor, tmp_path):
+        """Тест разбора результата пакетного запуска Tesseract."""
+        image_paths = [str(tmp_path / "image_0.png"), str(tmp_path / "image_1.png")]
+
+        with patch.object(
+            text_extractor, "_run_tesseract", return_value="Первый\n\fВторой\n\f"
+        ) as mock_run:
+            assert text_extractor._safe_tesseract_ocr_batch(image_paths) == [
+                "Первый",
+                "Второй",
+            ]
+
+        list_path = mock_run.call_args[0][0]
+        assert (tmp_path / "images.txt").read_text(encoding="utf-8").split() == (
+            image_paths
+        )
+        assert list_path == str(tmp_path / "images.txt")
+
+        # Несовпадение числа страниц — сигнал распознать изображения по одному
+        with patch.object(text_extractor, "_run_tesseract", return_value="Один"):
+            assert text_extractor._safe_tesseract_ocr_batch(image_paths) is None
+
+    def test_run_tesseract_stdout(self, text_extractor):
+        """Тест чтения результата Tesseract из stdout без файла вывода."""
+        ok_result = Mock(returncode=0, stdout="Распознано\n".encode("utf-8"))
+        with patch(
+            "app.utils.run_subprocess_with_limits", return_value=ok_result
+        ) as mock_run:
+            assert text_extractor._run_tesseract("/tmp/image.png", 30) == "Распознано\n"
+
+        command = mock_run.call_args.kwargs["command"]
+        assert command[:3] == ["tesseract", "/tmp/image.png", "stdout"]
+        assert mock_run.call_args.kwargs["text"] is False
+
+        error_result = Mock(returncode=1, stdout=b"", stderr=b"error")
+        with patch("app.utils.run_subprocess_with_limits", return_value=error_result):
+            assert text_extractor._run_tesseract("/tmp/image.png", 30) is None
+
+    def test_safe_tesseract_ocr_stdin(self, text_extractor):
+        """Тест передачи изображения Tesseract через stdin без временного файла."""
+        from PIL import Image
+
+        ok_result = Mock(returncode=0, stdout=" Текст \n".encode("utf-8"))
+        with patch(
+            "app.utils.run_subprocess_with_limits", return_value=ok_result
+        ) as mock_run:
+            text = text_extractor._safe_tesseract_ocr(Image.new("P", (8, 8)))
+
+        assert text == "Текст"
+        assert mock_run.call_args.kwargs["command"][1] == "stdin"
+        assert mock_run.call_args.kwargs["input"].startswith(b"\x89PNG")
+
+    def test_safe_tesseract_ocr_in_process(self, text_extractor):
+        """Тест OCR через tesserocr: один экземпляр API на поток, без подпроцесса."""
+        from PIL import Image
+
+        mock_tesserocr = Mock()
+        api = mock_tesserocr.PyTessBaseAPI.return_value
+        api.GetUTF8Text.return_value = "Текст\n"
+        with (
+            patch("app.extractors.tesserocr", mock_tesserocr),
+            patch("app.extractors.settings.OCR_IN_PROCESS", True),
+            patch("app.utils.run_subprocess_with_limits") as mock_run,
+        ):
+            for _ in range(2):
+                text = text_extractor._safe_tesseract_ocr(Image.new("L", (8, 8)))
+
+        assert text == "Текст"
+        mock_tesserocr.PyTessBaseAPI.assert_called_once_with(
+            lang=text_extractor.ocr_languages
+        )
+        assert api.SetImage.call_count == 2
+        mock_run.assert_not_called()
+
     @patch("app.extractors.Image")
     def test_extract_from_image_sync(self, mock_image_class, text_extractor):
         """Тест синхронного извлечения из изображения."""
         # Image.open() используется как context manager (with-блок).
         # Используем MagicMock + __enter__/__exit__ для поддержки протокола.
         mock_image = Mock()
+        mock_image.size = (800, 600)
+        mock_image.mode = "L"
         mock_image_class.open.return_value.__enter__.return_value = mock_image
         mock_image_class.open.return_value.__exit__.return_value = False
 
@@ -264,6 +1217,8 @@ if __name__ == "__main__":
     def test_extract_from_image_sync_no_text(self, mock_image_class, text_extractor):
         """Тест извлечения из изображения без текста."""
         mock_image = Mock()
+        mock_image.size = (800, 600)
+        mock_image.mode = "L"
         mock_image_class.open.return_value.__enter__.return_value = mock_image
         mock_image_class.open.return_value.__exit__.return_value = False
 
@@ -275,6 +1230,42 @@ if __name__ == "__main__":
 
                 assert result == ""
 
+    def test_prepare_image_for_ocr(self, text_extractor):
+        """Тест уменьшения и перевода в оттенки серого перед OCR."""
+        from PIL import Image
+
+        with patch("app.extractors.settings.OCR_MAX_IMAGE_EDGE", 1000):
+            large = text_extractor._prepare_image_for_ocr(
+                Image.new("RGB", (4000, 2000), "white")
+            )
+            small = text_extractor._prepare_image_for_ocr(
+                Image.new("RGB", (400, 200), "white")
+            )
+
+        assert large.size == (1000, 500)
+        assert large.mode == "L"
+        assert small.size == (400, 200)
+        assert small.mode == "L"
+
+    def test_prepare_image_for_ocr_binarize(self, text_extractor):
+        """Тест адаптивной бинаризации: тень на фоне не становится текстом."""
+        from PIL import Image, ImageDraw
+
+        image = Image.new("L", (200, 100), 230)
+        draw = ImageDraw.Draw(image)
+        draw.rectangle((100, 0, 199, 99), fill=120)  # тень на правой половине
+        draw.rectangle((20, 45, 80, 55), fill=150)  # текст на светлом фоне
+        draw.rectangle((120, 45, 180, 55), fill=40)  # текст в тени
+
+        with patch("app.extractors.settings.OCR_BINARIZE", True):
+            result = text_extractor._prepare_image_for_ocr(image)
+
+        assert result.mode == "1"
+        assert result.getpixel((50, 50)) == 0
+        assert result.getpixel((150, 50)) == 0
+        assert result.getpixel((50, 10)) == 255
+        assert result.getpixel((150, 10)) == 255
+
     @patch("app.extractors.Document")
     def test_extract_from_docx_sync(self, mock_document, text_extractor):
         """Тест синхронного извлечения из DOCX."""
@@ -290,6 +1281,149 @@ if __name__ == "__main__":
 
         assert "Тестовый параграф" in result
 
+    def test_extract_from_docx_sync_xml_matches_python_docx(self, text_extractor):
+        """Тест прямого разбора XML DOCX: результат совпадает с python-docx."""
+        from docx import Document
+
+        document = Document()
+        document.add_paragraph("Первый параграф")
+        table = document.add_table(rows=2, cols=2)
+        for row in range(2):
+            for col in range(2):
+                table.cell(row, col).text = f"r{row}c{col}"
+        table.cell(0, 0).merge(table.cell(0, 1))
+        document.sections[0].header.paragraphs[0].text = "Колонтитул"
+        buffer = io.BytesIO()
+        document.save(buffer)
+        content = buffer.getvalue()
+
+        fast_result = text_extractor._extract_from_docx_sync(content)
+        with patch("app.extractors.lxml_etree", None):
+            docx_result = text_extractor._extract_from_docx_sync(content)
+
+        assert fast_result == docx_result
+        assert "Первый параграф" in fast_result
+        assert "r0c0\nr0c1\tr0c0\nr0c1" in fast_result
+        assert "[Колонтитул - Заголовок]\nКолонтитул" in fast_result
+
+    def test_extract_from_docx_sync_xml_vertical_merge(self, text_extractor):
+        """Тест вертикально объединённых ячеек DOCX: совпадение с python-docx."""
+        from docx import Document
+
+        document = Document()
+        table = document.add_table(rows=3, cols=3)
+        for row in range(3):
+            for col in range(3):
+                table.cell(row, col).text = f"r{row}c{col}"
+        table.cell(0, 0).merge(table.cell(2, 0))
+        table.cell(1, 1).merge(table.cell(2, 2))
+        buffer = io.BytesIO()
+        document.save(buffer)
+        content = buffer.getvalue()
+
+        fast_result = text_extractor._extract_from_docx_sync(content)
+        with patch("app.extractors.lxml_etree", None):
+            docx_result = text_extractor._extract_from_docx_sync(content)
+
+        assert fast_result == docx_result
+        assert "r0c0\nr1c0\nr2c0\tr1c1\nr1c2\nr2c1\nr2c2" in fast_result
+
+    def test_extract_from_docx_sync_xml_invalid_grid_span(self, text_extractor):
+        """Тест некорректного и огромного gridSpan: ячейка не размножается."""
+        from docx import Document
+        from docx.oxml import OxmlElement
+        from docx.oxml.ns import qn
+
+        document = Document()
+        table = document.add_table(rows=2, cols=2)
+        for row in range(2):
+            for col in range(2):
+                table.cell(row, col).text = f"r{row}c{col}"
+        first_cells = [table.cell(row, 0)._tc for row in range(2)]
+        for tc, value in zip(first_cells, ("abc", "100000000")):
+            grid_span = OxmlElement("w:gridSpan")
+            grid_span.set(qn("w:val"), value)
+            tc.get_or_add_tcPr().append(grid_span)
+        buffer = io.BytesIO()
+        document.save(buffer)
+
+        result = text_extractor._extract_from_docx_sync(buffer.getvalue())
+
+        assert "r0c0\tr0c1" in result
+        assert "\t".join(["r1c0"] * 63 + ["r1c1"]) in result
+
+    def test_extract_from_pptx_sync_xml_matches_python_pptx(self, text_extractor):
+        """Тест прямого разбора XML PPTX: результат совпадает с python-pptx."""
+        from pptx import Presentation
+        from pptx.util import Inches
+
+        presentation = Presentation()
+        for slide_num in range(2):
+            slide = presentation.slides.add_slide(presentation.slide_layouts[1])
+            slide.shapes.title.text = f"Слайд {slide_num}"
+            body = slide.placeholders[1].text_frame
+            body.text = "Строка\vразрыв"
+            body.add_paragraph().text = "Пункт"
+            group = slide.shapes.add_group_shape()
+            group.shapes.add_textbox(0, 0, Inches(1), Inches(1)).text = "Группа"
+            if slide_num == 0:
+                slide.notes_slide.notes_text_frame.text = "Заметка"
+        buffer = io.BytesIO()
+        presentation.save(buffer)
+        content = buffer.getvalue()
+
+        fast_result = text_extractor._extract_from_pptx_sync(content)
+        with patch("app.extractors.lxml_etree", None):
+            pptx_result = text_extractor._extract_from_pptx_sync(content)
+
+        assert fast_result == pptx_result
+        assert fast_result.startswith(
+            "[Слайд 1]\nСлайд 0\nСтрока\vразрыв\nПункт\n[Заметки спикера]\nЗаметка"
+        )
+        assert "[Слайд 2]" in fast_result
+
+    def test_extract_from_pptx_sync_fallback_no_notes_created(self, text_extractor):
+        """Тест fallback python-pptx: слайды заметок для слайдов без них не создаются."""
+        from pptx import Presentation
+        from pptx.parts.slide import SlidePart
+
+        presentation = Presentation()
+        for slide_num in range(3):
+            slide = presentation.slides.add_slide(presentation.slide_layouts[1])
+            slide.shapes.title.text = f"Слайд {slide_num}"
+        presentation.slides[0].notes_slide.notes_text_frame.text = "Заметка"
+        buffer = io.BytesIO()
+        presentation.save(buffer)
+
+        with (
+            patch("app.extractors.lxml_etree", None),
+            patch.object(SlidePart, "_add_notes_slide_part") as mock_add_notes,
+        ):
+            result = text_extractor._extract_from_pptx_sync(buffer.getvalue())
+
+        mock_add_notes.assert_not_called()
+        assert result.count("[Заметки спикера]\nЗаметка") == 1
+
+    @patch("app.extractors.Presentation")
+    def test_extract_from_pptx_sync_skips_media(
+        self, mock_presentation, text_extractor
+    ):
+        """Тест: прямой разбор PPTX не распаковывает медиа и не вызывает python-pptx."""
+        content = (Path(__file__).parent / "test.pptx").read_bytes()
+        read_parts = []
+        original_read = zipfile.ZipFile.read
+
+        def tracking_read(self, name, *args, **kwargs):
+            read_parts.append(getattr(name, "filename", name))
+            return original_read(self, name, *args, **kwargs)
+
+        with patch.object(zipfile.ZipFile, "read", tracking_read):
+            result = text_extractor._extract_from_pptx_sync(content)
+
+        assert result.startswith("[Слайд 1]")
+        assert not any(part.startswith("ppt/media/") for part in read_parts)
+        mock_presentation.assert_not_called()
+
     @patch("app.extractors.Document")
     def test_extract_from_doc_sync(self, mock_document, text_extractor):
         """Тест синхронного извлечения из DOC."""
@@ -305,7 +1439,11 @@ if __name__ == "__main__":
         mock_result = Mock()
         mock_result.returncode = 0
 
-        with patch("tempfile.NamedTemporaryFile"):
+        # antiword недоступен — проверяем путь через LibreOffice
+        with (
+            patch("app.extractors.shutil.which", return_value=None),
+            patch("tempfile.NamedTemporaryFile"),
+        ):
             with patch("tempfile.mkdtemp"):
                 with patch(
                     "app.utils.run_subprocess_with_limits", return_value=mock_result
@@ -322,6 +1460,213 @@ if __name__ == "__main__":
 
                                     assert "Тестовый параграф из DOC" in result
 
+    def test_extract_from_doc_sync_antiword(self, text_extractor):
+        """Тест извлечения из DOC через antiword без конвертации в DOCX."""
+        antiword_result = Mock(returncode=0, stdout="Текст из antiword\n".encode())
+
+        with (
+            patch("app.extractors.shutil.which", return_value="/usr/bin/antiword"),
+            patch(
+                "app.utils.run_subprocess_with_limits", return_value=antiword_result
+            ) as mock_run,
+            patch.object(text_extractor, "_convert_with_libreoffice") as mock_convert,
+        ):
+            result = text_extractor._extract_from_doc_sync(b"fake doc content")
+
+        assert result == "Текст из antiword"
+        assert mock_run.call_args.kwargs["command"][0] == "antiword"
+        mock_convert.assert_not_called()
+
+    def test_extract_from_doc_sync_antiword_fallback(self, text_extractor):
+        """Тест перехода на LibreOffice при ошибке antiword."""
+        antiword_result = Mock(returncode=1, stdout=b"")
+
+        with (
+            patch("app.extractors.shutil.which", return_value="/usr/bin/antiword"),
+            patch("app.utils.run_subprocess_with_limits", return_value=antiword_result),
+            patch.object(
+                text_extractor, "_convert_with_libreoffice", return_value=b"docx"
+            ) as mock_convert,
+            patch.object(
+                text_extractor, "_extract_from_docx_sync", return_value="Текст из DOCX"
+            ),
+        ):
+            result = text_extractor._extract_from_doc_sync(b"fake doc content")
+
+        assert result == "Текст из DOCX"
+        mock_convert.assert_called_once_with(b"fake doc content", "doc", "docx")
+
+    def test_convert_with_libreoffice_reuses_profiles(self, tmp_path, text_extractor):
+        """Тест переиспользования профилей LibreOffice между конвертациями."""
+        commands = []
+
+        def fake_run(command, **kwargs):
+            commands.append(command)
+            outdir = command[command.index("--outdir") + 1]
+            source_name = os.path.splitext(os.path.basename(command[-1]))[0]
+            with open(os.path.join(outdir, f"{source_name}.docx"), "wb") as f:
+                f.write(b"docx content")
+            return Mock(returncode=0, stderr="")
+
+        with patch("app.utils.run_subprocess_with_limits", side_effect=fake_run):
+            for _ in range(2):
+                assert (
+                    text_extractor._convert_with_libreoffice(b"doc", "doc", "docx")
+                    == b"docx content"
+                )
+
+        profiles = [
+            arg
+            for command in commands
+            for arg in command
+            if arg.startswith("-env:UserInstallation=file://")
+        ]
+        assert len(profiles) == 2
+        assert (
+            text_extractor._libreoffice_profiles.qsize() == text_extractor._pool_workers
+        )
+
+        # Рабочая директория профиля переиспользуется и остаётся пустой
+        outdirs = {command[command.index("--outdir") + 1] for command in commands}
+        assert len(outdirs) <= 2
+        for outdir in outdirs:
+            assert os.listdir(outdir) == []
+
+    def test_init_extraction_process_registers_cleanup(self):
+        """Тест удаления профилей LibreOffice при завершении процесса пула."""
+        import app.extractors as extractors_module
+
+        with (
+            patch("app.utils.setup_logging"),
+            patch("app.extractors.settings.ENABLE_WARMUP", False),
+            patch("app.extractors.atexit.register") as mock_register,
+            patch.object(extractors_module, "_process_extractor", None),
+        ):
+            extractors_module.init_extraction_process()
+            extractor = extractors_module._process_extractor
+
+        try:
+            mock_register.assert_called_once_with(
+                extractor._remove_libreoffice_profiles
+            )
+        finally:
+            extractor._thread_pool.shutdown()
+
+    def test_libreoffice_dirs_private(self):
+        """Тест каталогов LibreOffice: случайные имена, права 0700, удаление."""
+        with patch("app.extractors.settings.OCR_WORKERS", 2):
+            extractor = TextExtractor()
+        extractor._thread_pool.shutdown()
+
+        slot_dirs = extractor._libreoffice_dirs
+        assert len(set(slot_dirs)) == 2
+        for slot_dir in slot_dirs:
+            assert os.path.basename(slot_dir).startswith(
+                f"extract-text-libreoffice-{os.getpid()}-"
+            )
+            assert os.stat(slot_dir).st_mode & 0o777 == 0o700
+            assert os.path.isdir(os.path.join(slot_dir, "work"))
+
+        extractor._remove_libreoffice_profiles()
+        assert not any(os.path.exists(slot_dir) for slot_dir in slot_dirs)
+
+    def test_ocr_workers_setting(self):
+        """Тест размера пула потоков экстрактора из OCR_WORKERS."""
+        with patch("app.extractors.settings.OCR_WORKERS", 2):
+            extractor = TextExtractor()
+
+        try:
+            assert extractor._thread_pool._max_workers == 2
+            assert extractor._libreoffice_profiles.qsize() == 2
+        finally:
+            extractor._thread_pool.shutdown()
+
+    def test_convert_with_libreoffice_unoserver(self, text_extractor):
+        """Тест конвертации через unoserver без запуска LibreOffice."""
+        unoconvert_result = Mock(returncode=0, stdout=b"docx content", stderr=b"")
+
+        with (
+            patch("app.extractors.settings.LIBREOFFICE_SERVER", "office:2003"),
+            patch("app.extractors.shutil.which", return_value="/usr/bin/unoconvert"),
+            patch(
+                "app.utils.run_subprocess_with_limits", return_value=unoconvert_result
+            ) as mock_run,
+        ):
+            result = text_extractor._convert_with_libreoffice(b"doc", "doc", "docx")
+
+        assert result == b"docx content"
+        mock_run.assert_called_once()
+        assert mock_run.call_args.kwargs["command"] == [
+            "unoconvert",
+            "--host",
+            "office",
+            "--port",
+            "2003",
+            "--convert-to",
+            "docx",
+            "-",
+            "-",
+        ]
+        assert mock_run.call_args.kwargs["input"] == b"doc"
+
+    def test_convert_with_libreoffice_unoserver_fallback(self, text_extractor):
+        """Тест перехода на локальный LibreOffice при ошибке unoserver."""
+        commands = []
+
+        def fake_run(command, **kwargs):
+            commands.append(command[0])
+            if command[0] == "unoconvert":
+                return Mock(returncode=1, stdout=b"", stderr=b"connection refused")
+            outdir = command[command.index("--outdir") + 1]
+            source_name = os.path.splitext(os.path.basename(command[-1]))[0]
+            with open(os.path.join(outdir, f"{source_name}.docx"), "wb") as f:
+                f.write(b"docx content")
+            return Mock(returncode=0, stderr="")
+
+        with (
+            patch("app.extractors.settings.LIBREOFFICE_SERVER", "127.0.0.1:2003"),
+            patch("app.extractors.shutil.which", return_value="/usr/bin/unoconvert"),
+            patch("app.utils.run_subprocess_with_limits", side_effect=fake_run),
+        ):
+            result = text_extractor._convert_with_libreoffice(b"doc", "doc", "docx")
+
+        assert result == b"docx content"
+        assert commands == ["unoconvert", "libreoffice"]
+
+    def test_convert_with_libreoffice_unoserver_timeout(self, text_extractor):
+        """Тест перехода на локальный LibreOffice, если unoserver не ответил."""
+        commands = []
+
+        def fake_run(command, **kwargs):
+            commands.append(command[0])
+            if command[0] == "unoconvert":
+                raise subprocess.TimeoutExpired(command, kwargs["timeout"])
+            outdir = command[command.index("--outdir") + 1]
+            source_name = os.path.splitext(os.path.basename(command[-1]))[0]
+            with open(os.path.join(outdir, f"{source_name}.docx"), "wb") as f:
+                f.write(b"docx content")
+            return Mock(returncode=0, stderr="")
+
+        with (
+            patch("app.extractors.settings.LIBREOFFICE_SERVER", "office"),
+            patch("app.extractors.shutil.which", return_value="/usr/bin/unoconvert"),
+            patch("app.utils.run_subprocess_with_limits", side_effect=fake_run),
+        ):
+            result = text_extractor._convert_with_libreoffice(b"doc", "doc", "docx")
+
+        assert result == b"docx content"
+        assert commands == ["unoconvert", "libreoffice"]
+
+    def test_parse_unoserver_address(self):
+        """Тест разбора LIBREOFFICE_SERVER с недостающим хостом или портом."""
+        assert _parse_unoserver_address("office:2004") == ("office", "2004")
+        assert _parse_unoserver_address("office") == ("office", "2003")
+        assert _parse_unoserver_address("office:") == ("office", "2003")
+        assert _parse_unoserver_address(":2004") == ("127.0.0.1", "2004")
+        assert _parse_unoserver_address("[::1]:2004") == ("::1", "2004")
+        assert _parse_unoserver_address("::1") == ("::1", "2003")
+
+    @patch("app.extractors.CalamineWorkbook", None)
     @patch("app.extractors.pd")
     def test_extract_from_excel_sync(self, mock_pd, text_extractor):
         """Тест синхронного извлечения из Excel."""
@@ -335,6 +1680,31 @@ if __name__ == "__main__":
         assert "col1,col2" in result
         assert "value1,value2" in result
 
+    @patch("app.extractors.pd")
+    def test_extract_from_excel_sync_calamine(self, mock_pd, text_extractor):
+        """Тест извлечения из Excel через calamine без pandas."""
+        mock_workbook = Mock()
+        mock_workbook.sheet_names = ["Sheet1"]
+        mock_workbook.get_sheet_by_name.return_value.iter_rows.return_value = [
+            ["col1", "", "col3"],
+            ["", "", ""],
+            ["value1", 2.0, 2.5],
+            [True, None, datetime(2024, 1, 2, 3, 4, 5)],
+        ]
+        mock_calamine = Mock()
+        mock_calamine.from_filelike.return_value = mock_workbook
+
+        with patch("app.extractors.CalamineWorkbook", mock_calamine):
+            result = text_extractor._extract_from_excel_sync(b"fake excel content")
+
+        assert result == (
+            "[Лист: Sheet1]\n\n"
+            "col1,Unnamed: 1,col3\n"
+            "value1,2,2.5\n"
+            "True,,2024-01-02 03:04:05\n"
+        )
+        mock_pd.read_excel.assert_not_called()
+
     def test_extract_from_archive(self, text_extractor):
         """Тест извлечения из архива."""
         # Создаем простой zip архив в памяти
@@ -350,6 +1720,33 @@ if __name__ == "__main__":
         assert result[0]["filename"] == "test.txt"
         assert result[0]["text"] == "Тестовый текст в архиве"
 
+    def test_extract_from_archive_tar_in_memory(self, text_extractor):
+        """Тест TAR.GZ: файлы читаются из памяти, на диск не распаковываются."""
+        archive_buffer = io.BytesIO()
+        with tarfile.open(fileobj=archive_buffer, mode="w:gz") as tar:
+            for name, text in (("docs/a.txt", "Первый"), ("docs/b.txt", "Второй")):
+                data = text.encode("utf-8")
+                member = tarfile.TarInfo(name)
+                member.size = len(data)
+                tar.addfile(member, io.BytesIO(data))
+
+        with (
+            patch("builtins.open", side_effect=AssertionError("запись на диск")),
+            patch(
+                "app.extractors.tempfile.TemporaryDirectory",
+                side_effect=AssertionError("временный каталог"),
+            ),
+        ):
+            result = text_extractor.extract_text(
+                archive_buffer.getvalue(), "docs.tar.gz"
+            )
+
+        assert [item["text"] for item in result] == ["Первый", "Второй"]
+        assert [item["path"] for item in result] == [
+            "docs.tar.gz/docs/a.txt",
+            "docs.tar.gz/docs/b.txt",
+        ]
+
     def test_sanitize_archive_filename(self, text_extractor):
         """Тест санитизации имени файла архива."""
         # Тестируем удаление опасных путей
@@ -403,6 +1800,14 @@ if __name__ == "__main__":
         result = text_extractor._check_mime_type(pdf_content, "test.pdf")
         assert result is True
 
+        # Сигнатура сверяется с типом по расширению для сигнатур любой длины
+        assert text_extractor._check_mime_type(b"<?xml version", "a.xml") is True
+        assert text_extractor._check_mime_type(b"PK\x03\x04", "a.docx") is True
+        assert text_extractor._check_mime_type(b"PK\x03\x04", "a.odt") is True
+        assert text_extractor._check_mime_type(b"\x89PNG\r\n", "a.gif") is False
+        assert text_extractor._check_mime_type(pdf_content, "a.doc") is False
+        assert text_extractor._check_mime_type(b"", "a.pdf") is True
+
 
 @pytest.mark.unit
 class TestBase64ImageProcessing:
@@ -448,6 +1853,43 @@ class TestBase64ImageProcessing:
         result = text_extractor._process_base64_image(plain_base64)
         assert result is None
 
+    def test_process_base64_images_parallel_order(self, text_extractor):
+        """Тест параллельного OCR base64 изображений с сохранением порядка."""
+        threads = set()
+
+        def fake_process(img_tag, extraction_options=None):
+            threads.add(threading.get_ident())
+            time.sleep(0.05 if img_tag == "first" else 0)
+            return None if img_tag == "empty" else {"text": img_tag}
+
+        with patch.object(
+            text_extractor, "_process_base64_image", side_effect=fake_process
+        ):
+            results = text_extractor._process_base64_images(
+                ["first", "empty", "second", "third"], None
+            )
+
+        assert [item["text"] for item in results] == ["first", "second", "third"]
+        assert threading.get_ident() not in threads
+
+    def test_process_url_images_order(self, text_extractor):
+        """Тест загрузки URL изображений без ожидания пар, в порядке страницы."""
+
+        def fake_process(img_tag, base_url, extraction_options=None):
+            time.sleep(0.05 if img_tag == "slow" else 0)
+            if img_tag == "broken":
+                raise ValueError("broken image")
+            return {"text": img_tag}
+
+        with patch.object(
+            text_extractor, "_process_single_image", side_effect=fake_process
+        ):
+            results = text_extractor._process_url_images(
+                ["slow", "fast", "broken", "last"], "https://example.com", None
+            )
+
+        assert [item["text"] for item in results] == ["slow", "fast", "last"]
+
 
 @pytest.mark.integration
 class TestPlaywrightIntegration:
@@ -559,3 +2001,38 @@ class TestWebExtractionWithMockRequests:
 
         assert len(result) >= 1
         assert any("Simple Page" in file_data["text"] for file_data in result)
+
+    @patch("requests.Session")
+    def test_download_and_extract_file_in_memory(
+        self, mock_session_cls, text_extractor
+    ):
+        """Тест скачивания файла по URL без временного файла на диске."""
+        mock_response = Mock()
+        mock_response.url = "https://example.com/notes.txt"
+        mock_response.headers = {"content-type": "text/plain"}
+        mock_response.iter_content.return_value = [b"Hello, ", b"", b"world!"]
+        mock_session_cls.return_value.get.return_value = mock_response
+
+        with patch("tempfile.NamedTemporaryFile") as mock_tempfile:
+            result = text_extractor._download_and_extract_file(
+                "https://example.com/notes.txt"
+            )
+
+        mock_tempfile.assert_not_called()
+        assert result[0]["filename"] == "notes.txt"
+        assert result[0]["text"] == "Hello, world!"
+
+    @patch("requests.Session")
+    def test_download_and_extract_file_size_limit(
+        self, mock_session_cls, text_extractor
+    ):
+        """Тест ограничения размера при потоковом скачивании файла."""
+        mock_response = Mock()
+        mock_response.url = "https://example.com/big.txt"
+        mock_response.headers = {}
+        mock_response.iter_content.return_value = [b"x" * 10, b"x" * 10]
+        mock_session_cls.return_value.get.return_value = mock_response
+
+        with patch("app.extractors.settings.MAX_FILE_SIZE", 15):
+            with pytest.raises(ValueError, match="File too large"):
+                text_extractor._download_and_extract_file("https://example.com/big.txt")
@@ -450,6 +450,8 @@ class TestRealFiles:
         mock_tesseract.image_to_string.return_value = "Распознанный текст с изображения"
         # Image.open() используется как context manager в _extract_from_image_sync.
         mock_image = Mock()
+        mock_image.size = (800, 600)
+        mock_image.mode = "L"
         mock_image_class.open.return_value.__enter__.return_value = mock_image
         mock_image_class.open.return_value.__exit__.return_value = False
 
@@ -101,6 +101,44 @@ class TestExtractEndpoint:
             assert len(data["files"]) == 1
             assert data["files"][0]["text"] == test_content
 
+    def test_extract_file_process_pool(self):
+        """Тест извлечения в пуле процессов (EXTRACTION_PROCESSES)."""
+        import app.main as main_module
+
+        test_content = "Текст из пула процессов"
+
+        with (
+            patch("app.main.settings.EXTRACTION_PROCESSES", 1),
+            patch("app.main.settings.ENABLE_WARMUP", False),
+            TestClient(app) as client,
+        ):
+            assert main_module.extraction_process_pool is not None
+            response = client.post(
+                "/v1/extract/file",
+                files={
+                    "file": (
+                        "test.txt",
+                        BytesIO(test_content.encode("utf-8")),
+                        "text/plain",
+                    )
+                },
+            )
+
+        assert response.status_code == 200
+        assert response.json()["files"][0]["text"] == test_content
+        assert main_module.extraction_process_pool is None
+
+    def test_lifespan_shuts_down_extraction_executor(self, extraction_executor):
+        """Тест: при завершении работы пул извлечения закрывается."""
+        with (
+            patch("app.main.settings.ENABLE_WARMUP", False),
+            TestClient(app),
+        ):
+            pass
+
+        with pytest.raises(RuntimeError):
+            extraction_executor.submit(print)
+
     def test_extract_json_file_success(self, test_client):
         """Тест успешного извлечения из JSON файла."""
         test_content = '{"name": "Тест", "value": 42}'
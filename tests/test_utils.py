@@ -1,6 +1,8 @@
 """Unit тесты для модуля утилит."""
 
 import logging
+import os
+import subprocess
 import sys
 from pathlib import Path
 from unittest.mock import Mock, patch
@@ -8,6 +10,8 @@ from unittest.mock import Mock, patch
 import pytest
 
 from app.utils import (
+    LazyImport,
+    cleanup_temp_files,
     get_file_extension,
     is_archive_format,
     is_supported_format,
@@ -65,6 +69,32 @@ class TestGetFileExtension:
         assert get_file_extension(".config.json") == "json"
 
 
+@pytest.mark.unit
+class TestLazyImport:
+    """Тесты для отложенного импорта зависимостей."""
+
+    def test_import_on_first_use(self):
+        """Тест импорта модуля при первом обращении."""
+        lazy_json = LazyImport("json")
+        assert lazy_json._target is None
+
+        assert lazy_json.dumps([1]) == "[1]"
+        assert bool(lazy_json) is True
+
+    def test_attribute_import(self):
+        """Тест отложенного импорта атрибута модуля."""
+        lazy_path = LazyImport("pathlib", "PurePosixPath")
+        assert str(lazy_path("a", "b")) == "a/b"
+
+    def test_missing_module(self):
+        """Тест поведения при отсутствии пакета."""
+        lazy_missing = LazyImport("module_that_does_not_exist")
+
+        assert not lazy_missing
+        with pytest.raises(ImportError):
+            lazy_missing()
+
+
 @pytest.mark.unit
 class TestSanitizeFilename:
     """Тесты для функции sanitize_filename."""
@@ -139,6 +169,17 @@ class TestValidateFileType:
             assert is_valid is True
             assert error is None
 
+    @pytest.mark.parametrize("filename", ["test.doc", "test.xls", "test.ppt"])
+    def test_ole_files_valid(self, filename):
+        """Тест распознавания DOC/XLS/PPT по полному содержимому файла."""
+        # По первым килобайтам libmagic видит только контейнер OLE
+        # (application/x-ole-storage), поэтому буфер не обрезается
+        content = (Path(__file__).parent / filename).read_bytes()
+
+        is_valid, error = validate_file_type(content, filename)
+        assert is_valid is True
+        assert error is None
+
     def test_invalid_extension_mismatch(self):
         """Тест несоответствия расширения содержимому."""
         # Текстовый контент с PDF расширением
@@ -393,3 +434,26 @@ class TestWebUtilityFunctions:
         assert result is not None
         assert isinstance(result, bytes)
         assert len(result) > 0
+
+
+@pytest.mark.unit
+class TestCleanupTempFiles:
+    """Тесты очистки временных файлов при старте."""
+
+    def test_cleanup_libreoffice_profiles_of_dead_processes(self, tmp_path):
+        """Тест удаления профилей LibreOffice только завершившихся процессов."""
+        process = subprocess.Popen([sys.executable, "-c", "pass"])
+        process.wait()
+
+        dead_profile = tmp_path / f"extract-text-libreoffice-{process.pid}-0"
+        dead_work = tmp_path / f"extract-text-libreoffice-{process.pid}-0-work"
+        live_profile = tmp_path / f"extract-text-libreoffice-{os.getpid()}-0"
+        for path in (dead_profile, dead_work, live_profile):
+            (path / "user").mkdir(parents=True)
+
+        with patch("app.utils.tempfile.gettempdir", return_value=str(tmp_path)):
+            cleanup_temp_files()
+
+        assert not dead_profile.exists()
+        assert not dead_work.exists()
+        assert live_profile.exists()